@@ -1,11 +1,308 @@
-from datetime import datetime
+import time
+
+# taken before the heavy imports below so startup_seconds() covers them
+_process_started = time.perf_counter()
+
+import asyncio
+import io
+import json
+import os
+from contextlib import asynccontextmanager
 
 import joblib
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI, HTTPException
+import yaml
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 
-app = FastAPI()
+from serving.batching import MicroBatcher, QueueFullError
+from serving.binary import RESULT_DTYPE, ROW_BAD_DATE, STATUS_NOT_READY, BinaryPredictionServer, FrameError
+from serving.cache import PredictionCache
+from serving.logger import PredictionLogger
+from serving.metrics import SIZE_BUCKETS, MetricsMiddleware, MetricsRegistry, StageTimer
+from serving.profiler import SamplingProfiler
+from serving.registry import (
+    CompiledModelSource,
+    FileModelSource,
+    ModelManager,
+    RegistryModelSource,
+    load_warmup_rows,
+)
+from steps.clean import Cleaner, decode_date, decode_dates
+from steps.compile import CompiledModel, resolve_current
+from steps.monitor import DriftMonitor, DriftReference
+
+
+def load_config():
+    with open("config.yml", "r") as config_file:
+        return yaml.safe_load(config_file)
+
+
+config = load_config()
+serving_config = config.get("serving", {})
+cleaner = Cleaner()
+batcher = None
+binary_server = None
+
+ENDPOINTS = (
+    "/", "/ready", "/stats", "/drift", "/reload", "/metrics",
+    "/predict", "/predict_batch", "/profiler", "/profiler/start", "/profiler/stop",
+)
+metrics = MetricsRegistry()
+REQUESTS = metrics.counter("http_requests", "HTTP requests by endpoint and status code", ("endpoint", "status"))
+REQUEST_LATENCY = metrics.histogram("http_request_duration_seconds", "End-to-end request latency", ("endpoint",))
+IN_FLIGHT = metrics.gauge("http_requests_in_flight", "Requests currently being handled", ("endpoint",))
+STAGE_LATENCY = metrics.histogram("predict_stage_duration_seconds", "Time spent in each stage of /predict", ("stage",))
+PREDICT_ERRORS = metrics.counter("predict_errors", "Rejected /predict requests by reason", ("reason",))
+BATCH_ROWS = metrics.histogram("predict_batch_rows", "Rows per /predict_batch request or micro-batch", ("source",), SIZE_BUCKETS)
+BINARY_REQUESTS = metrics.counter("binary_requests", "Binary protocol frames by status", ("status",))
+BINARY_LATENCY = metrics.histogram("binary_request_duration_seconds", "Time to score one binary protocol frame")
+metrics.gauge("prediction_cache_hit_ratio", "Prediction cache hit ratio", callback=lambda: _cache_stat("hit_rate"))
+metrics.gauge("prediction_cache_hits", "Prediction cache hits", callback=lambda: _cache_stat("hits"))
+metrics.gauge("prediction_cache_misses", "Prediction cache misses", callback=lambda: _cache_stat("misses"))
+metrics.gauge("model_version", "Version of the model being served", callback=lambda: _model_version_metric())
+
+
+def _cache_stat(name):
+    return prediction_cache.stats()[name] if prediction_cache is not None else None
+
+
+def _model_version_metric():
+    current = model_manager.current
+    return current.version if current is not None and isinstance(current.version, int) else None
+
+
+def _positive_proba(model, proba):
+    # probability reported to clients and logs is P(Rain=1); a model that never saw rain gives 0
+    classes = list(model.classes_)
+    return proba[:, classes.index(1)] if 1 in classes else np.zeros(len(proba))
+
+
+def _staged_predict_proba(model, frame, timer):
+    """predict_proba with the preprocessing and model stages timed separately."""
+    if isinstance(model, CompiledModel):
+        transformed = model.transform(frame)
+        timer.lap("preprocess")
+        proba = model.proba_from_features(transformed)
+    elif hasattr(model, "steps"):
+        *transforms, (_, estimator) = model.steps
+        transformed = frame
+        for _, step in transforms:
+            # samplers such as SMOTE only act during fit
+            if not hasattr(step, "fit_resample"):
+                transformed = step.transform(transformed)
+        timer.lap("preprocess")
+        proba = estimator.predict_proba(transformed)
+    else:
+        proba = model.predict_proba(frame)
+    timer.lap("model")
+    return proba
+
+
+def _score_rows(rows, timer=None):
+    """Score a list of feature dicts with one model call; returns (class, P(Rain=1), model version) per row."""
+    timer = timer or StageTimer(STAGE_LATENCY)
+    loaded = model_manager.current
+    preprocessor = loaded.model.steps[0][1] if hasattr(loaded.model, "steps") else None
+    if hasattr(preprocessor, "encode_rows"):
+        # FeatureEncoder pipelines go from request dicts to the float32 matrix without a DataFrame
+        transformed = preprocessor.encode_rows(rows)
+        timer.lap("preprocess")
+        proba = loaded.model.steps[-1][1].predict_proba(transformed)
+        timer.lap("model")
+    else:
+        frame = pd.DataFrame(rows, columns=cleaner.feature_cols)
+        timer.lap("dataframe")
+        proba = _staged_predict_proba(loaded.model, frame, timer)
+    predicted = loaded.model.classes_[proba.argmax(axis=1)]
+    return [(int(c), float(p), loaded.version) for c, p in zip(predicted, _positive_proba(loaded.model, proba))]
+
+
+def _packed_features(numeric, compass):
+    features = pd.DataFrame(numeric, columns=cleaner.feature_cols[:-1])
+    features["DDD_CAR"] = compass
+    return features
+
+
+def _score_packed(loaded, rows, start):
+    """
+    Score a binary protocol frame (serving.binary.ROW_DTYPE rows) with the same rules as InputData.
+    Returns (results, features, predictions, log records); drift and logging are left to the event loop.
+    """
+    results = np.zeros(len(rows), dtype=RESULT_DTYPE)
+    results["predicted_class"] = -1
+    results["probability"] = np.nan
+    month, day = decode_dates(np.char.decode(rows["TANGGAL"], "ascii", errors="replace"))
+    valid = ~np.isnan(month)
+    results["error"][~valid] = ROW_BAD_DATE
+    if not valid.any():
+        return results, None, None, []
+
+    numeric = np.column_stack([rows["values"][valid], month[valid], day[valid]])
+    compass = np.char.decode(rows["DDD_CAR"][valid], "ascii", errors="replace").astype(object)
+    preprocessor = loaded.model.steps[0][1] if hasattr(loaded.model, "steps") else None
+    features = None
+    if hasattr(preprocessor, "encode_arrays"):
+        proba = loaded.model.steps[-1][1].predict_proba(preprocessor.encode_arrays(numeric, compass))
+    else:
+        features = _packed_features(numeric, compass)
+        proba = loaded.model.predict_proba(features)
+    predicted = loaded.model.classes_[proba.argmax(axis=1)]
+    positive = _positive_proba(loaded.model, proba)
+    results["predicted_class"][valid] = predicted
+    results["probability"][valid] = positive
+
+    records = []
+    if drift_monitor is not None or prediction_logger is not None:
+        features = _packed_features(numeric, compass) if features is None else features
+    if prediction_logger is not None:
+        records = [
+            _log_record(row, int(cls), float(p), loaded.version, start)
+            for row, cls, p in zip(features.to_dict(orient="records"), predicted, positive)
+        ]
+    return results, features, predicted, records
+
+
+def _score_batch(loaded, frame, errors, start):
+    """
+    Score a parsed /predict_batch frame; rows already in errors (parse errors) are skipped.
+    Returns (results, valid features, predictions, log records); drift and logging are left to the event loop.
+    """
+    try:
+        features, invalid = cleaner.build_features(frame)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    invalid_rows = invalid.to_numpy()
+    for i in np.flatnonzero(invalid_rows.any(axis=1)):
+        errors.setdefault(int(i), _row_error(list(invalid.columns[invalid_rows[i]])))
+
+    valid = np.ones(len(frame), dtype=bool)
+    valid[list(errors)] = False
+    results = [{"row": i, "error": errors[i]} if i in errors else None for i in range(len(frame))]
+    if not valid.any():
+        return results, None, None, []
+
+    # one predict_proba call for every valid row; probability is P(Rain=1)
+    features = features[valid]
+    proba = loaded.model.predict_proba(features)
+    predicted = loaded.model.classes_[proba.argmax(axis=1)]
+    positive = _positive_proba(loaded.model, proba)
+    for i, cls, p in zip(np.flatnonzero(valid), predicted, positive):
+        results[i] = {"row": int(i), "predicted_class": int(cls), "probability": float(p)}
+    records = []
+    if prediction_logger is not None:
+        # every row of the batch carries the batch latency
+        records = [
+            _log_record(row, int(cls), float(p), loaded.version, start)
+            for row, cls, p in zip(features.to_dict(orient="records"), predicted, positive)
+        ]
+    return results, features, predicted, records
+
+
+async def _predict_packed(rows):
+    start = time.perf_counter()
+    loaded = model_manager.current
+    if loaded is None:
+        raise FrameError(STATUS_NOT_READY, "Model belum siap")
+    BATCH_ROWS.observe(len(rows), source="binary")
+    # scored off the event loop so HTTP requests and other connections keep flowing
+    results, features, predicted, records = await asyncio.get_running_loop().run_in_executor(
+        None, _score_packed, loaded, rows, start
+    )
+    # the logger's wakeup event and buffer belong to the event loop, so they are only touched from here
+    if drift_monitor is not None and predicted is not None:
+        drift_monitor.update(features, predicted)
+    if prediction_logger is not None and records:
+        prediction_logger.log_many(records)
+    return loaded.version, results
+
+
+def _log_record(features, pred, proba, version, start):
+    record = {"timestamp": time.time(), "model_version": version}
+    record.update(features)
+    record.update({"prediction": pred, "probability": proba, "latency_ms": (time.perf_counter() - start) * 1000})
+    return record
+
+
+async def _drift_report_loop(interval, path):
+    # emit production_drift.json-style reports on a schedule from the sliding window
+    while True:
+        await asyncio.sleep(interval)
+        if drift_monitor.total_rows:
+            drift_monitor.write_report(path)
+
+
+def startup_seconds():
+    return ready_at - _process_started if ready_at is not None else None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global batcher, binary_server, ready_at
+    report_task = None
+    # load and warm the model before the app reports ready (and before uvicorn accepts traffic)
+    if model_manager.current is None:
+        await asyncio.get_running_loop().run_in_executor(None, model_manager.load_initial)
+    ready_at = time.perf_counter()
+    monitoring_config = config.get("monitoring", {})
+    if drift_monitor is not None:
+        report_task = asyncio.create_task(_drift_report_loop(
+            monitoring_config.get("report_interval_seconds", 60),
+            monitoring_config.get("report_path", "production_drift.json"),
+        ))
+    batching_config = serving_config.get("batching", {})
+    if batching_config.get("enabled", False):
+        batcher = MicroBatcher(
+            _score_micro_batch,
+            max_batch_size=batching_config.get("max_batch_size", 64),
+            max_wait_ms=batching_config.get("max_wait_ms", 5),
+            max_queue_size=batching_config.get("max_queue_size", 1024),
+        )
+        await batcher.start()
+    if prediction_logger is not None:
+        await prediction_logger.start()
+    binary_config = serving_config.get("binary", {})
+    if binary_config.get("enabled", False):
+        binary_server = BinaryPredictionServer(
+            _predict_packed,
+            host=binary_config.get("host", "127.0.0.1"),
+            port=binary_config.get("port", 8500),
+            max_rows=serving_config.get("max_batch_rows", 10000),
+            requests=BINARY_REQUESTS,
+            latency=BINARY_LATENCY,
+        )
+        await binary_server.start()
+    if serving_config.get("reload", {}).get("enabled", False):
+        model_manager.start()
+    yield
+    model_manager.stop()
+    if binary_server is not None:
+        await binary_server.stop()
+        binary_server = None
+    if prediction_logger is not None:
+        await prediction_logger.stop()
+    if batcher is not None:
+        await batcher.stop()
+        batcher = None
+    if report_task is not None:
+        report_task.cancel()
+
+
+def _score_micro_batch(rows):
+    BATCH_ROWS.observe(len(rows), source="micro_batch")
+    return _score_rows(rows)
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(
+    MetricsMiddleware,
+    requests=REQUESTS,
+    latency=REQUEST_LATENCY,
+    in_flight=IN_FLIGHT,
+    endpoints=ENDPOINTS,
+)
 
 
 class InputData(BaseModel):
@@ -21,26 +318,200 @@ class InputData(BaseModel):
     DDD_CAR: str
 
 
-# load model
-model = joblib.load("models/model.pkl")
+def model_file_path():
+    # "compiled" serves the NumPy engine exported by Trainer.export_compiled instead of the pickle
+    if serving_config.get("model_format", "pickle") == "compiled":
+        return os.path.join(config["model"]["store_path"], "compiled")
+    return "models/model.pkl"
+
+
+def load_model():
+    # memory-mapped loads let the page cache share the model arrays between uvicorn workers
+    mmap_mode = serving_config.get("mmap_mode", "r")
+    if serving_config.get("model_format", "pickle") == "compiled":
+        return CompiledModel.load(model_file_path(), mmap_mode=mmap_mode)
+    return joblib.load(model_file_path(), mmap_mode=mmap_mode)
+
+
+def create_cache():
+    cache_config = serving_config.get("cache", {})
+    if not cache_config.get("enabled", False):
+        return None
+    model_file = model_file_path()
+    if os.path.isdir(model_file):
+        # published versions flip CURRENT; a plain export rewrites meta.json
+        version_marker = os.path.join(model_file, "CURRENT")
+        model_file = version_marker if os.path.exists(version_marker) else os.path.join(model_file, "meta.json")
+    cache = PredictionCache(
+        cleaner.feature_cols,
+        max_size=cache_config.get("max_size", 10000),
+        ttl_seconds=cache_config.get("ttl_seconds", 300),
+        model_path=model_file,
+    )
+    return cache
+
+
+def create_drift_monitor():
+    monitoring_config = config.get("monitoring", {})
+    if not monitoring_config.get("enabled", False):
+        return None
+    reference = DriftReference.load(monitoring_config.get("reference_path", "models/drift_reference.json"))
+    return DriftMonitor(
+        reference,
+        window_size=monitoring_config.get("window_size", 10000),
+        n_buckets=monitoring_config.get("n_buckets", 10),
+    )
+
+
+def create_prediction_logger():
+    logging_config = serving_config.get("logging", {})
+    if not logging_config.get("enabled", False):
+        return None
+    return PredictionLogger(
+        logging_config.get("directory", "data/predictions"),
+        fmt=logging_config.get("format", "ndjson"),
+        max_buffer=logging_config.get("max_buffer", 10000),
+        batch_size=logging_config.get("batch_size", 1000),
+        flush_interval_ms=logging_config.get("flush_interval_ms", 1000),
+        rotate_rows=logging_config.get("rotate_rows", 100000),
+        fsync_every=logging_config.get("fsync_every", 10),
+        max_retries=logging_config.get("max_retries", 3),
+    )
+
+
+def _on_model_swap(loaded):
+    # cached outputs belong to the previous model
+    if prediction_cache is not None:
+        prediction_cache.set_model_version(loaded.version)
+
+
+def create_model_manager():
+    # "registry" resolves serving.registry.name/stage from the local MLflow store instead of models/
+    if serving_config.get("model_source", "file") == "registry":
+        registry_config = serving_config.get("registry", {})
+        source = RegistryModelSource(
+            registry_config.get("name", "insurance_model"),
+            stage=registry_config.get("stage"),
+            tracking_uri=registry_config.get("tracking_uri"),
+        )
+    elif serving_config.get("model_format", "pickle") == "compiled" and resolve_current(model_file_path())[0] is not None:
+        source = CompiledModelSource(model_file_path(), mmap_mode=serving_config.get("mmap_mode", "r"))
+    else:
+        source = FileModelSource(model_file_path(), load_model)
+    reload_config = serving_config.get("reload", {})
+    warmup_path = reload_config.get("warmup_samples", "samples.json")
+    manager = ModelManager(
+        source,
+        warmup_rows=load_warmup_rows(warmup_path, cleaner) if os.path.exists(warmup_path) else None,
+        poll_interval=reload_config.get("poll_interval_seconds", 30),
+        on_swap=_on_model_swap,
+    )
+    return manager
+
+
+def current_model():
+    loaded = model_manager.current
+    if loaded is None:
+        raise HTTPException(status_code=503, detail="Model belum siap")
+    return loaded
+
+
+# the model itself is loaded and warmed up in lifespan()
+prediction_cache = create_cache()
+model_manager = create_model_manager()
+ready_at = None
+profiler_config = serving_config.get("profiler", {})
+profiler = SamplingProfiler(profiler_config.get("interval_ms", 5)) if profiler_config.get("enabled", False) else None
+drift_monitor = create_drift_monitor()
+prediction_logger = create_prediction_logger()
 
 
 @app.get("/")
 async def read_root():
-    return {"health_check": "OK", "model_version": 1}
+    current = model_manager.current
+    return {"health_check": "OK", "model_version": current.version if current else None}
+
+
+@app.get("/ready")
+async def ready():
+    # readiness probe: passes only once the model is loaded and warmed up
+    current_model()
+    return {"ready": True, "model_version": model_manager.current.version, "startup_seconds": startup_seconds()}
+
+
+@app.get("/stats")
+async def stats():
+    return {
+        "batching": batcher.stats() if batcher is not None else None,
+        "binary": binary_server.stats() if binary_server is not None else None,
+        "cache": prediction_cache.stats() if prediction_cache is not None else None,
+        "logging": prediction_logger.stats() if prediction_logger is not None else None,
+        "model": model_manager.stats(),
+    }
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type=MetricsRegistry.content_type)
+
+
+def _profiler():
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiler tidak aktif")
+    return profiler
+
+
+@app.post("/profiler/start")
+async def start_profiler():
+    _profiler().start()
+    return _profiler().report(top=0)
+
+
+@app.post("/profiler/stop")
+async def stop_profiler():
+    _profiler().stop()
+    return _profiler().report()
+
+
+@app.get("/profiler")
+async def profiler_report(top: int = 50):
+    return _profiler().report(top=top)
+
+
+@app.post("/reload")
+async def reload_model():
+    # load, warm up and swap off the event loop; requests keep using the current model meanwhile
+    reloaded = await asyncio.get_running_loop().run_in_executor(None, model_manager.check)
+    return {"reloaded": reloaded, **model_manager.stats()}
+
+
+@app.get("/drift")
+async def drift():
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Monitoring drift tidak aktif")
+    return drift_monitor.report()
 
 
 @app.post("/predict")
-async def predict(input_data: InputData):
-    # validate date format
+async def predict(input_data: InputData, request: Request):
+    start = getattr(request.state, "request_start", None) or time.perf_counter()
+    # body parsing + pydantic validation happen before the handler runs
+    timer = StageTimer(STAGE_LATENCY, start)
+    timer.lap("validation")
     try:
-        dt = datetime.strptime(input_data.TANGGAL, "%d-%m-%Y")
-    except ValueError:
+        current_model()
+    except HTTPException:
+        PREDICT_ERRORS.inc(reason="not_ready")
+        raise
+    # validate date format
+    month_day = decode_date(input_data.TANGGAL)
+    if month_day is None:
+        PREDICT_ERRORS.inc(reason="bad_date")
         raise HTTPException(status_code=400, detail="TANGGAL harus format DD-MM-YYYY")
+    timer.lap("parse_date")
 
     row = input_data.model_dump()
-    row["Month"] = dt.month
-    row["Day"] = dt.day
+    row["Month"], row["Day"] = month_day
 
     # align with training features
     features = {
@@ -57,7 +528,104 @@ async def predict(input_data: InputData):
         "DDD_CAR": row["DDD_CAR"],
     }
 
-    df = pd.DataFrame([features])
-    pred = model.predict(df)
+    cached = None
+    if prediction_cache is not None:
+        cache_key = prediction_cache.key(features)
+        cached = prediction_cache.get(cache_key)
+        timer.lap("cache")
+
+    if cached is not None:
+        pred, proba, version = cached
+    elif batcher is not None:
+        try:
+            pred, proba, version = await batcher.submit(features)
+        except QueueFullError:
+            PREDICT_ERRORS.inc(reason="queue_full")
+            raise HTTPException(status_code=503, detail="Server sibuk, coba lagi")
+        timer.lap("micro_batch")
+    else:
+        pred, proba, version = _score_rows([features], timer)[0]
+
+    if prediction_cache is not None and cached is None:
+        prediction_cache.put(cache_key, (pred, proba, version))
+    if drift_monitor is not None:
+        drift_monitor.update({k: [v] for k, v in features.items()}, [pred])
+    if prediction_logger is not None:
+        prediction_logger.log(_log_record(features, pred, proba, version, start))
+    timer.lap("postprocess")
+
+    return {"predicted_class": pred, "model_version": version}
+
+
+def _read_batch_rows(body: bytes, content_type: str):
+    """Parse a batch body into (frame, per-row parse errors) for JSON array, NDJSON or CSV."""
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body harus berupa teks UTF-8")
+    if "csv" in content_type:
+        try:
+            frame = pd.read_csv(io.StringIO(text), dtype={"TANGGAL": str, "DDD_CAR": str})
+        except pd.errors.EmptyDataError:
+            raise HTTPException(status_code=400, detail="Body CSV kosong")
+        except pd.errors.ParserError:
+            raise HTTPException(status_code=400, detail="Body CSV tidak valid")
+        return frame, {}
+
+    if "ndjson" in content_type or "jsonl" in content_type:
+        records, errors = [], {}
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            if not isinstance(record, dict):
+                errors[len(records)] = "baris bukan objek JSON yang valid"
+                record = {}
+            records.append(record)
+        return pd.DataFrame.from_records(records, columns=cleaner.raw_feature_cols), errors
+
+    try:
+        records = json.loads(text)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body harus JSON array")
+    if not isinstance(records, list):
+        raise HTTPException(status_code=400, detail="Body harus JSON array")
+    errors = {i: "baris bukan objek JSON yang valid" for i, r in enumerate(records) if not isinstance(r, dict)}
+    records = [r if isinstance(r, dict) else {} for r in records]
+    return pd.DataFrame.from_records(records, columns=cleaner.raw_feature_cols), errors
+
+
+def _row_error(invalid_fields):
+    if "TANGGAL" in invalid_fields:
+        return "TANGGAL harus format DD-MM-YYYY"
+    return f"Nilai tidak valid untuk: {', '.join(invalid_fields)}"
+
+
+@app.post("/predict_batch")
+async def predict_batch(request: Request):
+    start = time.perf_counter()
+    content_type = request.headers.get("content-type", "application/json")
+    frame, errors = _read_batch_rows(await request.body(), content_type)
+
+    max_rows = serving_config.get("max_batch_rows", 10000)
+    if len(frame) > max_rows:
+        raise HTTPException(status_code=413, detail=f"Maksimal {max_rows} baris per request")
+
+    frame = frame.reset_index(drop=True)
+    BATCH_ROWS.observe(len(frame), source="predict_batch")
+    # the whole batch is scored by the model that was current when it arrived
+    loaded = current_model()
+    # feature building and scoring run off the event loop so one large batch does not stall other requests
+    results, features, predicted, records = await asyncio.get_running_loop().run_in_executor(
+        None, _score_batch, loaded, frame, errors, start
+    )
+
+    if drift_monitor is not None and predicted is not None:
+        drift_monitor.update(features, predicted)
+    if prediction_logger is not None and records:
+        prediction_logger.log_many(records)
 
-    return {"predicted_class": int(pred[0])}
+    return {"n_rows": len(frame), "n_errors": len(errors), "model_version": loaded.version, "results": results}
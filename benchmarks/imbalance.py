@@ -0,0 +1,82 @@
+"""
+Imbalance strategies compared: fit time, peak memory and ROC AUC of the training pipeline.
+
+    python -m benchmarks.imbalance --sizes 1e5 1e6 --strategies none class_weight undersample smote
+
+Every (size, strategy) fit runs in a fresh process, so peak memory is the growth of that
+process's max RSS during the fit (data generation and cleaning are excluded). ROC AUC is
+measured on a separately generated test set of --test-rows rows.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sklearn.metrics import roc_auc_score
+
+from benchmarks.run import BenchmarkTrainer, peak_rss_mb
+from dataset import _generate_weather_rows
+from steps.clean import Cleaner
+
+
+def _config(strategy, n_estimators, n_jobs):
+    return {
+        "model": {
+            "name": "RandomForestClassifier",
+            "params": {"n_estimators": n_estimators, "max_depth": 10, "random_state": 42, "n_jobs": n_jobs},
+            "store_path": "models/",
+            "imbalance": {"strategy": strategy, "n_jobs": n_jobs, "random_state": 42},
+        },
+    }
+
+
+def measure(task):
+    n_rows, strategy, test_rows, n_estimators, n_jobs = task
+    cleaner = Cleaner()
+    trainer = BenchmarkTrainer(_config(strategy, n_estimators, n_jobs))
+    X_train, y_train = trainer.feature_target_separator(cleaner.clean_data(_generate_weather_rows(n_rows, seed=1)))
+    X_test, y_test = trainer.feature_target_separator(cleaner.clean_data(_generate_weather_rows(test_rows, seed=2)))
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    trainer.train_model(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    proba = trainer.pipeline.predict_proba(X_test)[:, list(trainer.pipeline.classes_).index(1)]
+    return {
+        "rows": n_rows,
+        "strategy": strategy,
+        "fit_seconds": fit_seconds,
+        "peak_mb": peak_rss_mb() - rss_before,
+        "roc_auc": float(roc_auc_score(y_test, proba)),
+    }
+
+
+def run(sizes, strategies, test_rows=100000, n_estimators=100, n_jobs=-1):
+    results = []
+    for n_rows in sizes:
+        for strategy in strategies:
+            # a fresh process per fit so ru_maxrss is not carried over from the previous strategy
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                results.append(pool.submit(measure, (n_rows, strategy, test_rows, n_estimators, n_jobs)).result())
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e5, 1e6])
+    parser.add_argument("--strategies", nargs="+", default=["none", "class_weight", "undersample", "smote"])
+    parser.add_argument("--test-rows", type=int, default=100000)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = run([int(n) for n in args.sizes], args.strategies, args.test_rows, args.n_estimators, args.n_jobs)
+    for result in results:
+        print(
+            f"{result['rows']:>10} {result['strategy']:<13} fit={result['fit_seconds']:8.2f}s "
+            f"peak={result['peak_mb']:8.1f} MB  roc_auc={result['roc_auc']:.4f}"
+        )
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
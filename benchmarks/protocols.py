@@ -0,0 +1,160 @@
+"""
+Load generator comparing the JSON API with the binary protocol (serving/binary.py) on one server.
+
+    python -m benchmarks.protocols --concurrency 8 --requests 2000 --batch-sizes 1 64
+
+Starts uvicorn in a scratch directory with serving.binary enabled (or targets a running server
+with --http-port/--binary-port), then drives both protocols with the same rows: JSON sends
+/predict for batch size 1 and /predict_batch otherwise, binary sends one frame per request.
+Reports rows/s and latency percentiles per protocol and batch size.
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import yaml
+
+from benchmarks.startup import _free_port
+from benchmarks.workers_memory import LINKED
+from serving.binary import STATUS_OK, BinaryClient, pack_rows
+
+
+def load_rows(samples_path, n_rows):
+    with open(samples_path, "r") as samples_file:
+        samples = json.load(samples_file)
+    for sample in samples:
+        sample.pop("RR", None)
+    return [samples[i % len(samples)] for i in range(n_rows)]
+
+
+def start_server(workers, timeout=60.0):
+    """uvicorn with the binary protocol enabled; returns (process, workdir, http port, binary port)."""
+    workdir = tempfile.TemporaryDirectory()
+    for name in LINKED + ["models"]:
+        os.symlink(os.path.abspath(name), os.path.join(workdir.name, name))
+    with open("config.yml", "r") as config_file:
+        config = yaml.safe_load(config_file)
+    http_port, binary_port = _free_port(), _free_port()
+    config["serving"]["binary"] = {"enabled": True, "host": "127.0.0.1", "port": binary_port}
+    with open(os.path.join(workdir.name, "config.yml"), "w") as config_file:
+        yaml.safe_dump(config, config_file)
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(http_port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir.name,
+    )
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{http_port}/ready", timeout=1.0):
+                return process, workdir, http_port, binary_port
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    raise TimeoutError(f"server not ready within {timeout}s")
+
+
+def _json_worker(host, port, rows, n_requests, latencies):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    if len(rows) == 1:
+        path, body = "/predict", json.dumps(rows[0])
+    else:
+        path, body = "/predict_batch", json.dumps(rows)
+    headers = {"content-type": "application/json"}
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        connection.request("POST", path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{path} returned {response.status}")
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def _binary_worker(host, port, rows, n_requests, latencies):
+    packed = pack_rows(rows)
+    with BinaryClient(host, port) as client:
+        for _ in range(n_requests):
+            start = time.perf_counter()
+            status, text, _ = client.predict(packed)
+            if status != STATUS_OK:
+                raise RuntimeError(f"binary frame rejected: {text}")
+            latencies.append(time.perf_counter() - start)
+
+
+def run_load(protocol, host, port, rows, concurrency, n_requests, warmup=20):
+    """Closed-loop load: concurrency clients each send n_requests / concurrency requests back to back."""
+    worker = _json_worker if protocol == "json" else _binary_worker
+    worker(host, port, rows, warmup, [])
+    per_client = max(n_requests // concurrency, 1)
+    latencies = [[] for _ in range(concurrency)]
+    threads = [
+        threading.Thread(target=worker, args=(host, port, rows, per_client, latencies[i]))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latency_ms = np.concatenate([np.asarray(l) for l in latencies]) * 1000
+    return {
+        "protocol": protocol,
+        "batch_size": len(rows),
+        "concurrency": concurrency,
+        "requests": int(len(latency_ms)),
+        "rows_per_sec": len(latency_ms) * len(rows) / elapsed,
+        "p50_ms": float(np.percentile(latency_ms, 50)),
+        "p95_ms": float(np.percentile(latency_ms, 95)),
+        "p99_ms": float(np.percentile(latency_ms, 99)),
+        "max_ms": float(latency_ms.max()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per protocol and batch size")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 64])
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the spawned server")
+    parser.add_argument("--samples", default="samples.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--http-port", type=int, help="use a running server instead of spawning one")
+    parser.add_argument("--binary-port", type=int, default=8500)
+    args = parser.parse_args()
+
+    process = workdir = None
+    if args.http_port is None:
+        process, workdir, http_port, binary_port = start_server(args.workers)
+    else:
+        http_port, binary_port = args.http_port, args.binary_port
+    try:
+        results = []
+        for batch_size in args.batch_sizes:
+            rows = load_rows(args.samples, batch_size)
+            for protocol, port in (("json", http_port), ("binary", binary_port)):
+                result = run_load(protocol, args.host, port, rows, args.concurrency, args.requests)
+                results.append(result)
+                print(
+                    f"{protocol:<6} batch={batch_size:<5} {result['rows_per_sec']:10.0f} rows/s  "
+                    f"p50={result['p50_ms']:7.2f}ms p95={result['p95_ms']:7.2f}ms p99={result['p99_ms']:7.2f}ms"
+                )
+        print(json.dumps(results))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+            workdir.cleanup()
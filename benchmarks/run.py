@@ -0,0 +1,182 @@
+"""
+End-to-end benchmark: ingest and clean throughput, fit time per model, API latency and peak RSS.
+
+    python -m benchmarks.run --output benchmarks/results/latest.json
+    python -m benchmarks.run --output benchmarks/results/latest.json --compare benchmarks/baseline.json --threshold 0.2
+
+Results are a flat list of metrics so two runs (e.g. two commits) can be compared;
+--compare exits non-zero when any metric regresses by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from dataset import _generate_weather_rows
+from steps.clean import Cleaner
+from steps.ingest import Ingestion
+from steps.train import Trainer
+
+
+class BenchmarkTrainer(Trainer):
+    def __init__(self, config):
+        self.benchmark_config = config
+        super().__init__()
+
+    def load_config(self):
+        return self.benchmark_config
+
+
+def metric(name, value, unit, higher_is_better):
+    return {"name": name, "value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def percentiles(prefix, latencies):
+    latencies_ms = np.asarray(latencies) * 1000
+    return [
+        metric(f"{prefix}.p{p}", np.percentile(latencies_ms, p), "ms", False)
+        for p in (50, 95, 99)
+    ]
+
+
+def bench_ingest(sizes, chunksize=100000):
+    ingestion = Ingestion()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in sizes:
+            path = os.path.join(tmp_dir, f"raw_{n_rows}.csv")
+            _generate_weather_rows(n_rows).to_csv(path, index=False)
+            elapsed = _timed(lambda: sum(len(chunk) for chunk in ingestion.iter_chunks(path, chunksize)))
+            results.append(metric(f"ingest.rows_per_sec.{n_rows}", n_rows / elapsed, "rows/s", True))
+    return results
+
+
+def bench_clean(sizes, repeats=3):
+    cleaner = Cleaner()
+    results = []
+    for n_rows in sizes:
+        raw = _generate_weather_rows(n_rows)
+        best = min(_timed(cleaner.clean_data, raw) for _ in range(repeats))
+        results.append(metric(f"clean.rows_per_sec.{n_rows}", n_rows / best, "rows/s", True))
+    return results
+
+
+def bench_fit(n_rows, model_params):
+    train = Cleaner().clean_data(_generate_weather_rows(n_rows))
+    results = []
+    for model_name in Trainer.model_map:
+        config = {"model": {"name": model_name, "params": model_params.get(model_name, {}), "store_path": "models/"}}
+        trainer = BenchmarkTrainer(config)
+        X, y = trainer.feature_target_separator(train)
+        results.append(metric(f"fit.seconds.{model_name}.{n_rows}", _timed(trainer.train_model, X, y), "s", False))
+    return results
+
+
+def bench_serving(n_requests, batch_sizes):
+    from fastapi.testclient import TestClient
+
+    import app as app_module
+
+    rows = _generate_weather_rows(max(batch_sizes + [1]), seed=7).drop(columns=["RR"]).to_dict(orient="records")
+    results = []
+    with TestClient(app_module.app) as client:
+        client.post("/predict", json=rows[0])  # warm-up
+        latencies = [_timed(client.post, "/predict", json=rows[i % len(rows)]) for i in range(n_requests)]
+        results.extend(percentiles("serve.predict", latencies))
+
+        for batch_size in batch_sizes:
+            batch = rows[:batch_size]
+            latencies = [_timed(client.post, "/predict_batch", json=batch) for _ in range(max(n_requests // 10, 5))]
+            results.extend(percentiles(f"serve.predict_batch.{batch_size}", latencies))
+            results.append(metric(f"serve.predict_batch.{batch_size}.rows_per_sec", batch_size / np.median(latencies), "rows/s", True))
+    return results
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, fit_rows, n_requests, batch_sizes):
+    metrics = []
+    metrics += bench_ingest(sizes)
+    metrics += bench_clean(sizes)
+    metrics += bench_fit(fit_rows, {
+        "RandomForestClassifier": {"n_estimators": 200, "max_depth": 10, "random_state": 42},
+        "DecisionTreeClassifier": {"random_state": 42},
+        "GradientBoostingClassifier": {"random_state": 42},
+    })
+    metrics += bench_serving(n_requests, batch_sizes)
+    metrics.append(metric("process.peak_rss_mb", peak_rss_mb(), "MB", False))
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "metrics": metrics,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return the metrics that regressed by more than threshold (relative) against the baseline."""
+    baseline_metrics = {m["name"]: m for m in baseline["metrics"]}
+    regressions = []
+    for m in current["metrics"]:
+        base = baseline_metrics.get(m["name"])
+        if base is None or base["value"] == 0:
+            continue
+        change = (m["value"] - base["value"]) / base["value"]
+        regressed = change < -threshold if m["higher_is_better"] else change > threshold
+        print(f"{m['name']:<55} {base['value']:>12.3f} -> {m['value']:>12.3f} {m['unit']:<7} {change:+7.1%}{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append({**m, "baseline": base["value"], "change": change})
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5])
+    parser.add_argument("--fit-rows", type=float, default=5e3)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[10, 100, 1000])
+    parser.add_argument("--output", default="benchmarks/results/latest.json")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    results = run([int(n) for n in args.sizes], int(args.fit_rows), args.requests, args.batch_sizes)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Benchmark results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
@@ -0,0 +1,70 @@
+"""
+Cold-start benchmark: time from launching uvicorn to the first successful /predict.
+
+    python -m benchmarks.startup --runs 3 --target-seconds 5
+
+Exits non-zero when the median startup time misses the target.
+"""
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _sample_row(samples_path):
+    with open(samples_path, "r") as samples_file:
+        row = json.load(samples_file)[0]
+    row.pop("RR", None)
+    return json.dumps(row).encode()
+
+
+def measure_startup(sample, timeout=60.0, workers=1):
+    """Seconds from process launch to the first 200 response from POST /predict."""
+    port = _free_port()
+    command = [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    start = time.perf_counter()
+    process = subprocess.Popen(command)
+    try:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}/predict", data=sample, headers={"content-type": "application/json"}
+        )
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(request, timeout=1.0) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.02)
+        raise TimeoutError(f"no successful prediction within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--samples", default="samples.json")
+    parser.add_argument("--target-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    sample = _sample_row(args.samples)
+    timings = [measure_startup(sample, workers=args.workers) for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f"startup to first prediction: median={median:.2f}s runs={[round(t, 2) for t in timings]} target={args.target_seconds:.2f}s")
+    if median > args.target_seconds:
+        sys.exit(1)
@@ -0,0 +1,101 @@
+"""
+Memory of multi-worker serving: total PSS of `uvicorn app:app --workers N` per model format.
+
+    python -m benchmarks.workers_memory --workers 1 2 4
+
+PSS (proportional set size, Linux /proc/<pid>/smaps_rollup) splits shared pages between the
+processes mapping them, so the total grows by the per-worker private memory only. With
+serving.model_format=compiled the tree arrays are memory-mapped and counted once; with the
+pickle every worker holds its own copy of the forest.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import joblib
+import yaml
+
+from benchmarks.startup import _free_port, _sample_row
+from steps.compile import compile_pipeline
+
+LINKED = ["app.py", "serving", "steps", "samples.json"]
+
+
+def _pss_kb(pid):
+    with open(f"/proc/{pid}/smaps_rollup", "r") as smaps:
+        for line in smaps:
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", "r") as children:
+            return [int(child) for child in children.read().split()]
+    except FileNotFoundError:
+        return []
+
+
+def prepare_workdir(workdir, model_format):
+    for name in LINKED:
+        os.symlink(os.path.abspath(name), os.path.join(workdir, name))
+    models_dir = os.path.join(workdir, "models")
+    os.makedirs(models_dir)
+    shutil.copy("models/model.pkl", models_dir)
+    if model_format == "compiled":
+        compile_pipeline(joblib.load("models/model.pkl")).publish(os.path.join(models_dir, "compiled"))
+
+    with open("config.yml", "r") as config_file:
+        config = yaml.safe_load(config_file)
+    config["serving"]["model_format"] = model_format
+    with open(os.path.join(workdir, "config.yml"), "w") as config_file:
+        yaml.safe_dump(config, config_file)
+
+
+def measure(model_format, workers, sample, n_requests=50, timeout=60.0):
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare_workdir(workdir, model_format)
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+            cwd=workdir,
+        )
+        try:
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{port}/predict", data=sample, headers={"content-type": "application/json"}
+            )
+            deadline = time.perf_counter() + timeout
+            served = 0
+            while served < n_requests and time.perf_counter() < deadline:
+                try:
+                    with urllib.request.urlopen(request, timeout=1.0):
+                        served += 1
+                except OSError:
+                    time.sleep(0.05)
+            worker_pids = _children(process.pid) if workers > 1 else [process.pid]
+            total_kb = sum(_pss_kb(pid) for pid in worker_pids)
+        finally:
+            process.terminate()
+            process.wait()
+    return {"model_format": model_format, "workers": workers, "pss_mb": total_kb / 1024, "pss_mb_per_worker": total_kb / 1024 / max(len(worker_pids), 1)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--formats", nargs="+", default=["pickle", "compiled"])
+    parser.add_argument("--samples", default="samples.json")
+    args = parser.parse_args()
+
+    sample = _sample_row(args.samples)
+    results = [measure(fmt, n, sample) for fmt in args.formats for n in args.workers]
+    for result in results:
+        print(f"{result['model_format']:<9} workers={result['workers']:<3} total PSS={result['pss_mb']:8.1f} MB  per worker={result['pss_mb_per_worker']:7.1f} MB")
+    print(json.dumps(results))
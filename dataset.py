@@ -1,10 +1,17 @@
+import argparse
+import math
 import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 
-def _generate_weather_rows(n: int, seed: int = 42) -> pd.DataFrame:
-    rng = np.random.default_rng(seed)
+COMPASS_CODES = ["N", "S", "E", "W", "C", "NE", "NW", "SE", "SW"]
+MEASUREMENT_COLS = ["TN", "TX", "TAVG", "RH_AVG", "RR", "SS", "FF_X", "DDD_X", "FF_AVG"]
+MAX_DAYS = 36524  # ~100 years of daily rows before a station's series wraps around
+
 
+def _weather_columns(rng: np.random.Generator, n: int) -> dict:
     # Temperature values (Celsius)
     tn = rng.normal(loc=24, scale=2, size=n).round(1)
     tx = tn + rng.normal(loc=6, scale=1.5, size=n)
@@ -16,32 +23,144 @@ def _generate_weather_rows(n: int, seed: int = 42) -> pd.DataFrame:
     ff_x = rng.normal(loc=5, scale=2, size=n).clip(0, 15).round(1)
     ddd_x = rng.integers(0, 360, size=n)
     ff_avg = (ff_x * rng.uniform(0.3, 0.7, size=n)).round(1)
-    ddd_car = rng.choice(["N", "S", "E", "W", "C", "NE", "NW", "SE", "SW"], size=n)
-
-    # Simple rain label: rain if rr > 0.5 mm
-    rain = (rr > 0.5).astype(int)
-
-    dates = pd.date_range(start="2025-01-01", periods=n, freq="D").strftime("%d-%m-%Y")
-
-    df = pd.DataFrame(
-        {
-            "TANGGAL": dates,
-            "TN": tn,
-            "TX": tx,
-            "TAVG": tavg,
-            "RH_AVG": rh_avg,
-            "RR": rr,
-            "SS": ss,
-            "FF_X": ff_x,
-            "DDD_X": ddd_x,
-            "FF_AVG": ff_avg,
-            "DDD_CAR": ddd_car,
-        }
-    )
+    ddd_car = rng.choice(COMPASS_CODES, size=n)
+
+    return {
+        "TN": tn,
+        "TX": tx,
+        "TAVG": tavg,
+        "RH_AVG": rh_avg,
+        "RR": rr,
+        "SS": ss,
+        "FF_X": ff_x,
+        "DDD_X": ddd_x,
+        "FF_AVG": ff_avg,
+        "DDD_CAR": ddd_car,
+    }
+
+
+def _format_dates(day_offsets: np.ndarray, start: str = "2025-01-01") -> np.ndarray:
+    # strftime is the bottleneck at large n: format each distinct day once, with digit arithmetic
+    # into a fixed-width DD-MM-YYYY byte buffer, then gather
+    unique_offsets, inverse = np.unique(day_offsets, return_inverse=True)
+    days = np.datetime64(start, "D") + unique_offsets.astype("timedelta64[D]")
+    months = days.astype("datetime64[M]")
+    day = (days - months).astype(np.int64) + 1
+    month = months.astype(np.int64) % 12 + 1
+    year = days.astype("datetime64[Y]").astype(np.int64) + 1970
+
+    buffer = np.full((len(days), 10), ord("-"), dtype=np.uint8)
+    for col, divisor in zip((0, 1), (10, 1)):
+        buffer[:, col] = ord("0") + day // divisor % 10
+    for col, divisor in zip((3, 4), (10, 1)):
+        buffer[:, col] = ord("0") + month // divisor % 10
+    for col, divisor in zip(range(6, 10), (1000, 100, 10, 1)):
+        buffer[:, col] = ord("0") + year // divisor % 10
+    formatted = buffer.view("S10").ravel().astype("U10").astype(object)
+    return formatted[inverse]
+
+
+def _generate_weather_rows(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    columns = _weather_columns(rng, n)
+
+    dates = _format_dates(np.arange(n))
+
+    df = pd.DataFrame({"TANGGAL": dates, **columns})
 
     return df
 
 
+def _generate_chunk(task) -> pd.DataFrame:
+    start_row, n_rows, seed_seq, start, n_days, n_stations, sentinel_rate = task
+    rng = np.random.default_rng(seed_seq)
+    columns = _weather_columns(rng, n_rows)
+
+    rows = np.arange(start_row, start_row + n_rows, dtype=np.int64)
+    data = {"TANGGAL": _format_dates(rows % n_days, start)}
+    if n_stations > 1:
+        station_ids = (rows // n_days) % n_stations
+        data["STATION"] = np.array([f"ST{i:03d}" for i in range(n_stations)], dtype=object)[station_ids]
+
+    if sentinel_rate > 0:
+        for col in MEASUREMENT_COLS:
+            mask = rng.random(n_rows) < sentinel_rate
+            sentinels = rng.choice([8888, 9999], size=n_rows)
+            columns[col] = np.where(mask, sentinels, columns[col])
+
+    data.update(columns)
+    return pd.DataFrame(data)
+
+
+def _write_chunk(frame: pd.DataFrame, path: str, fmt: str):
+    if fmt == "parquet":
+        frame.to_parquet(path, index=False)
+    elif fmt == "npy":
+        dtype = [
+            (col, "U10" if frame[col].dtype == object else frame[col].dtype.str)
+            for col in frame.columns
+        ]
+        records = np.empty(len(frame), dtype=dtype)
+        for col in frame.columns:
+            records[col] = frame[col].to_numpy()
+        np.save(path, records, allow_pickle=False)
+    elif fmt == "csv":
+        frame.to_csv(path, index=False)
+    else:
+        raise ValueError(f"Unknown output format: {fmt}")
+
+
+def _generate_and_write(task):
+    chunk_task, path, fmt = task
+    frame = _generate_chunk(chunk_task)
+    _write_chunk(frame, path, fmt)
+    return path, len(frame)
+
+
+def generate_dataset(
+    n_rows: int,
+    output_dir: str,
+    chunk_size: int = 1_000_000,
+    n_jobs: int = 1,
+    fmt: str = "parquet",
+    n_stations: int = 1,
+    start: str = "2025-01-01",
+    end: str = None,
+    sentinel_rate: float = 0.0,
+    seed: int = 42,
+):
+    """
+    Generate raw weather rows in chunks (one file per chunk) for load and scale testing.
+    Rows are laid out station by station over the daily range [start, end]; the range wraps
+    around when there are more rows than stations x days. Every chunk gets its own child seed,
+    so the output is identical for any n_jobs.
+    """
+    if end is None:
+        n_days = min(max(math.ceil(n_rows / n_stations), 1), MAX_DAYS)
+    else:
+        n_days = int((np.datetime64(end, "D") - np.datetime64(start, "D")).astype(int)) + 1
+        if n_days <= 0:
+            raise ValueError(f"end ({end}) must not be before start ({start})")
+    os.makedirs(output_dir, exist_ok=True)
+
+    n_chunks = math.ceil(n_rows / chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = []
+    for i in range(n_chunks):
+        start_row = i * chunk_size
+        chunk_task = (start_row, min(chunk_size, n_rows - start_row), seeds[i], start, n_days, n_stations, sentinel_rate)
+        tasks.append((chunk_task, os.path.join(output_dir, f"part-{i:05d}.{fmt}"), fmt))
+
+    if n_jobs == 1:
+        written = [_generate_and_write(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs if n_jobs > 0 else None) as pool:
+            written = list(pool.map(_generate_and_write, tasks))
+
+    print(f"Generated synthetic weather data: rows={sum(n for _, n in written)}, files={len(written)}, dir={output_dir}")
+    return [path for path, _ in written]
+
+
 def extract_data(train_size: int = 800, test_size: int = 200):
     if not os.path.exists("data"):
         os.mkdir("data")
@@ -56,4 +175,33 @@ def extract_data(train_size: int = 800, test_size: int = 200):
     print(f"Extracted synthetic weather data: train={train_df.shape}, test={test_df.shape}")
 
 if __name__ == "__main__":
-    extract_data()
+    parser = argparse.ArgumentParser(description="Synthetic weather data generator")
+    parser.add_argument("--train-size", type=int, default=800)
+    parser.add_argument("--test-size", type=int, default=200)
+    parser.add_argument("--rows", type=float, help="scale mode: total rows to generate in chunks")
+    parser.add_argument("--output-dir", default="data/synthetic")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--format", choices=["parquet", "npy", "csv"], default="parquet")
+    parser.add_argument("--stations", type=int, default=1)
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--end")
+    parser.add_argument("--sentinel-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.rows is None:
+        extract_data(args.train_size, args.test_size)
+    else:
+        generate_dataset(
+            int(args.rows),
+            args.output_dir,
+            chunk_size=args.chunk_size,
+            n_jobs=args.jobs,
+            fmt=args.format,
+            n_stations=args.stations,
+            start=args.start,
+            end=args.end,
+            sentinel_rate=args.sentinel_rate,
+            seed=args.seed,
+        )
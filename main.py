@@ -1,50 +1,177 @@
+import argparse
 import logging
+import os
 import yaml
-import mlflow
-import mlflow.sklearn
 from steps.ingest import Ingestion
 from steps.clean import Cleaner
 from steps.train import Trainer
 from steps.predict import Predictor
-from sklearn.metrics import classification_report
+from steps.monitor import DriftReference
+from steps.runner import Step, StepRunner
+from steps.evaluate import classification_report_text
 
 # Set up logging
 logging.basicConfig(level=logging.INFO,format='%(asctime)s:%(levelname)s:%(message)s')
 
-def main():
-    # Load data
-    ingestion = Ingestion()
-    train, test = ingestion.load_data()
+def export_compiled_model(trainer):
+    try:
+        compiled_path = trainer.export_compiled()
+        logging.info(f"Compiled model exported to {compiled_path}")
+    except ValueError as e:
+        logging.warning(f"Compiled model export skipped: {e}")
+
+def build_drift_reference(trainer, X_train):
+    # reference sketches for the streaming drift monitor, built once from the training data
+    monitoring_config = trainer.config.get('monitoring', {})
+    reference = DriftReference.from_data(X_train, trainer.pipeline.predict(X_train), n_bins=monitoring_config.get('n_bins', 20))
+    reference.save(monitoring_config.get('reference_path', 'models/drift_reference.json'))
+    logging.info("Drift reference saved")
+
+def compact_model(trainer, X_test, y_test):
+    # size / load time / latency / ROC AUC of each compaction variant; applied only with compaction.apply.
+    # Returns the test rows left for evaluating trainer.pipeline afterwards
+    import mlflow
+    from steps.compact import ModelCompactor
+    compaction_config = trainer.config.get('compaction', {})
+    report, pruned, quantized = trainer.compact(X_test, y_test)
+    for row in report:
+        logging.info(
+            f"Compaction {row['variant']}: {row['n_trees']} trees, {row['size_bytes'] / 2**20:.1f} MB, "
+            f"load {row['load_seconds']:.3f}s, 1 row {row['single_row_ms']:.2f}ms, ROC AUC delta {row['roc_auc_delta']:+.5f}"
+        )
+        for key in ('n_trees', 'size_bytes', 'load_seconds', 'single_row_ms', 'batch_rows_per_sec', 'roc_auc_delta'):
+            mlflow.log_metric(f"compact_{row['variant']}_{key}", row[key])
+    mlflow.log_dict(report, 'compaction.json')
+    if compaction_config.get('apply', False):
+        trainer.pipeline = pruned
+        # uncompressed, so the serving side can still memory-map model.pkl; compression is only a measured variant
+        trainer.save_model()
+        if quantized is not None:
+            quantized.publish(os.path.join(trainer.model_path, 'compiled'))
+        logging.info("Compacted model saved")
+        # the kept trees were chosen on the selection rows, so only the other rows give unbiased metrics
+        _, measured = ModelCompactor(compaction_config).split(len(X_test))
+        return X_test.iloc[measured], y_test.iloc[measured]
+    return X_test, y_test
+
+def cross_validate_models(trainer, X_train, y_train):
+    table, _ = trainer.cross_validate(X_train, y_train)
+    logging.info(f"Cross-validation completed:\n{table.to_string(index=False)}")
+    return table
+
+def log_cv_table(table):
+    import mlflow
+    # one comparison table for all models, plus a metric per model for sorting runs in the UI
+    mlflow.log_table(data=table, artifact_file="cv_comparison.json")
+    for row in table.itertuples():
+        mlflow.log_metric(f"cv_roc_{row.model}", row.roc_auc)
+
+def search_hyperparameters(trainer, X_train, y_train):
+    best, trials = trainer.search(X_train, y_train)
+    logging.info(f"Hyperparameter search completed: {len(trials)} trials, best {best['model']} {best['params']} (ROC AUC {best['roc_auc']:.4f})")
+    return best, trials
+
+def log_search_trials(trials):
+    import mlflow
+    # one nested MLflow run per evaluated candidate and rung
+    for trial in trials:
+        run_name = f"{trial['model']}-{trial['candidate']}-rung{trial['rung']}"
+        with mlflow.start_run(run_name=run_name, nested=True):
+            mlflow.set_tag('model', trial['model'])
+            mlflow.log_params(trial['params'])
+            mlflow.log_param('rung', trial['rung'])
+            mlflow.log_param('n_samples', trial['n_samples'])
+            mlflow.log_metric('roc', trial['roc_auc'])
+            mlflow.log_metric('fit_time', trial['fit_time'])
+
+def ingest_step(config):
+    train, test = Ingestion().load_data()
     logging.info("Data ingestion completed successfully")
+    return train, test
 
-    # Clean data
+def clean_step(config, raw):
     cleaner = Cleaner()
-    train_data = cleaner.clean_data(train)
-    test_data = cleaner.clean_data(test)
+    train, test = raw
+    cleaned = cleaner.clean_data(train), cleaner.clean_data(test)
     logging.info("Data cleaning completed successfully")
+    return cleaned
 
-    # Prepare and train model
+def train_step(config, cleaned):
     trainer = Trainer()
-    X_train, y_train = trainer.feature_target_separator(train_data)
+    X_train, y_train = trainer.feature_target_separator(cleaned[0])
+    if trainer.config.get('cv', {}).get('enabled', False):
+        cross_validate_models(trainer, X_train, y_train)
+    if trainer.config.get('search', {}).get('enabled', False):
+        search_hyperparameters(trainer, X_train, y_train)
     trainer.train_model(X_train, y_train)
     trainer.save_model()
+    trainer.reset_incremental()
+    export_compiled_model(trainer)
+    build_drift_reference(trainer, X_train)
     logging.info("Model training completed successfully")
+    if config.get('compaction', {}).get('apply', False):
+        logging.warning("compaction.apply is ignored by --cached runs; run `python main.py` to compact the model")
+    return trainer.model_name, trainer.pipeline
 
-    # Evaluate model
-    predictor = Predictor()
-    X_test, y_test = predictor.feature_target_separator(test_data)
-    accuracy, class_report, roc_auc_score = predictor.evaluate_model(X_test, y_test)
+def evaluate_step(config, trained, cleaned):
+    # the pipeline comes straight from the train step (or its cache), not from re-reading model.pkl
+    predictor = Predictor(trained[1])
+    X_test, y_test = predictor.feature_target_separator(cleaned[1])
+    evaluation = predictor.evaluate(X_test, y_test, chunk_size=config.get('evaluation', {}).get('chunk_size'))
     logging.info("Model evaluation completed successfully")
-    
+    return evaluation['accuracy'], classification_report_text(evaluation['classification_report']), evaluation['roc_auc']
+
+def pipeline_steps(config):
+    import steps.clean, steps.compact, steps.compile, steps.cv, steps.encoding, steps.evaluate, steps.ingest, steps.monitor, steps.parallel, steps.predict, steps.search, steps.store, steps.train
+    model_file = os.path.join(config['model']['store_path'], 'model.pkl')
+    reference_file = config.get('monitoring', {}).get('reference_path', 'models/drift_reference.json')
+    train_outputs = [model_file, reference_file]
+    if config['model']['name'] in ('RandomForestClassifier', 'DecisionTreeClassifier'):
+        # export_compiled publishes models/compiled/CURRENT; other models are skipped by the export
+        train_outputs.append(os.path.join(config['model']['store_path'], 'compiled', 'CURRENT'))
+    return [
+        Step('ingest', ingest_step, files=['data.train_path', 'data.test_path'], config_keys=['data', 'store'],
+             code=[steps.ingest, steps.store]),
+        Step('clean', clean_step, deps=['ingest'], code=[steps.clean]),
+        Step('train', train_step, deps=['clean'], config_keys=['model', 'train', 'cv', 'search', 'monitoring.n_bins'],
+             code=[steps.train, steps.cv, steps.search, steps.parallel, steps.encoding, steps.compact, steps.compile, steps.monitor], outputs=train_outputs),
+        Step('evaluate', evaluate_step, deps=['train', 'clean'], config_keys=['evaluation'], code=[steps.predict, steps.evaluate]),
+    ]
+
+def main(force=()):
+    # ingest -> clean -> train -> evaluate, rerunning only the steps whose inputs changed
+    with open('config.yml', 'r') as file:
+        config = yaml.safe_load(file)
+
+    runner = StepRunner(config, config.get('pipeline', {}).get('cache_dir', '.cache/steps'), force=force)
+    runner.run(pipeline_steps(config))
+    logging.info(f"Steps executed: {runner.executed or 'none'}, skipped: {runner.skipped or 'none'}")
+    model_name, _ = runner.output('train')
+    accuracy, class_report, roc_auc_score = runner.output('evaluate')
+
     # Print evaluation results
     print("\n============= Model Evaluation Results ==============")
-    print(f"Model: {trainer.model_name}")
+    print(f"Model: {model_name}")
     print(f"Accuracy Score: {accuracy:.4f}, ROC AUC Score: {roc_auc_score:.4f}")
     print(f"\n{class_report}")
     print("=====================================================\n")
 
 
+def stream_clean():
+    # Chunked ingest + clean for archives that do not fit in memory
+    ingestion = Ingestion()
+    cleaner = Cleaner()
+    data_config = ingestion.config['data']
+    train_chunks, test_chunks = ingestion.iter_data()
+    n_train = cleaner.clean_to_file(train_chunks, data_config['clean_train_path'])
+    n_test = cleaner.clean_to_file(test_chunks, data_config['clean_test_path'])
+    logging.info(f"Streaming cleaning completed successfully: train={n_train} rows, test={n_test} rows")
+
+
 def train_with_mlflow():
+    # mlflow is imported here so that `main.py --cached` reruns do not pay for it
+    import mlflow
+    import mlflow.sklearn
 
     with open('config.yml', 'r') as file:
         config = yaml.safe_load(file)
@@ -66,15 +193,30 @@ def train_with_mlflow():
         # Prepare and train model
         trainer = Trainer()
         X_train, y_train = trainer.feature_target_separator(train_data)
+        if config.get('cv', {}).get('enabled', False):
+            log_cv_table(cross_validate_models(trainer, X_train, y_train))
+        if config.get('search', {}).get('enabled', False):
+            _, trials = search_hyperparameters(trainer, X_train, y_train)
+            log_search_trials(trials)
         trainer.train_model(X_train, y_train)
         trainer.save_model()
+        # the new model starts from the full training data; incoming rows are replayed from the start
+        trainer.reset_incremental()
+        export_compiled_model(trainer)
+        build_drift_reference(trainer, X_train)
         logging.info("Model training completed successfully")
         
-        # Evaluate model
-        predictor = Predictor()
-        X_test, y_test = predictor.feature_target_separator(test_data)
-        accuracy, class_report, roc_auc_score = predictor.evaluate_model(X_test, y_test)
-        report = classification_report(y_test, trainer.pipeline.predict(X_test), output_dict=True)
+        # Compact model (with compaction.apply the pruned forest replaces trainer.pipeline)
+        X_test, y_test = trainer.feature_target_separator(test_data)
+        if config.get('compaction', {}).get('enabled', False):
+            X_test, y_test = compact_model(trainer, X_test, y_test)
+
+        # Evaluate the model that is logged and registered below
+        predictor = Predictor(trainer.pipeline)
+        evaluation = predictor.evaluate(X_test, y_test, chunk_size=config.get('evaluation', {}).get('chunk_size'))
+        accuracy, roc_auc_score = evaluation['accuracy'], evaluation['roc_auc']
+        report = evaluation['classification_report']
+        class_report = classification_report_text(report)
         logging.info("Model evaluation completed successfully")
         
         # Tags 
@@ -82,12 +224,17 @@ def train_with_mlflow():
         mlflow.set_tag('preprocessing', 'OneHotEncoder, Standard Scaler, and MinMax Scaler')
         
         # Log metrics
-        model_params = config['model']['params']
+        model_params = trainer.model_params
         mlflow.log_params(model_params)
         mlflow.log_metric("accuracy", accuracy)
         mlflow.log_metric("roc", roc_auc_score)
         mlflow.log_metric('precision', report['weighted avg']['precision'])
         mlflow.log_metric('recall', report['weighted avg']['recall'])
+        mlflow.log_metric('pr_auc', evaluation['pr_auc'])
+        mlflow.log_metric('log_loss', evaluation['log_loss'])
+        mlflow.log_metric('brier', evaluation['brier'])
+        # calibration bins and per-Month / per-DDD_CAR slices
+        mlflow.log_dict(evaluation, 'evaluation.json')
         mlflow.sklearn.log_model(trainer.pipeline, "model")
                 
         # Register the model
@@ -104,6 +251,46 @@ def train_with_mlflow():
         print(f"\n{class_report}")
         print("=====================================================\n")
         
+def incremental_retrain():
+    # grows the saved model with rows appended to retrain.incoming_dir; a full retrain is still train_with_mlflow()
+    import mlflow
+    import mlflow.sklearn
+    mlflow.set_experiment("Model Training Experiment")
+
+    with mlflow.start_run(run_name="incremental") as run:
+        trainer = Trainer()
+        result = trainer.retrain_incremental()
+        mlflow.set_tag('retrain', result['status'])
+        mlflow.log_param('n_new_rows', result['n_new_rows'])
+        for key in ('roc_auc_current', 'roc_auc_candidate', 'n_estimators'):
+            if key in result:
+                mlflow.log_metric(key, result[key])
+
+        if result['status'] != 'accepted':
+            logging.warning(f"Incremental retrain produced no new model: {result['status']} {result.get('reason', '')}")
+            return result
+
+        trainer.save_model()
+        # the watermark only moves once the grown model is on disk, so a failed save replays the rows
+        trainer.commit_incremental(result)
+        export_compiled_model(trainer)
+        mlflow.sklearn.log_model(trainer.pipeline, "model")
+        mlflow.register_model(f"runs:/{run.info.run_id}/model", "insurance_model")
+        logging.info(f"Incremental retrain accepted: {result['n_new_rows']} new rows, ROC AUC {result['roc_auc_current']:.4f} -> {result['roc_auc_candidate']:.4f}")
+        return result
+
 if __name__ == "__main__":
-    # main()
-    train_with_mlflow()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incremental", action="store_true", help="warm-start the saved model on newly appended rows")
+    parser.add_argument("--cached", action="store_true", help="run the step pipeline, skipping unchanged steps (no MLflow)")
+    parser.add_argument("--force", nargs="*", default=[], help="steps to rerun even if cached, e.g. --force train")
+    parser.add_argument("--stream-clean", action="store_true", help="clean data.train_path/test_path chunk by chunk into data.clean_*_path")
+    args = parser.parse_args()
+    if args.stream_clean:
+        stream_clean()
+    elif args.cached:
+        main(force=args.force)
+    elif args.incremental:
+        incremental_retrain()
+    else:
+        train_with_mlflow()
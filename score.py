@@ -0,0 +1,185 @@
+"""
+Bulk offline scoring of raw station rows (TANGGAL ... DDD_CAR) from CSV or Parquet files.
+
+    python score.py data/archive/*.parquet --output data/scores --jobs 8
+
+Inputs are split into shards (byte ranges of a CSV, row groups of a Parquet file) that a
+process pool scores with the model loaded once per worker. Every shard is written to its own
+Parquet part, so memory is bounded by jobs x shard size. A rerun skips the parts that already
+exist for the same model and sharding (input files are assumed not to change); a different
+model starts the output directory afresh.
+"""
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from steps.clean import Cleaner
+from steps.parallel import n_workers
+from steps.predict import Predictor
+from steps.store import _file_hash
+
+MANIFEST = "_manifest.json"  # underscore: skipped by pd.read_parquet(output_dir)
+
+_worker = {}
+
+
+def _init_worker(model_path):
+    _worker["predictor"] = Predictor(joblib.load(model_path))
+    _worker["cleaner"] = Cleaner()
+
+
+def csv_shards(path, shard_bytes):
+    """Byte ranges of a CSV file (header excluded) that each end on a line boundary."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as csv_file:
+        csv_file.readline()
+        start = csv_file.tell()
+        ranges = []
+        while start < size:
+            csv_file.seek(min(start + shard_bytes, size))
+            csv_file.readline()
+            end = min(csv_file.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def plan_shards(paths, shard_bytes):
+    """One task per shard: (shard id, path, format, byte range or row group)."""
+    shards = []
+    for path in paths:
+        # the path hash keeps parts of same-named files in different directories apart
+        path_hash = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:8]
+        stem = f"{os.path.splitext(os.path.basename(path))[0]}-{path_hash}"
+        if path.endswith(".parquet"):
+            parts = range(pq.ParquetFile(path).num_row_groups)
+            fmt = "parquet"
+        elif path.endswith(".csv"):
+            parts = csv_shards(path, shard_bytes)
+            fmt = "csv"
+        else:
+            raise ValueError(f"Unsupported input file (expected .csv or .parquet): {path}")
+        shards.extend((f"{stem}-{i:05d}", path, fmt, part) for i, part in enumerate(parts))
+    return shards
+
+
+def read_shard(path, fmt, part):
+    if fmt == "parquet":
+        return pq.ParquetFile(path).read_row_group(part).to_pandas()
+    start, end = part
+    with open(path, "rb") as csv_file:
+        header = csv_file.readline()
+        csv_file.seek(start)
+        body = csv_file.read(end - start)
+    return pd.read_csv(io.BytesIO(header + body), dtype={"TANGGAL": str, "DDD_CAR": str})
+
+
+def score_shard(task):
+    """Score one shard and write <output_dir>/<shard id>.parquet; returns the number of rows."""
+    shard_id, path, fmt, part, output_dir = task
+    frame = read_shard(path, fmt, part).reset_index(drop=True)
+    features, invalid = _worker["cleaner"].build_features(frame)
+    valid = ~invalid.to_numpy().any(axis=1)
+
+    predicted = np.full(len(frame), -1, dtype=np.int8)
+    probability = np.full(len(frame), np.nan)
+    if valid.any():
+        classes, positive = _worker["predictor"].score(features[valid])
+        predicted[valid] = classes
+        probability[valid] = positive
+    frame["predicted_class"] = predicted
+    frame["probability"] = probability
+    frame["valid"] = valid
+
+    out_path = os.path.join(output_dir, f"{shard_id}.parquet")
+    # written under a temporary name so an interrupted run never leaves a part that looks finished
+    frame.to_parquet(out_path + ".inprogress", index=False)
+    os.replace(out_path + ".inprogress", out_path)
+    return len(frame)
+
+
+def _prepare_output(output_dir, manifest):
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    try:
+        with open(manifest_path, "r") as manifest_file:
+            previous = json.load(manifest_file)
+    except FileNotFoundError:
+        previous = None
+    if previous != manifest:
+        # parts from another model or sharding cannot be reused
+        for entry in os.listdir(output_dir):
+            if entry.endswith((".parquet", ".inprogress")):
+                os.remove(os.path.join(output_dir, entry))
+        with open(manifest_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+
+def score_files(paths, output_dir, model_path, n_jobs=-1, shard_mb=64):
+    """Score every input file into output_dir; returns a summary with rows/sec of this run."""
+    shard_bytes = int(shard_mb * 2**20)
+    manifest = {"model": _file_hash(model_path)[:16], "shard_bytes": shard_bytes}
+    _prepare_output(output_dir, manifest)
+
+    shards = plan_shards(paths, shard_bytes)
+    pending = [
+        (shard_id, path, fmt, part, output_dir)
+        for shard_id, path, fmt, part in shards
+        if not os.path.exists(os.path.join(output_dir, f"{shard_id}.parquet"))
+    ]
+
+    start = time.perf_counter()
+    n_rows = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=n_workers(n_jobs, len(pending)), initializer=_init_worker, initargs=(model_path,)) as pool:
+            for rows in pool.map(score_shard, pending):
+                n_rows += rows
+    elapsed = time.perf_counter() - start
+    return {
+        "shards": len(shards),
+        "scored_shards": len(pending),
+        "skipped_shards": len(shards) - len(pending),
+        "rows": n_rows,
+        "seconds": elapsed,
+        "rows_per_sec": n_rows / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def expand_inputs(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise FileNotFoundError(f"No input files match {pattern}")
+        paths.extend(matches)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="CSV/Parquet files or glob patterns")
+    parser.add_argument("--output", default="data/scores")
+    parser.add_argument("--model", default="models/model.pkl")
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--shard-mb", type=float, default=64, help="CSV bytes per shard (Parquet shards are row groups)")
+    parser.add_argument("--fresh", action="store_true", help="discard existing parts instead of resuming")
+    args = parser.parse_args()
+
+    if args.fresh:
+        shutil.rmtree(args.output, ignore_errors=True)
+    summary = score_files(expand_inputs(args.inputs), args.output, args.model, args.jobs, args.shard_mb)
+    print(
+        f"Scored {summary['rows']} rows in {summary['seconds']:.1f}s ({summary['rows_per_sec']:.0f} rows/s), "
+        f"shards: {summary['scored_shards']} scored, {summary['skipped_shards']} already done"
+    )
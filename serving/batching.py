@@ -0,0 +1,146 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """Raised when the batching queue is at capacity and the request should be rejected."""
+
+
+class MicroBatcher:
+    """
+    Dynamic batching for single-row requests.
+    - Queues rows submitted by concurrent requests
+    - Coalesces them up to max_batch_size rows or max_wait_ms after the first row
+    - Scores each batch with one score_fn call in a worker thread
+    - Fans results back out to the awaiting requests
+    - stop() lets the worker finish the batch in flight and drain the queue before it returns
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_ms=5.0, max_queue_size=1024):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.queue = None
+        self.executor = None
+        self.worker = None
+        self._stopping = False
+        self._batch = []
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+        self.errors = 0
+        self.last_batch_size = 0
+        self.max_batch_seen = 0
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._stopping = False
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batcher")
+        self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.worker is not None:
+            # let the worker score what it already took and what is still queued: cancelling it would leave
+            # the requests of the batch in flight waiting forever
+            self._stopping = True
+            try:
+                # wakes a worker waiting on an empty queue; a full queue means it is not waiting
+                self.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+            await self.worker
+            self.worker = None
+        while self.queue is not None and not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item is not None and not item[1].done():
+                item[1].set_exception(RuntimeError("batcher stopped"))
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    async def submit(self, row):
+        """Queue one row and wait for its result."""
+        if self._stopping:
+            raise RuntimeError("batcher stopped")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((row, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(f"batching queue is full ({self.max_queue_size} rows)")
+        return await future
+
+    async def _collect(self):
+        # rows are gathered into self._batch so they can still be failed if the worker is cancelled mid-collection
+        self._batch = batch = []
+        item = await self.queue.get()
+        if item is None:
+            return batch
+        batch.append(item)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self.queue.empty():
+                item = self.queue.get_nowait()
+            else:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                break
+            batch.append(item)
+        return batch
+
+    def _fail_batch(self, error):
+        for _, future in self._batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while not (self._stopping and self.queue.empty()):
+                batch = await self._collect()
+                if not batch:
+                    continue
+                rows = [row for row, _ in batch]
+                try:
+                    results = await loop.run_in_executor(self.executor, self.score_fn, rows)
+                except Exception as e:
+                    self.errors += 1
+                    self._fail_batch(e)
+                    continue
+
+                self.batches += 1
+                self.rows += len(batch)
+                self.last_batch_size = len(batch)
+                self.max_batch_seen = max(self.max_batch_seen, len(batch))
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        except asyncio.CancelledError:
+            # e.g. the event loop shutting down: the rows taken off the queue must not wait forever
+            self._fail_batch(RuntimeError("batcher stopped"))
+            raise
+        finally:
+            self._batch = []
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_seen": self.max_batch_seen,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
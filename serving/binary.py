@@ -0,0 +1,225 @@
+"""
+Length-prefixed binary prediction protocol served next to the JSON API.
+
+Every message is a little-endian uint32 payload length followed by the payload.
+
+Request payload:  uint16 protocol version, uint32 n_rows, then n_rows packed ROW_DTYPE records
+                  (TANGGAL as 10 ASCII bytes, TN ... FF_AVG as float64, DDD_CAR as 2 ASCII bytes)
+Response payload: uint8 status, uint32 n_rows, uint16 text length, text (model version when the
+                  status is OK, error message otherwise), then n_rows RESULT_DTYPE records
+
+A connection carries any number of requests; responses come back in request order, so a client can
+keep several frames in flight (see BinaryClient.stream).
+"""
+import asyncio
+import socket
+import struct
+
+import numpy as np
+
+PROTOCOL_VERSION = 1
+NUMERIC_FIELDS = ("TN", "TX", "TAVG", "RH_AVG", "SS", "FF_X", "DDD_X", "FF_AVG")
+ROW_DTYPE = np.dtype([("TANGGAL", "S10"), ("values", "<f8", (len(NUMERIC_FIELDS),)), ("DDD_CAR", "S2")])
+RESULT_DTYPE = np.dtype([("predicted_class", "i1"), ("probability", "<f8"), ("error", "u1")])
+
+LENGTH = struct.Struct("<I")
+REQUEST_HEADER = struct.Struct("<HI")
+RESPONSE_HEADER = struct.Struct("<BIH")
+
+STATUS_OK = 0
+STATUS_BAD_REQUEST = 1
+STATUS_NOT_READY = 2
+STATUS_TOO_MANY_ROWS = 3
+STATUS_INTERNAL_ERROR = 4
+
+# per-row error codes in RESULT_DTYPE["error"]; rows with an error have predicted_class -1
+ROW_OK = 0
+ROW_BAD_DATE = 1
+ROW_ERRORS = {ROW_BAD_DATE: "TANGGAL harus format DD-MM-YYYY"}
+
+MAX_FRAME_BYTES = 64 * 2**20
+
+
+class FrameError(Exception):
+    """Rejects a whole request frame with a protocol status and a message for the client."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def pack_rows(rows):
+    """ROW_DTYPE array from InputData-shaped dicts (TANGGAL, TN ... FF_AVG, DDD_CAR)."""
+    packed = np.zeros(len(rows), dtype=ROW_DTYPE)
+    packed["TANGGAL"] = [row["TANGGAL"].encode("ascii", "replace") for row in rows]
+    packed["values"] = [[row[name] for name in NUMERIC_FIELDS] for row in rows]
+    packed["DDD_CAR"] = [row["DDD_CAR"].encode("ascii", "replace") for row in rows]
+    return packed
+
+
+def encode_request(rows):
+    """One request message (length prefix included) for a ROW_DTYPE array or a list of dicts."""
+    if not isinstance(rows, np.ndarray):
+        rows = pack_rows(rows)
+    body = np.ascontiguousarray(rows, dtype=ROW_DTYPE).tobytes()
+    return LENGTH.pack(REQUEST_HEADER.size + len(body)) + REQUEST_HEADER.pack(PROTOCOL_VERSION, len(rows)) + body
+
+
+def decode_request(payload):
+    """ROW_DTYPE view over a request payload; raises FrameError when it is malformed."""
+    if len(payload) < REQUEST_HEADER.size:
+        raise FrameError(STATUS_BAD_REQUEST, "Frame tidak valid: header terlalu pendek")
+    version, n_rows = REQUEST_HEADER.unpack_from(payload)
+    if version != PROTOCOL_VERSION:
+        raise FrameError(STATUS_BAD_REQUEST, f"Versi protokol tidak didukung: {version}")
+    if len(payload) != REQUEST_HEADER.size + n_rows * ROW_DTYPE.itemsize:
+        raise FrameError(STATUS_BAD_REQUEST, "Frame tidak valid: panjang tidak sesuai jumlah baris")
+    return np.frombuffer(payload, dtype=ROW_DTYPE, count=n_rows, offset=REQUEST_HEADER.size)
+
+
+def encode_response(status, text, results=None):
+    results = np.zeros(0, dtype=RESULT_DTYPE) if results is None else np.ascontiguousarray(results, dtype=RESULT_DTYPE)
+    text = str(text if text is not None else "").encode("utf-8")
+    payload = RESPONSE_HEADER.pack(status, len(results), len(text)) + text + results.tobytes()
+    return LENGTH.pack(len(payload)) + payload
+
+
+def decode_response(payload):
+    """(status, text, RESULT_DTYPE array) from a response payload."""
+    status, n_rows, text_length = RESPONSE_HEADER.unpack_from(payload)
+    offset = RESPONSE_HEADER.size
+    text = payload[offset:offset + text_length].decode("utf-8")
+    results = np.frombuffer(payload, dtype=RESULT_DTYPE, count=n_rows, offset=offset + text_length)
+    return status, text, results
+
+
+class BinaryPredictionServer:
+    """
+    asyncio server for the binary protocol.
+    - handler(rows) is awaited with the ROW_DTYPE array of one frame and returns (model version, results)
+    - Frames are handled in order per connection; malformed frames get an error response and the
+      connection stays usable (scoring failures answer with STATUS_INTERNAL_ERROR), an oversized
+      length prefix closes it
+    - reuse_port lets every uvicorn worker bind the same port
+    """
+
+    def __init__(self, handler, host="127.0.0.1", port=8500, max_rows=10000, requests=None, latency=None):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.max_rows = max_rows
+        self.requests = requests
+        self.latency = latency
+        self.server = None
+        self.connections = set()
+        self.frames = 0
+        self.rows = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, self.host, self.port, reuse_port=True)
+        # port 0 picks a free port
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server is None:
+            return
+        self.server.close()
+        for task in list(self.connections):
+            task.cancel()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        await self.server.wait_closed()
+        self.server = None
+
+    async def _serve(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                try:
+                    (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+                    if length > MAX_FRAME_BYTES:
+                        writer.write(encode_response(STATUS_BAD_REQUEST, f"Frame melebihi {MAX_FRAME_BYTES} byte"))
+                        await writer.drain()
+                        return
+                    payload = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    return
+                writer.write(await self._handle(payload))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    async def _handle(self, payload):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            rows = decode_request(payload)
+            if len(rows) > self.max_rows:
+                raise FrameError(STATUS_TOO_MANY_ROWS, f"Maksimal {self.max_rows} baris per request")
+            version, results = await self.handler(rows)
+            response = encode_response(STATUS_OK, version, results)
+            status = STATUS_OK
+            self.frames += 1
+            self.rows += len(rows)
+        except FrameError as e:
+            response = encode_response(e.status, e.message)
+            status = e.status
+        except Exception as e:
+            # a scoring failure answers this frame with an error; the connection stays usable
+            response = encode_response(STATUS_INTERNAL_ERROR, f"Gagal memprediksi: {e}")
+            status = STATUS_INTERNAL_ERROR
+        if self.requests is not None:
+            self.requests.inc(status=str(status))
+        if self.latency is not None:
+            self.latency.observe(loop.time() - start)
+        return response
+
+    def stats(self):
+        return {"port": self.port, "connections": len(self.connections), "frames": self.frames, "rows": self.rows}
+
+
+class BinaryClient:
+    """Blocking client for the binary protocol (tests and benchmarks.protocols)."""
+
+    def __init__(self, host="127.0.0.1", port=8500, timeout=30.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream_file = self.sock.makefile("rb")
+
+    def close(self):
+        self.stream_file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_response(self):
+        header = self.stream_file.read(LENGTH.size)
+        if len(header) < LENGTH.size:
+            raise ConnectionError("server closed the connection")
+        (length,) = LENGTH.unpack(header)
+        return decode_response(self.stream_file.read(length))
+
+    def predict(self, rows):
+        """Send one frame and wait for (status, text, results)."""
+        self.sock.sendall(encode_request(rows))
+        return self._read_response()
+
+    def stream(self, chunks, window=4):
+        """Send frames with up to window of them in flight; yields one response per chunk, in order."""
+        in_flight = 0
+        for chunk in chunks:
+            if in_flight == window:
+                yield self._read_response()
+                in_flight -= 1
+            self.sock.sendall(encode_request(chunk))
+            in_flight += 1
+        for _ in range(in_flight):
+            yield self._read_response()
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Bounded LRU + TTL cache of model outputs keyed on the canonical feature vector.
+    - Entries older than ttl_seconds are treated as misses and dropped
+    - The least recently used entry is evicted once max_size is reached
+    - Everything is invalidated when the model file changes on disk or the model version changes
+    """
+
+    def __init__(self, feature_cols, max_size=10000, ttl_seconds=300, model_path=None, check_interval=1.0, clock=time.monotonic):
+        self.feature_cols = list(feature_cols)
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.model_path = model_path
+        self.check_interval = check_interval
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.model_version = None
+        self.model_signature = self._model_signature()
+        self.last_check = self.clock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key(self, features):
+        """Canonical key: feature values in training column order."""
+        return tuple(features[col] for col in self.feature_cols)
+
+    def _model_signature(self):
+        if self.model_path is None:
+            return None
+        try:
+            stat = os.stat(self.model_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _check_model(self, now):
+        if now - self.last_check < self.check_interval:
+            return
+        self.last_check = now
+        signature = self._model_signature()
+        if signature != self.model_signature:
+            self.model_signature = signature
+            self._clear()
+
+    def _clear(self):
+        self.entries.clear()
+        self.invalidations += 1
+
+    def set_model_version(self, version):
+        with self.lock:
+            if version != self.model_version:
+                self.model_version = version
+                self._clear()
+
+    def invalidate(self):
+        with self.lock:
+            self._clear()
+
+    def get(self, key):
+        now = self.clock()
+        with self.lock:
+            self._check_model(now)
+            entry = self.entries.get(key)
+            if entry is None or now - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        now = self.clock()
+        with self.lock:
+            self.entries[key] = (now, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,262 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Parquet column types of the fields written by app._log_record; other fields (features) are inferred
+LOG_FIELD_TYPES = {
+    "timestamp": "float64",
+    "model_version": "int64",
+    "prediction": "int64",
+    "probability": "float64",
+    "latency_ms": "float64",
+    "DDD_CAR": "string",
+}
+
+
+class PredictionLogger:
+    """
+    Non-blocking prediction log for the API.
+    - log() appends a record to a bounded in-memory ring buffer and never waits on I/O
+    - When the buffer is full new records are dropped (and counted) instead of slowing requests down
+    - A background task drains the buffer every flush_interval_ms (or once batch_size records are waiting)
+      and writes each batch from a worker thread
+    - Output rotates every rotate_rows records into NDJSON or Parquet files; NDJSON is fsynced every
+      fsync_every batches, Parquet files are fsynced and finalized (renamed from .inprogress) when they rotate
+    - A batch whose write fails goes back to the head of the buffer (as far as max_buffer allows) and is
+      retried on the next flush; after max_retries failed attempts in a row it is logged and counted as lost
+    - A Parquet file keeps the schema of its first batch: fields missing from a later record are written
+      as null and fields the first batch did not have are left out
+    """
+
+    def __init__(
+        self,
+        directory,
+        fmt="ndjson",
+        max_buffer=10000,
+        batch_size=1000,
+        flush_interval_ms=1000,
+        rotate_rows=100000,
+        fsync_every=10,
+        max_retries=3,
+    ):
+        if fmt not in ("ndjson", "parquet"):
+            raise ValueError(f"Unknown prediction log format: {fmt}")
+        self.directory = directory
+        self.fmt = fmt
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.rotate_rows = rotate_rows
+        self.fsync_every = fsync_every
+        self.max_retries = max_retries
+        self.buffer = deque()
+        self.executor = None
+        self.worker = None
+        self._wakeup = None
+        self._stopping = False
+        self._file = None
+        self._writer = None
+        self._path = None
+        self._file_rows = 0
+        self._unsynced_batches = 0
+        self._sequence = 0
+        self._failures = 0
+        self.logged = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.files = 0
+        self.errors = 0
+        self.lost = 0
+
+    async def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prediction-logger")
+        self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.worker is not None:
+            # let the worker drain the buffer itself: cancelling it could drop a batch already taken from the buffer
+            self._stopping = True
+            self._wakeup.set()
+            await self.worker
+            self.worker = None
+        if self.executor is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self._close_file)
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def log(self, record):
+        """Queue one record; returns False if it was dropped because the buffer is full."""
+        return self.log_many([record]) == 1
+
+    def log_many(self, records):
+        """Queue several records; returns how many were accepted."""
+        free = self.max_buffer - len(self.buffer)
+        accepted = records[:max(free, 0)]
+        self.buffer.extend(accepted)
+        self.logged += len(accepted)
+        self.dropped += len(records) - len(accepted)
+        if self._wakeup is not None and len(self.buffer) >= self.batch_size:
+            self._wakeup.set()
+        return len(accepted)
+
+    def _drain(self, n):
+        return [self.buffer.popleft() for _ in range(min(n, len(self.buffer)))]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self.buffer:
+                batch = self._drain(self.batch_size)
+                try:
+                    await loop.run_in_executor(self.executor, self._write_batch, batch)
+                    self._failures = 0
+                except Exception:
+                    self.errors += 1
+                    self._failures += 1
+                    if self._failures > self.max_retries:
+                        logging.exception(f"Writing prediction logs to {self.directory} failed, {len(batch)} records lost")
+                        self.lost += len(batch)
+                        self._failures = 0
+                        continue
+                    requeued = self._requeue(batch)
+                    logging.exception(
+                        f"Writing prediction logs to {self.directory} failed (attempt {self._failures}), "
+                        f"{requeued} records requeued, {len(batch) - requeued} lost"
+                    )
+                    if not self._stopping:
+                        # a transient disk error gets the flush interval to clear before the retry
+                        break
+            if self._stopping:
+                return
+
+    def _requeue(self, batch):
+        # back to the head of the buffer in order; records beyond max_buffer are lost
+        room = max(self.max_buffer - len(self.buffer), 0)
+        kept = batch[:room]
+        self.buffer.extendleft(reversed(kept))
+        self.lost += len(batch) - len(kept)
+        return len(kept)
+
+    def _open_file(self):
+        self._sequence += 1
+        name = f"predictions-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._sequence:05d}.{self.fmt}"
+        self._path = os.path.join(self.directory, name)
+        if self.fmt == "ndjson":
+            self._file = open(self._path, "a", encoding="utf-8")
+        self._file_rows = 0
+        self.files += 1
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            with open(self._path + ".inprogress", "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(self._path + ".inprogress", self._path)
+        self._path = None
+        self._unsynced_batches = 0
+
+    def _write_batch(self, batch):
+        while batch:
+            if self._path is None:
+                self._open_file()
+            part = batch[:self.rotate_rows - self._file_rows]
+            batch = batch[len(part):]
+            if self.fmt == "ndjson":
+                self._file.write("".join(json.dumps(record) + "\n" for record in part))
+                self._unsynced_batches += 1
+                if self._unsynced_batches >= self.fsync_every:
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self._unsynced_batches = 0
+            else:
+                self._write_parquet(part)
+            self._file_rows += len(part)
+            self.written += len(part)
+            self.batches += 1
+            if self._file_rows >= self.rotate_rows:
+                self._close_file()
+
+    def _write_parquet(self, records):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._path + ".inprogress", _log_schema(records))
+        # every batch is cast to the file's schema, so a column that is all null in one batch still fits
+        schema = self._writer.schema
+        columns = {}
+        for field in schema:
+            values = [record.get(field.name) for record in records]
+            if pa.types.is_string(field.type):
+                values = [None if value is None else str(value) for value in values]
+            columns[field.name] = values
+        self._writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+
+    def stats(self):
+        return {
+            "format": self.fmt,
+            "buffered": len(self.buffer),
+            "max_buffer": self.max_buffer,
+            "logged": self.logged,
+            "dropped": self.dropped,
+            "written": self.written,
+            "batches": self.batches,
+            "files": self.files,
+            "errors": self.errors,
+            "lost": self.lost,
+        }
+
+
+def _log_schema(records):
+    """Parquet schema for a log file from the fields of its first batch."""
+    import pyarrow as pa
+
+    fields = []
+    for name in records[0]:
+        type_name = LOG_FIELD_TYPES.get(name)
+        if type_name is None:
+            value = next((record[name] for record in records if record.get(name) is not None), None)
+            if isinstance(value, str):
+                type_name = "string"
+            elif isinstance(value, bool):
+                type_name = "bool"
+            else:
+                # numeric features (an integer-valued first batch may be followed by floats),
+                # and columns that are all null in the first batch
+                type_name = "float64"
+        fields.append((name, pa.type_for_alias(type_name)))
+    return pa.schema(fields)
+
+
+def read_prediction_logs(directory) -> pd.DataFrame:
+    """Load every finished prediction log file (NDJSON and Parquet) in a directory, oldest first."""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, "predictions-*"))):
+        if path.endswith(".ndjson") and os.path.getsize(path) > 0:
+            frames.append(pd.read_json(path, lines=True, dtype={"DDD_CAR": str}, convert_dates=False))
+        elif path.endswith(".parquet"):
+            frames.append(pd.read_parquet(path))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
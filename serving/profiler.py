@@ -0,0 +1,75 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler for deep dives on a live server.
+    - A daemon thread samples the stacks of all other threads every interval_ms
+    - Stacks are aggregated in collapsed "outer;...;inner count" form (flamegraph.pl / speedscope input)
+    - Nothing runs until start(); stop() keeps the samples for report()
+    """
+
+    def __init__(self, interval_ms=5.0, max_depth=64):
+        self.interval = interval_ms / 1000.0
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self.n_samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self.running:
+            return
+        with self._lock:
+            self.samples.clear()
+            self.n_samples = 0
+        self._stop.clear()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.duration = time.perf_counter() - self.started_at
+
+    def _stack(self, frame):
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            stacks = [self._stack(frame) for thread_id, frame in sys._current_frames().items() if thread_id != own_id]
+            with self._lock:
+                self.samples.update(stacks)
+                self.n_samples += 1
+
+    def report(self, top=50):
+        with self._lock:
+            stacks = self.samples.most_common(top)
+            n_samples = self.n_samples
+        return {
+            "running": self.running,
+            "n_samples": n_samples,
+            "interval_ms": self.interval * 1000.0,
+            "duration_seconds": self.duration if not self.running else time.perf_counter() - self.started_at,
+            "collapsed": "\n".join(f"{stack} {count}" for stack, count in stacks),
+        }
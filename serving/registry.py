@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+import threading
+import time
+import pandas as pd
+
+from steps.compile import CompiledModel, resolve_current
+
+
+class LoadedModel:
+    """A loaded model together with the version and location it came from."""
+
+    def __init__(self, model, version, source, loaded_at):
+        self.model = model
+        self.version = version
+        self.source = source
+        self.loaded_at = loaded_at
+
+
+class FileModelSource:
+    """Local model.pkl / compiled directory; the version is bumped whenever the file changes on disk."""
+
+    def __init__(self, path, load_fn):
+        self.path = path
+        self.load_fn = load_fn
+        self._version = 0
+        self._loaded_signature = None
+        self._pending_signature = None
+
+    def _signature(self):
+        path = os.path.join(self.path, "meta.json") if os.path.isdir(self.path) else self.path
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def latest(self):
+        self._pending_signature = self._signature()
+        return self._version if self._pending_signature == self._loaded_signature else self._version + 1
+
+    def load(self, version):
+        model = self.load_fn()
+        self._version, self._loaded_signature = version, self._pending_signature
+        return model, self.path
+
+
+class CompiledModelSource:
+    """
+    Published CompiledModel versions under a root directory (see CompiledModel.publish).
+    Arrays are memory-mapped, so every worker on the host shares one copy through the page cache;
+    the version is the one root/CURRENT points to.
+    """
+
+    def __init__(self, root, mmap_mode="r"):
+        self.root = root
+        self.mmap_mode = mmap_mode
+
+    def latest(self):
+        version, _ = resolve_current(self.root)
+        if version is None:
+            raise LookupError(f"No published compiled model under {self.root}")
+        return version
+
+    def load(self, version):
+        path = os.path.join(self.root, f"v{version}")
+        return CompiledModel.load(path, mmap_mode=self.mmap_mode), path
+
+
+class RegistryModelSource:
+    """Registered model in a local MLflow store, resolved by name and optional stage (else the newest version)."""
+
+    def __init__(self, name, stage=None, tracking_uri=None):
+        self.name = name
+        self.stage = stage
+        self.tracking_uri = tracking_uri
+
+    def _client(self):
+        from mlflow.tracking import MlflowClient
+
+        return MlflowClient(tracking_uri=self.tracking_uri, registry_uri=self.tracking_uri)
+
+    def latest(self):
+        client = self._client()
+        if self.stage:
+            versions = client.get_latest_versions(self.name, stages=[self.stage])
+        else:
+            versions = client.search_model_versions(f"name='{self.name}'")
+        if not versions:
+            raise LookupError(f"No version of {self.name} found (stage={self.stage})")
+        return max(int(v.version) for v in versions)
+
+    def load(self, version):
+        import mlflow.sklearn
+
+        # resolve through the client so the process-wide MLflow tracking URI is left untouched
+        artifact_uri = self._client().get_model_version_download_uri(self.name, str(version))
+        return mlflow.sklearn.load_model(artifact_uri), f"models:/{self.name}/{version}"
+
+
+def load_warmup_rows(path, cleaner):
+    """Feature rows for warming up a freshly loaded model (raw samples.json rows -> model features)."""
+    with open(path, "r") as samples_file:
+        samples = pd.DataFrame(json.load(samples_file))
+    features, invalid = cleaner.build_features(samples)
+    return features[~invalid.to_numpy().any(axis=1)]
+
+
+class ModelManager:
+    """
+    Holds the serving model and swaps in new versions without a restart.
+    - current is replaced with a single reference assignment, so requests that already read it
+      finish on the old model while new requests get the new one
+    - check() resolves the latest version, loads and warms it up off the request path, then swaps
+    - start() polls check() every poll_interval seconds from a daemon thread
+    - A failed load or warm-up keeps the current model and is reported in stats()
+    """
+
+    def __init__(self, source, warmup_rows=None, poll_interval=30.0, on_swap=None):
+        self.source = source
+        self.warmup_rows = warmup_rows
+        self.poll_interval = poll_interval
+        self.on_swap = on_swap
+        self.current = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load_initial(self):
+        if not self.check():
+            raise RuntimeError(f"Failed to load model: {self.last_error}")
+        return self.current
+
+    def check(self):
+        """Load and swap in a newer version if there is one; returns True if a swap happened."""
+        with self._lock:
+            try:
+                version = self.source.latest()
+                if self.current is not None and version == self.current.version:
+                    return False
+                model, location = self.source.load(version)
+                if self.warmup_rows is not None and len(self.warmup_rows):
+                    model.predict_proba(self.warmup_rows)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                logging.warning(f"Model reload failed: {self.last_error}")
+                return False
+
+            self.current = LoadedModel(model, version, location, time.time())
+            self.reloads += 1
+            self.last_error = None
+        if self.on_swap is not None:
+            self.on_swap(self.current)
+        logging.info(f"Serving model version {version} from {location}")
+        return True
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="model-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+    def stats(self):
+        current = self.current
+        return {
+            "version": current.version if current else None,
+            "source": current.source if current else None,
+            "loaded_at": current.loaded_at if current else None,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
@@ -1,6 +1,58 @@
+import os
+
 import numpy as np
 import pandas as pd
 
+DATE_FORMAT = "%d-%m-%Y"
+DATE_CACHE_SIZE = 1 << 16
+# TANGGAL string -> (Month, Day), or None for an invalid date; shared by training, batch and API paths
+_date_cache = {}
+
+
+def _remember_dates(items):
+    if len(_date_cache) + len(items) > DATE_CACHE_SIZE:
+        _date_cache.clear()
+    _date_cache.update(items)
+
+
+def decode_date(value):
+    """(Month, Day) of one DD-MM-YYYY string, or None if it is not a valid date."""
+    try:
+        return _date_cache[value]
+    except (KeyError, TypeError):
+        pass
+    # same parser as decode_dates, so a string decodes the same whichever path cached it first
+    month, day = decode_dates([value])
+    return None if np.isnan(month[0]) else (int(month[0]), int(day[0]))
+
+
+def decode_dates(values):
+    """
+    Month and Day float arrays (NaN where invalid) for an array of DD-MM-YYYY strings.
+    Each distinct string is decoded once; strings not yet cached are parsed in one vectorized call.
+    """
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    # one extra NaN row at the end so missing values (code -1) index into it
+    month_day = np.full((len(uniques) + 1, 2), np.nan)
+    misses = []
+    for i, value in enumerate(uniques):
+        cached = _date_cache.get(value, False) if isinstance(value, str) else None
+        if cached is False:
+            misses.append(i)
+        elif cached is not None:
+            month_day[i] = cached
+    if misses:
+        missed = uniques[misses]
+        parsed = pd.DatetimeIndex(pd.to_datetime(pd.Index(missed, dtype=object).astype(str), format=DATE_FORMAT, errors="coerce"))
+        decoded = np.column_stack([parsed.month, parsed.day]).astype(np.float64)
+        month_day[misses] = decoded
+        _remember_dates({
+            value: None if np.isnan(month) else (int(month), int(day))
+            for value, (month, day) in zip(missed, decoded) if isinstance(value, str)
+        })
+    decoded = month_day[codes]
+    return decoded[:, 0], decoded[:, 1]
+
 
 class Cleaner:
     """
@@ -11,46 +63,106 @@ class Cleaner:
     - Creates binary rain label from RR and drops RR to avoid leakage
     """
 
+    numeric_input_cols = ["TN", "TX", "TAVG", "RH_AVG", "SS", "FF_X", "DDD_X", "FF_AVG"]
+    raw_feature_cols = ["TANGGAL"] + numeric_input_cols + ["DDD_CAR"]
+    feature_cols = numeric_input_cols + ["Month", "Day", "DDD_CAR"]
+
     def __init__(self):
         self.sentinel_missing = {8888, 9999}
 
-    def _prepare_numeric(self, df: pd.DataFrame, cols):
-        """Cast to float and replace sentinel values with NaN."""
-        for col in cols:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-            df[col] = df[col].replace(list(self.sentinel_missing), np.nan)
-        return df
+    def _prepare_numeric(self, df: pd.DataFrame, cols) -> np.ndarray:
+        """Cast the numeric block into one 2-D float array and mask sentinel values with a single np.isin pass."""
+        columns = [df[col] for col in cols]
+        if not all(pd.api.types.is_numeric_dtype(c.dtype) and not pd.api.types.is_bool_dtype(c.dtype) for c in columns):
+            columns = [pd.to_numeric(c, errors="coerce") for c in columns]
+        # column-major so every column (and the DataFrame built on top) is a contiguous view, not a copy
+        values = np.empty((len(df), len(cols)), dtype=np.result_type(np.float32, *(c.dtype for c in columns)), order="F")
+        for i, column in enumerate(columns):
+            values[:, i] = column.to_numpy()
+        flat = values.reshape(-1, order="F")  # a view: np.isin would otherwise ravel into a C-order copy
+        flat[np.isin(flat, list(self.sentinel_missing))] = np.nan
+        return values
+
+    def build_features(self, data: pd.DataFrame):
+        """
+        Build the model feature frame from raw inference rows (TANGGAL ... DDD_CAR, no RR).
+        Returns the features in canonical order and a boolean frame flagging invalid fields per row.
+        Values are passed through as-is (no sentinel replacement), matching the single-row API.
+        """
+        missing = [c for c in self.raw_feature_cols if c not in data.columns]
+        if missing:
+            raise ValueError(f"Input data missing required columns: {missing}")
+
+        month, day = decode_dates(data["TANGGAL"].to_numpy())
+        features = pd.DataFrame(index=data.index)
+        invalid = pd.DataFrame(index=data.index)
+        invalid["TANGGAL"] = np.isnan(month)
+
+        for col in self.numeric_input_cols:
+            values = pd.to_numeric(data[col], errors="coerce")
+            invalid[col] = values.isna().to_numpy()
+            features[col] = values.astype(float)
+        features["Month"] = month
+        features["Day"] = day
+
+        ddd_car = data["DDD_CAR"]
+        invalid["DDD_CAR"] = ~ddd_car.map(lambda v: isinstance(v, str) and v != "").to_numpy(dtype=bool)
+        features["DDD_CAR"] = ddd_car.astype(object)
+
+        return features[self.feature_cols], invalid
 
     def clean_data(self, data: pd.DataFrame) -> pd.DataFrame:
-        df = data.copy()
+        # The input frame is never modified, so no defensive copy is needed (streamed chunks are cleaned as-is)
 
         # If already preprocessed (no TANGGAL, already has Month/Day and Rain), return in canonical order
         already_cleaned_cols = ["TN", "TX", "TAVG", "RH_AVG", "SS", "FF_X", "DDD_X", "FF_AVG", "Month", "Day", "DDD_CAR", "Rain"]
-        if "TANGGAL" not in df.columns:
-            missing = [c for c in already_cleaned_cols if c not in df.columns]
+        if "TANGGAL" not in data.columns:
+            missing = [c for c in already_cleaned_cols if c not in data.columns]
             if missing:
                 raise ValueError(f"Input data missing required columns: {missing}")
-            return df[already_cleaned_cols]
+            return data[already_cleaned_cols]
+
+        # Prepare numeric features: one 2-D array for the measurements plus RR (last column)
+        numeric_cols = self.numeric_input_cols + ["RR"]
+        values = self._prepare_numeric(data, numeric_cols)
 
-        # Parse date
-        df["TANGGAL"] = pd.to_datetime(df["TANGGAL"], format="%d-%m-%Y", errors="coerce")
-        df["Month"] = df["TANGGAL"].dt.month
-        df["Day"] = df["TANGGAL"].dt.day
+        # Build the output directly in canonical order (features, then label last); RR and TANGGAL are left out
+        df = pd.DataFrame(values[:, :-1], columns=self.numeric_input_cols, index=data.index, copy=False)
 
-        # Prepare numeric features
-        numeric_cols = ["TN", "TX", "TAVG", "RH_AVG", "SS", "FF_X", "DDD_X", "FF_AVG", "Month", "Day", "RR"]
-        df = self._prepare_numeric(df, numeric_cols)
+        # Parse date: daily data repeats few distinct dates, so each distinct string is decoded once
+        df["Month"], df["Day"] = decode_dates(data["TANGGAL"].to_numpy())
+        df["DDD_CAR"] = data["DDD_CAR"]
 
         # Create binary rain label from RR (1 if rain > 0 mm else 0, missing treated as 0)
-        df["Rain"] = (df["RR"].fillna(0) > 0).astype(int)
+        df["Rain"] = (values[:, -1] > 0).astype(int)
 
-        # Drop RR to prevent leakage; drop original date string
-        df = df.drop(columns=["RR", "TANGGAL"])
+        return df
 
-        # Ensure label is the last column
-        num_features = ["TN", "TX", "TAVG", "RH_AVG", "SS", "FF_X", "DDD_X", "FF_AVG", "Month", "Day"]
-        cat_features = ["DDD_CAR"]
-        feature_cols = num_features + cat_features
-        df = df[feature_cols + ["Rain"]]
+    def clean_chunks(self, chunks):
+        """Clean an iterable of raw chunks lazily, one chunk in memory at a time."""
+        for chunk in chunks:
+            yield self.clean_data(chunk)
 
-        return df
+    def clean_to_file(self, chunks, output_path: str) -> int:
+        """Stream cleaned chunks to CSV (or Parquet for *.parquet paths) and return the row count."""
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        n_rows = 0
+        writer = None
+        try:
+            for i, chunk in enumerate(self.clean_chunks(chunks)):
+                if output_path.endswith(".parquet"):
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+
+                    chunk = chunk.astype({"DDD_CAR": object})
+                    table = pa.Table.from_pandas(chunk, preserve_index=False, schema=writer.schema if writer else None)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_path, table.schema)
+                    writer.write_table(table)
+                else:
+                    chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+                n_rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return n_rows
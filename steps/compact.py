@@ -0,0 +1,224 @@
+import copy
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.metrics import roc_auc_score
+
+from steps.compile import CompiledModel, compile_pipeline
+
+
+def _positive_column(model):
+    return list(model.classes_).index(1)
+
+
+def _transform(pipeline, X):
+    # samplers such as SMOTE only act during fit
+    for _, step in pipeline.steps[:-1]:
+        if not hasattr(step, "fit_resample"):
+            X = step.transform(X)
+    return X
+
+
+def tree_probabilities(pipeline, X):
+    """P(Rain=1) of every tree of a fitted random forest pipeline, shape (n_trees, n_rows)."""
+    model = pipeline.steps[-1][1]
+    features = _transform(pipeline, X)
+    column = _positive_column(model)
+    return np.stack([tree.predict_proba(features)[:, column] for tree in model.estimators_])
+
+
+def select_trees(tree_proba, y, max_auc_drop=0.001, min_trees=10):
+    """
+    Indices of the trees to keep. Trees are dropped least useful first (by how much ROC AUC the
+    ensemble loses without them) as long as the ensemble stays within max_auc_drop of the full forest.
+    """
+    n_trees = len(tree_proba)
+    total = tree_proba.sum(axis=0)
+    # ROC AUC only depends on the ranking, so the sum stands in for the mean
+    full_auc = roc_auc_score(y, total)
+    loss = np.array([full_auc - roc_auc_score(y, total - proba) for proba in tree_proba])
+    keep = np.ones(n_trees, dtype=bool)
+    for i in np.argsort(loss, kind="stable"):
+        if keep.sum() <= min_trees:
+            break
+        candidate = total - tree_proba[i]
+        if roc_auc_score(y, candidate) >= full_auc - max_auc_drop:
+            keep[i] = False
+            total = candidate
+    return np.flatnonzero(keep)
+
+
+def prune_forest(pipeline, keep):
+    """Copy of a fitted random forest pipeline that only keeps the given trees."""
+    pruned = copy.deepcopy(pipeline)
+    model = pruned.steps[-1][1]
+    model.estimators_ = [model.estimators_[i] for i in keep]
+    model.n_estimators = len(model.estimators_)
+    return pruned
+
+
+def _smallest_int(max_value):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def quantize(compiled, value_dtype="float32"):
+    """
+    Compact copy of a CompiledModel: float32 thresholds, value_dtype leaf probabilities, and feature
+    ids / child indices (relative to each tree's root) in the smallest unsigned type that fits.
+    """
+    arrays = dict(compiled.arrays)
+    threshold = np.asarray(arrays["threshold"], dtype=np.float64)
+    # features reach the trees as float32, so x <= t is the same test as x <= (largest float32 <= t);
+    # rounding to nearest instead could move a threshold above t and flip rows that sit in between
+    compact = threshold.astype(np.float32)
+    above = compact.astype(np.float64) > threshold
+    compact[above] = np.nextafter(compact[above], np.float32(-np.inf))
+    arrays["threshold"] = compact
+
+    roots = np.asarray(arrays["roots"], dtype=np.int64)
+    if compiled.local_children:
+        left, right = arrays["children_left"], arrays["children_right"]
+    else:
+        node_root = roots[np.searchsorted(roots, np.arange(len(threshold)), side="right") - 1]
+        left = np.asarray(arrays["children_left"], dtype=np.int64) - node_root
+        right = np.asarray(arrays["children_right"], dtype=np.int64) - node_root
+    index_dtype = _smallest_int(max(int(left.max()), int(right.max())))
+    arrays["children_left"] = left.astype(index_dtype)
+    arrays["children_right"] = right.astype(index_dtype)
+    arrays["feature"] = np.asarray(arrays["feature"]).astype(_smallest_int(int(arrays["feature"].max())))
+    arrays["value"] = np.asarray(arrays["value"]).astype(value_dtype)
+    arrays["roots"] = roots.astype(np.int32)
+
+    meta = dict(compiled.meta, local_children=True, value_dtype=np.dtype(value_dtype).name)
+    return CompiledModel(arrays, meta)
+
+
+def _directory_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+class ModelCompactor:
+    """
+    Post-training compaction of the fitted pipeline (config.yml compaction section).
+    - Pruning: drops random forest trees with negligible contribution, within max_auc_drop ROC AUC on a
+      selection_fraction of the evaluation rows; the report is measured on the remaining rows
+    - Quantization: compiled NumPy model with float32 thresholds, value_dtype leaves and compact index types
+    - Compression: joblib compression of model.pkl, compressed .npz for the compiled model
+    - Every variant is saved, reloaded and timed: artifact size, load time, single-row and batch latency,
+      ROC AUC delta and agreement with the original on the evaluation rows
+    """
+
+    def __init__(self, compaction_config):
+        self.max_auc_drop = compaction_config.get("max_auc_drop", 0.001)
+        self.min_trees = compaction_config.get("min_trees", 10)
+        self.selection_fraction = compaction_config.get("selection_fraction", 0.5)
+        self.max_rows = compaction_config.get("max_rows", 100000)
+        self.value_dtype = compaction_config.get("value_dtype", "float32")
+        self.compress = compaction_config.get("compress", 3)
+        self.n_latency = compaction_config.get("n_latency", 100)
+        self.random_state = compaction_config.get("random_state", 42)
+
+    def split(self, n_rows):
+        """(selection rows, report rows): trees are chosen on one part and measured on the other."""
+        rows = np.random.default_rng(self.random_state).permutation(n_rows)
+        n_selection = int(n_rows * self.selection_fraction)
+        return np.sort(rows[:min(n_selection, self.max_rows)]), np.sort(rows[n_selection:])
+
+    def prune(self, pipeline, X, y):
+        """(pruned pipeline, kept tree indices); models that are not random forests come back unchanged."""
+        model = pipeline.steps[-1][1]
+        y = np.asarray(y)
+        if type(model).__name__ != "RandomForestClassifier" or len(np.unique(y)) < 2:
+            return pipeline, None
+        keep = select_trees(tree_probabilities(pipeline, X), y, self.max_auc_drop, self.min_trees)
+        return prune_forest(pipeline, keep), keep
+
+    def variants(self, pipeline, pruned):
+        """(name, kind, model, save options) for every operating point that is measured."""
+        variants = [
+            ("original", "pickle", pipeline, {"compress": 0}),
+            ("compressed", "pickle", pipeline, {"compress": self.compress}),
+        ]
+        if pruned is not pipeline:
+            variants.append(("pruned_compressed", "pickle", pruned, {"compress": self.compress}))
+        try:
+            compiled = compile_pipeline(pruned)
+        except ValueError:
+            return variants
+        quantized = quantize(compiled, self.value_dtype)
+        variants += [
+            ("compiled", "compiled", compiled, {"compress": False}),
+            ("compiled_quantized", "compiled", quantized, {"compress": False}),
+            ("compiled_quantized_compressed", "compiled", quantized, {"compress": True}),
+        ]
+        return variants
+
+    def _save(self, kind, model, path, compress):
+        if kind == "pickle":
+            joblib.dump(model, path, compress=compress)
+        else:
+            model.save(path, compress=compress)
+
+    def _load(self, kind, path):
+        return joblib.load(path) if kind == "pickle" else CompiledModel.load(path)
+
+    def measure(self, name, kind, model, options, X, y, reference, workdir):
+        path = os.path.join(workdir, f"{name}.pkl" if kind == "pickle" else name)
+        self._save(kind, model, path, **options)
+        start = time.perf_counter()
+        loaded = self._load(kind, path)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        proba = loaded.predict_proba(X)[:, _positive_column(loaded)]
+        batch_seconds = time.perf_counter() - start
+        row = X.iloc[:1]
+        timings = []
+        for _ in range(self.n_latency):
+            start = time.perf_counter()
+            loaded.predict_proba(row)
+            timings.append(time.perf_counter() - start)
+
+        n_trees = model.meta["n_trees"] if kind == "compiled" else len(getattr(model.steps[-1][1], "estimators_", [None]))
+        roc_auc = roc_auc_score(y, proba) if len(np.unique(y)) > 1 else float("nan")
+        return {
+            "variant": name,
+            "format": kind,
+            "n_trees": int(n_trees),
+            "size_bytes": _directory_size(path),
+            "load_seconds": load_seconds,
+            "single_row_ms": float(np.median(timings) * 1000),
+            "batch_rows_per_sec": len(X) / batch_seconds if batch_seconds > 0 else float("inf"),
+            "roc_auc": roc_auc,
+            "roc_auc_delta": roc_auc - reference["roc_auc"] if reference else 0.0,
+            "max_probability_diff": float(np.abs(proba - reference["proba"]).max()) if reference else 0.0,
+            "agreement": float(np.mean((proba > 0.5) == (reference["proba"] > 0.5))) if reference else 1.0,
+        }, proba
+
+    def run(self, pipeline, X, y):
+        """
+        Prune, quantize and compress the fitted pipeline and measure every variant on (X, y).
+        Returns (report rows, pruned pipeline, quantized compiled model or None).
+        """
+        y = np.asarray(y)
+        selection, measured = self.split(len(X))
+        pruned, _ = self.prune(pipeline, X.iloc[selection], y[selection])
+        X, y = X.iloc[measured], y[measured]
+        report, reference, quantized = [], None, None
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, kind, model, options in self.variants(pipeline, pruned):
+                result, proba = self.measure(name, kind, model, options, X, y, reference, workdir)
+                if reference is None:
+                    reference = {"roc_auc": result["roc_auc"], "proba": proba}
+                if name == "compiled_quantized":
+                    quantized = model
+                report.append(result)
+        return report, pruned, quantized
@@ -0,0 +1,219 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+class CompiledModel:
+    """
+    Array-backed copy of a fitted training pipeline for fast inference.
+    - Numeric block: median imputation vector + StandardScaler mean/scale
+    - DDD_CAR: most-frequent fill value + category lookup table for the one-hot columns (+ unknown column)
+    - Trees: flattened node arrays (feature, threshold, children, leaf values) for all trees
+    SMOTE only acts during fit, so it has no counterpart here; steps.compact.quantize shrinks the node arrays.
+    """
+
+    array_names = [
+        "impute_values", "scale_mean", "scale_scale", "categories",
+        "roots", "feature", "threshold", "children_left", "children_right", "value", "classes",
+    ]
+
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+        self.numeric_features = meta["numeric_features"]
+        self.categorical_feature = meta["categorical_feature"]
+        self.categorical_fill = meta["categorical_fill"]
+        # FeatureEncoder pipelines have an extra column for unknown DDD_CAR codes
+        self.unknown_bucket = meta.get("unknown_bucket", False)
+        self.max_depth = meta["max_depth"]
+        # quantized models store children relative to their tree's root in a small integer type
+        self.local_children = meta.get("local_children", False)
+        for name in self.array_names:
+            setattr(self, name, arrays[name])
+        self.classes_ = self.classes
+
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        """Reproduce the fitted ColumnTransformer output as a dense float32 matrix."""
+        numeric = X[self.numeric_features].to_numpy(dtype=np.float64)
+        numeric = np.where(np.isnan(numeric), self.impute_values, numeric)
+        numeric = (numeric - self.scale_mean) / self.scale_scale
+
+        # SimpleImputer only fills NaN; None falls through to the unknown (all-zero) one-hot row
+        categorical = X[self.categorical_feature].to_numpy(dtype=object)
+        is_missing = pd.isna(categorical)
+        if not self.unknown_bucket:
+            is_missing &= np.not_equal(categorical, None)
+        categorical = np.where(is_missing, self.categorical_fill, categorical)
+        codes = pd.Categorical(categorical, categories=self.categories).codes
+        onehot = np.zeros((len(X), len(self.categories) + self.unknown_bucket), dtype=np.float64)
+        known = codes >= 0
+        onehot[np.flatnonzero(known), codes[known]] = 1.0
+        if self.unknown_bucket:
+            onehot[~known, -1] = 1.0
+
+        # trees compare float32 features against float64 thresholds, exactly like sklearn
+        return np.hstack([numeric, onehot]).astype(np.float32)
+
+    def _tree_proba(self, X: np.ndarray) -> np.ndarray:
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.children_left[node], self.children_right[node])
+            if self.local_children:
+                node = node + self.roots
+        return self.value[node].mean(axis=1, dtype=np.float64)
+
+    def predict_proba(self, X, chunk_size: int = 4096) -> np.ndarray:
+        return self.proba_from_features(self.transform(X), chunk_size)
+
+    def proba_from_features(self, features: np.ndarray, chunk_size: int = 4096) -> np.ndarray:
+        """Tree ensemble probabilities for an already transformed matrix (see transform)."""
+        if len(features) <= chunk_size:
+            return self._tree_proba(features)
+        return np.vstack([self._tree_proba(features[i:i + chunk_size]) for i in range(0, len(features), chunk_size)])
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def save(self, path: str, compress: bool = False):
+        """One .npy file per array (memory-mappable), or a single compressed arrays.npz that load() reads into memory."""
+        os.makedirs(path, exist_ok=True)
+        if compress:
+            np.savez_compressed(os.path.join(path, "arrays.npz"), **{name: self.arrays[name] for name in self.array_names})
+        else:
+            for name in self.array_names:
+                np.save(os.path.join(path, f"{name}.npy"), self.arrays[name], allow_pickle=False)
+        with open(os.path.join(path, "meta.json"), "w") as meta_file:
+            json.dump(self.meta, meta_file, indent=2)
+
+    def publish(self, root: str, keep: int = 3, compress: bool = False) -> str:
+        """
+        Save as the next numbered version under root and atomically point root/CURRENT at it.
+        Older versions beyond keep are removed; workers that still map them keep valid pages
+        because unlinked files stay alive until they are unmapped.
+        """
+        versions = list_versions(root)
+        version = (versions[-1] if versions else 0) + 1
+        path = os.path.join(root, f"v{version}")
+        self.save(path, compress=compress)
+
+        tmp_path = os.path.join(root, "CURRENT.tmp")
+        with open(tmp_path, "w") as current_file:
+            current_file.write(f"v{version}\n")
+        os.replace(tmp_path, os.path.join(root, "CURRENT"))
+
+        for old in versions[:max(len(versions) - (keep - 1), 0)]:
+            shutil.rmtree(os.path.join(root, f"v{old}"), ignore_errors=True)
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap_mode=None):
+        """Load a saved model directory, or the CURRENT version of a published root."""
+        path = resolve_current(path)[1]
+        with open(os.path.join(path, "meta.json"), "r") as meta_file:
+            meta = json.load(meta_file)
+        compressed_path = os.path.join(path, "arrays.npz")
+        if os.path.exists(compressed_path):
+            # compressed arrays cannot be memory-mapped
+            with np.load(compressed_path, allow_pickle=False) as stored:
+                arrays = {name: stored[name] for name in cls.array_names}
+        else:
+            arrays = {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+                for name in cls.array_names
+            }
+        return cls(arrays, meta)
+
+
+def list_versions(root: str):
+    """Published version numbers under root, oldest first."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(int(name[1:]) for name in os.listdir(root) if name[:1] == "v" and name[1:].isdigit())
+
+
+def resolve_current(root: str):
+    """(version, directory) that root/CURRENT points to; a plain saved directory is version None."""
+    try:
+        with open(os.path.join(root, "CURRENT"), "r") as current_file:
+            name = current_file.read().strip()
+    except FileNotFoundError:
+        return None, root
+    return int(name[1:]), os.path.join(root, name)
+
+
+def _flatten_trees(estimators):
+    """Concatenate sklearn tree_ arrays into global node arrays; leaves loop back to themselves."""
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        value = tree.value[:, 0, :]
+        values.append(value / value.sum(axis=1, keepdims=True))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return {
+        "roots": np.asarray(roots, dtype=np.int32),
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "children_left": np.concatenate(lefts).astype(np.int32),
+        "children_right": np.concatenate(rights).astype(np.int32),
+        "value": np.concatenate(values).astype(np.float64),
+    }, max_depth
+
+
+def compile_pipeline(pipeline) -> CompiledModel:
+    """Convert a fitted Trainer pipeline (preprocessor [+ sampler] + tree model) into a CompiledModel."""
+    # imported here so serving a CompiledModel never pulls in sklearn
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.tree import DecisionTreeClassifier
+
+    from steps.encoding import preprocessor_statistics
+
+    steps = [step for _, step in pipeline.steps if not hasattr(step, "fit_resample")]
+    if len(steps) != 2:
+        raise ValueError("Expected a pipeline of preprocessor [+ sampler] + model")
+    preprocessor, model = steps
+    if not hasattr(preprocessor, "transformers_") and not hasattr(preprocessor, "encode_rows"):
+        raise ValueError("Expected a ColumnTransformer or FeatureEncoder preprocessor")
+    stats = preprocessor_statistics(preprocessor)
+
+    if isinstance(model, RandomForestClassifier):
+        estimators = model.estimators_
+    elif isinstance(model, DecisionTreeClassifier):
+        estimators = [model]
+    else:
+        raise ValueError(f"Unsupported model for compilation: {type(model).__name__}")
+
+    tree_arrays, max_depth = _flatten_trees(estimators)
+    arrays = {
+        "impute_values": np.asarray(stats["impute_values"], dtype=np.float64),
+        "scale_mean": np.asarray(stats["scale_mean"], dtype=np.float64),
+        "scale_scale": np.asarray(stats["scale_scale"], dtype=np.float64),
+        "categories": np.asarray(stats["categories"]).astype(str),
+        "classes": np.asarray(model.classes_),
+        **tree_arrays,
+    }
+    meta = {
+        "model": type(model).__name__,
+        "numeric_features": stats["numeric_features"],
+        "categorical_feature": stats["categorical_feature"],
+        "categorical_fill": str(stats["categorical_fill"]),
+        "unknown_bucket": stats["unknown_bucket"],
+        "n_trees": len(estimators),
+        "max_depth": int(max_depth),
+    }
+    return CompiledModel(arrays, meta)
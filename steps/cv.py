@@ -0,0 +1,111 @@
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold, TimeSeriesSplit
+
+from steps.parallel import memmap_pool, n_workers, resample, worker_data
+
+
+def _fit_predict(model_class, params, X_fit, y_fit, X_val):
+    model = model_class(**params)
+    start = time.perf_counter()
+    model.fit(X_fit, y_fit)
+    fit_time = time.perf_counter() - start
+    proba = model.predict_proba(X_val)[:, list(model.classes_).index(1)] if 1 in model.classes_ else np.zeros(len(X_val))
+    return proba, fit_time
+
+
+def _fit_fold_task(task):
+    fold, model_name, params = task
+    X_fit, y_fit, X_val, _ = worker_data["arrays"][fold]
+    proba, fit_time = _fit_predict(worker_data["model_map"][model_name], params, X_fit, y_fit, X_val)
+    return fold, model_name, proba, fit_time
+
+
+class CrossValidator:
+    """
+    k-fold / time-series cross-validation of several models in parallel (config.yml cv section).
+    - The preprocessor (and resampler) is fitted once per fold and its output shared by every model
+    - (fold, model) fits run in a process pool or with joblib, over memory-mapped fold arrays
+    - Out-of-fold probabilities give one pooled ROC AUC per model next to the per-fold scores
+    """
+
+    def __init__(self, trainer, cv_config):
+        self.trainer = trainer
+        self.method = cv_config.get("method", "kfold")
+        self.n_splits = cv_config.get("n_splits", 5)
+        self.backend = cv_config.get("backend", "process")
+        self.n_jobs = cv_config.get("n_jobs", -1)
+        self.random_state = cv_config.get("random_state", 42)
+        models = cv_config.get("models") or {trainer.model_name: trainer.model_params}
+        for model_name in models:
+            if model_name not in trainer.model_map:
+                raise ValueError(f"Unknown model in cv.models: {model_name}")
+        self.models = {name: trainer.model_params_for(name, params) for name, params in models.items()}
+
+    def splits(self, X, y):
+        if self.method == "kfold":
+            return StratifiedKFold(self.n_splits, shuffle=True, random_state=self.random_state).split(X, y)
+        if self.method == "timeseries":
+            # rows are in date order; every fold validates on the block right after its training rows
+            return TimeSeriesSplit(self.n_splits).split(X)
+        raise ValueError(f"Unknown cv method: {self.method}")
+
+    def prepare_folds(self, X, y):
+        folds = []
+        for fit_idx, val_idx in self.splits(X, y):
+            preprocessor = self.trainer.create_preprocessor()
+            X_fit = preprocessor.fit_transform(X.iloc[fit_idx])
+            X_val = preprocessor.transform(X.iloc[val_idx])
+            X_fit, y_fit = resample(self.trainer.pipeline.steps, X_fit, y.iloc[fit_idx].to_numpy())
+            folds.append((np.asarray(X_fit), np.asarray(y_fit), np.asarray(X_val), val_idx))
+        return folds
+
+    def _run_tasks(self, folds, tasks):
+        if self.backend == "joblib":
+            results = joblib.Parallel(n_jobs=n_workers(self.n_jobs, len(tasks)))(
+                joblib.delayed(_fit_predict)(self.trainer.model_map[name], params, *folds[fold][:3])
+                for fold, name, params in tasks
+            )
+            return [(fold, name, proba, fit_time) for (fold, name, _), (proba, fit_time) in zip(tasks, results)]
+        if self.backend != "process":
+            raise ValueError(f"Unknown cv backend: {self.backend}")
+
+        with memmap_pool(folds, self.n_jobs, len(tasks), self.trainer.model_map) as pool:
+            return list(pool.map(_fit_fold_task, tasks))
+
+    def run(self, X, y):
+        """Returns (comparison table sorted by out-of-fold ROC AUC, out-of-fold probabilities per model)."""
+        folds = self.prepare_folds(X, y)
+        tasks = [(fold, name, params) for fold in range(len(folds)) for name, params in self.models.items()]
+        results = self._run_tasks(folds, tasks)
+
+        y_true = np.asarray(y)
+        oof = {name: np.full(len(y_true), np.nan) for name in self.models}
+        fold_scores = {name: [] for name in self.models}
+        fit_times = {name: [] for name in self.models}
+        for fold, name, proba, fit_time in results:
+            val_idx = folds[fold][3]
+            oof[name][val_idx] = proba
+            fit_times[name].append(fit_time)
+            if len(np.unique(y_true[val_idx])) > 1:
+                fold_scores[name].append(roc_auc_score(y_true[val_idx], proba))
+
+        rows = []
+        for name in self.models:
+            # time-series CV never validates the first block, so score only rows with a prediction
+            scored = ~np.isnan(oof[name])
+            rows.append({
+                "model": name,
+                "roc_auc": roc_auc_score(y_true[scored], oof[name][scored]),
+                "roc_auc_fold_mean": float(np.mean(fold_scores[name])) if fold_scores[name] else float("nan"),
+                "roc_auc_fold_std": float(np.std(fold_scores[name])) if fold_scores[name] else float("nan"),
+                "accuracy": accuracy_score(y_true[scored], oof[name][scored] >= 0.5),
+                "fit_time_mean": float(np.mean(fit_times[name])),
+                "n_folds": len(folds),
+            })
+        table = pd.DataFrame(rows).sort_values("roc_auc", ascending=False).reset_index(drop=True)
+        return table, oof
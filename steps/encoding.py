@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+# fixed vocabulary for DDD_CAR; anything else goes to one extra "unknown" column
+COMPASS_VOCABULARY = ("C", "N", "NE", "E", "SE", "S", "SW", "W", "NW")
+NUMERIC_FEATURES = ["TN", "TX", "TAVG", "RH_AVG", "SS", "FF_X", "DDD_X", "FF_AVG", "Month", "Day"]
+
+
+class FeatureEncoder(BaseEstimator, TransformerMixin):
+    """
+    Array-only replacement for the ColumnTransformer preprocessor (model.encoder: fast).
+    - Numeric block: median imputation + standardization, like SimpleImputer + StandardScaler
+    - DDD_CAR: missing values take the most frequent training value, then map to a fixed integer
+      vocabulary; unseen codes share one unknown column instead of an all-zero row
+    - Emits a dense float32 matrix; encode_rows() builds it straight from request dicts
+    """
+
+    def __init__(self, numeric_features=None, categorical_feature="DDD_CAR", vocabulary=COMPASS_VOCABULARY):
+        self.numeric_features = numeric_features
+        self.categorical_feature = categorical_feature
+        self.vocabulary = vocabulary
+
+    def _numeric_features(self):
+        return list(self.numeric_features or NUMERIC_FEATURES)
+
+    def fit(self, X, y=None):
+        numeric = X[self._numeric_features()].to_numpy(dtype=np.float64)
+        self.impute_values_ = np.nanmedian(numeric, axis=0)
+        filled = np.where(np.isnan(numeric), self.impute_values_, numeric)
+        self.mean_ = filled.mean(axis=0)
+        scale = filled.std(axis=0)
+        self.scale_ = np.where(scale == 0.0, 1.0, scale)
+
+        categorical = X[self.categorical_feature]
+        self.categorical_fill_ = str(categorical.mode(dropna=True).iloc[0]) if categorical.notna().any() else self.vocabulary[0]
+        self.categories_ = np.asarray(self.vocabulary, dtype=object)
+        self._index = {code: i for i, code in enumerate(self.vocabulary)}
+        self.n_features_out_ = len(self.impute_values_) + len(self.vocabulary) + 1
+        return self
+
+    def _output(self, numeric, codes):
+        out = np.zeros((len(codes), self.n_features_out_), dtype=np.float32)
+        n_numeric = numeric.shape[1]
+        numeric = np.where(np.isnan(numeric), self.impute_values_, numeric)
+        out[:, :n_numeric] = (numeric - self.mean_) / self.scale_
+        out[np.arange(len(codes)), n_numeric + codes] = 1.0
+        return out
+
+    def _codes(self, categorical):
+        categorical = pd.Series(categorical, copy=False)
+        codes = pd.Index(self.vocabulary).get_indexer(categorical)
+        codes[codes < 0] = len(self.vocabulary)
+        codes[categorical.isna().to_numpy()] = self._index.get(self.categorical_fill_, len(self.vocabulary))
+        return codes
+
+    def transform(self, X):
+        numeric = X[self._numeric_features()].to_numpy(dtype=np.float64)
+        return self._output(numeric, self._codes(X[self.categorical_feature]))
+
+    def encode_arrays(self, numeric, categorical):
+        """transform() for a float matrix in numeric feature order plus an array of DDD_CAR codes."""
+        return self._output(np.asarray(numeric, dtype=np.float64), self._codes(categorical))
+
+    def encode_rows(self, rows):
+        """transform() for a list of feature dicts, without building a DataFrame."""
+        features = self._numeric_features()
+        numeric = np.array([[row[name] for name in features] for row in rows], dtype=np.float64)
+        unknown = len(self.vocabulary)
+        codes = np.empty(len(rows), dtype=np.int64)
+        for i, row in enumerate(rows):
+            value = row[self.categorical_feature]
+            if value is None or value != value:
+                value = self.categorical_fill_
+            codes[i] = self._index.get(value, unknown)
+        return self._output(numeric, codes)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(
+            self._numeric_features() + [f"{self.categorical_feature}_{code}" for code in self.vocabulary] + [f"{self.categorical_feature}_unknown"],
+            dtype=object,
+        )
+
+
+def preprocessor_statistics(preprocessor):
+    """Fitted statistics shared by both preprocessors (ColumnTransformer or FeatureEncoder)."""
+    if isinstance(preprocessor, FeatureEncoder):
+        return {
+            "numeric_features": preprocessor._numeric_features(),
+            "categorical_feature": preprocessor.categorical_feature,
+            "impute_values": preprocessor.impute_values_,
+            "scale_mean": preprocessor.mean_,
+            "scale_scale": preprocessor.scale_,
+            "categories": preprocessor.categories_,
+            "categorical_fill": preprocessor.categorical_fill_,
+            "unknown_bucket": True,
+        }
+
+    transformers = {name: (trans, cols) for name, trans, cols in preprocessor.transformers_ if name != "remainder"}
+    numeric_pipeline, numeric_features = transformers["numeric"]
+    categorical_pipeline, categorical_features = transformers["categorical"]
+    scaler = numeric_pipeline.named_steps["scaler"]
+    onehot = categorical_pipeline.named_steps["onehot"]
+    if onehot.drop_idx_ is not None or onehot.handle_unknown != "ignore":
+        raise ValueError("Only OneHotEncoder(handle_unknown='ignore') without drop is supported")
+    n_numeric = len(numeric_features)
+    return {
+        "numeric_features": list(numeric_features),
+        "categorical_feature": categorical_features[0],
+        "impute_values": numeric_pipeline.named_steps["imputer"].statistics_,
+        "scale_mean": scaler.mean_ if scaler.with_mean else np.zeros(n_numeric),
+        "scale_scale": scaler.scale_ if scaler.with_std else np.ones(n_numeric),
+        "categories": onehot.categories_[0],
+        "categorical_fill": categorical_pipeline.named_steps["imputer"].statistics_[0],
+        "unknown_bucket": False,
+    }
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+EPSILON = np.finfo(float).eps  # same clipping as sklearn.metrics.log_loss
+
+
+def _slice_key(value):
+    # JSON/MLflow friendly keys: Month 1.0 -> 1
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return int(value)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _curve_metrics(counts):
+    """ROC AUC and average precision from per-bin (negative, positive) counts, sweeping thresholds high to low."""
+    negatives, positives = counts[0][::-1], counts[1][::-1]
+    n_neg, n_pos = negatives.sum(), positives.sum()
+    if n_neg == 0 or n_pos == 0:
+        return float("nan"), float("nan")
+    tp = np.concatenate([[0], np.cumsum(positives)])
+    fp = np.concatenate([[0], np.cumsum(negatives)])
+    # trapezoids give the exact AUC of the binned scores (ties within a bin count half)
+    roc_auc = float(np.sum((fp[1:] - fp[:-1]) * (tp[1:] + tp[:-1])) / (2.0 * n_pos * n_neg))
+    predicted = tp[1:] + fp[1:]
+    precision = np.divide(tp[1:], predicted, out=np.zeros(len(predicted)), where=predicted > 0)
+    pr_auc = float(np.sum(positives * precision) / n_pos)
+    return roc_auc, pr_auc
+
+
+class Evaluator:
+    """
+    Single-pass binary classification metrics from P(Rain=1), accumulated chunk by chunk.
+    - Probabilities go into n_bins fixed-width bins per class; one threshold sweep over the bins
+      gives ROC AUC and PR AUC (average precision), so memory does not grow with the test set
+    - Confusion matrix, accuracy, log loss and Brier score are exact at the decision threshold
+    - Calibration bins and per-slice metrics (Month, DDD_CAR by default) come from the same pass
+    """
+
+    def __init__(self, threshold=0.5, n_bins=10000, n_calibration_bins=10, slice_columns=("Month", "DDD_CAR")):
+        self.threshold = threshold
+        self.n_bins = n_bins
+        self.n_calibration_bins = n_calibration_bins
+        self.slice_columns = tuple(slice_columns)
+        self.counts = np.zeros((2, n_bins), dtype=np.int64)
+        self.confusion = np.zeros((2, 2), dtype=np.int64)
+        self.log_loss_sum = 0.0
+        self.brier_sum = 0.0
+        self.calibration = np.zeros((3, n_calibration_bins))  # rows, sum of P(Rain=1), positives
+        self.slices = {column: {} for column in self.slice_columns}
+
+    def _bins(self, proba, n_bins):
+        return np.minimum((proba * n_bins).astype(np.int64), n_bins - 1)
+
+    def update(self, y_true, proba, X=None):
+        """Add one chunk: true labels (0/1), P(Rain=1) and optionally the feature frame for slicing."""
+        y = np.asarray(y_true).astype(np.int64)
+        proba = np.clip(np.asarray(proba, dtype=float), 0.0, 1.0)
+        bins = self._bins(proba, self.n_bins)
+        self.counts += np.bincount(y * self.n_bins + bins, minlength=2 * self.n_bins).reshape(2, self.n_bins)
+
+        # class 1 only when it is strictly more likely, like argmax in predict()
+        predicted = (proba > self.threshold).astype(np.int64)
+        self.confusion += np.bincount(y * 2 + predicted, minlength=4).reshape(2, 2)
+        clipped = np.clip(proba, EPSILON, 1 - EPSILON)
+        self.log_loss_sum += float(-np.sum(y * np.log(clipped) + (1 - y) * np.log(1 - clipped)))
+        self.brier_sum += float(np.sum((proba - y) ** 2))
+
+        calibration_bins = self._bins(proba, self.n_calibration_bins)
+        self.calibration[0] += np.bincount(calibration_bins, minlength=self.n_calibration_bins)
+        self.calibration[1] += np.bincount(calibration_bins, weights=proba, minlength=self.n_calibration_bins)
+        self.calibration[2] += np.bincount(calibration_bins, weights=y, minlength=self.n_calibration_bins)
+
+        if X is not None:
+            correct = (predicted == y).astype(float)
+            for column in self.slice_columns:
+                if column in X.columns:
+                    self._update_slice(column, X[column].to_numpy(), y, bins, correct)
+
+    def _update_slice(self, column, values, y, bins, correct):
+        codes, uniques = pd.factorize(values)
+        keep = codes >= 0  # missing values belong to no slice
+        codes, y, bins, correct = codes[keep], y[keep], bins[keep], correct[keep]
+        n_values = len(uniques)
+        counts = np.bincount((codes * 2 + y) * self.n_bins + bins, minlength=n_values * 2 * self.n_bins)
+        counts = counts.reshape(n_values, 2, self.n_bins)
+        n_correct = np.bincount(codes, weights=correct, minlength=n_values)
+        for code, value in enumerate(uniques):
+            state = self.slices[column].setdefault(_slice_key(value), [np.zeros((2, self.n_bins), dtype=np.int64), 0.0])
+            state[0] += counts[code]
+            state[1] += n_correct[code]
+
+    def result(self):
+        n_rows = int(self.confusion.sum())
+        roc_auc, pr_auc = _curve_metrics(self.counts)
+        calibration = [
+            {
+                "bin": i,
+                "lower": i / self.n_calibration_bins,
+                "upper": (i + 1) / self.n_calibration_bins,
+                "n_rows": int(n),
+                "mean_probability": float(p / n),
+                "positive_rate": float(pos / n),
+            }
+            for i, (n, p, pos) in enumerate(self.calibration.T)
+            if n > 0
+        ]
+        slices = {}
+        for column, states in self.slices.items():
+            slices[column] = {}
+            for value, (counts, n_correct) in states.items():
+                n = int(counts.sum())
+                slice_roc, slice_pr = _curve_metrics(counts)
+                slices[column][value] = {
+                    "n_rows": n,
+                    "positive_rate": float(counts[1].sum() / n),
+                    "accuracy": float(n_correct / n),
+                    "roc_auc": slice_roc,
+                    "pr_auc": slice_pr,
+                }
+        return {
+            "n_rows": n_rows,
+            "threshold": self.threshold,
+            "accuracy": float(np.trace(self.confusion) / n_rows) if n_rows else float("nan"),
+            "roc_auc": roc_auc,
+            "pr_auc": pr_auc,
+            "log_loss": self.log_loss_sum / n_rows if n_rows else float("nan"),
+            "brier": self.brier_sum / n_rows if n_rows else float("nan"),
+            "confusion_matrix": self.confusion.tolist(),
+            "classification_report": classification_report_dict(self.confusion),
+            "calibration": calibration,
+            "slices": slices,
+        }
+
+
+def classification_report_dict(confusion):
+    """sklearn classification_report(output_dict=True) layout computed from a 2x2 confusion matrix."""
+    confusion = np.asarray(confusion, dtype=float)
+    support = confusion.sum(axis=1)
+    predicted = confusion.sum(axis=0)
+    true_positive = np.diag(confusion)
+    precision = np.divide(true_positive, predicted, out=np.zeros(2), where=predicted > 0)
+    recall = np.divide(true_positive, support, out=np.zeros(2), where=support > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros(2), where=precision + recall > 0)
+    total = support.sum()
+
+    report = {
+        str(label): {"precision": precision[label], "recall": recall[label], "f1-score": f1[label], "support": support[label]}
+        for label in (0, 1)
+    }
+    report["accuracy"] = true_positive.sum() / total if total else 0.0
+    weights = support / total if total else np.zeros(2)
+    report["macro avg"] = {"precision": precision.mean(), "recall": recall.mean(), "f1-score": f1.mean(), "support": total}
+    report["weighted avg"] = {
+        "precision": float(precision @ weights), "recall": float(recall @ weights), "f1-score": float(f1 @ weights), "support": total,
+    }
+    return {key: {k: float(v) for k, v in value.items()} if isinstance(value, dict) else float(value) for key, value in report.items()}
+
+
+def classification_report_text(report, digits=2):
+    """Plain-text table in the style of sklearn's classification_report."""
+    width = max(len("weighted avg"), digits)
+    lines = [f"{'':>{width}} {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}", ""]
+    for label in ("0", "1"):
+        row = report[label]
+        lines.append(f"{label:>{width}} {row['precision']:>9.{digits}f} {row['recall']:>9.{digits}f} {row['f1-score']:>9.{digits}f} {row['support']:>9.0f}")
+    lines.append("")
+    total = report["macro avg"]["support"]
+    lines.append(f"{'accuracy':>{width}} {'':>9} {'':>9} {report['accuracy']:>9.{digits}f} {total:>9.0f}")
+    for name in ("macro avg", "weighted avg"):
+        row = report[name]
+        lines.append(f"{name:>{width}} {row['precision']:>9.{digits}f} {row['recall']:>9.{digits}f} {row['f1-score']:>9.{digits}f} {row['support']:>9.0f}")
+    return "\n".join(lines) + "\n"
@@ -2,6 +2,11 @@ import pandas as pd
 import yaml
 
 class Ingestion:
+    # compact dtypes for streaming reads; keys missing from a file are ignored by read_csv
+    chunk_dtypes = {"TANGGAL": str, "DDD_CAR": "category"}
+    # parsed without a fixed dtype, since one non-numeric cell would abort the read, then coerced to float32
+    numeric_chunk_cols = ("TN", "TX", "TAVG", "RH_AVG", "RR", "SS", "FF_X", "DDD_X", "FF_AVG", "Month", "Day")
+
     def __init__(self):
         self.config = self.load_config()
 
@@ -12,6 +17,38 @@ class Ingestion:
     def load_data(self):
         train_data_path = self.config['data']['train_path']
         test_data_path = self.config['data']['test_path']
+        store_config = self.config.get('store', {})
+        if store_config.get('enabled', False):
+            return self.load_from_store(store_config['root'], train_data_path, test_data_path)
         train_data = pd.read_csv(train_data_path)
         test_data = pd.read_csv(test_data_path)
         return train_data, test_data
+
+    def load_from_store(self, root, train_data_path, test_data_path):
+        """Read cleaned data from the Parquet feature store, rebuilding only stale partitions."""
+        from steps.store import FeatureStore
+
+        store = FeatureStore(root)
+        data = []
+        for name, path in (("train", train_data_path), ("test", test_data_path)):
+            store.sync(name, path)
+            data.append(store.read(name))
+        return tuple(data)
+
+    def iter_chunks(self, path, chunksize=None):
+        """Yield fixed-size chunks of a CSV file so memory is bounded by chunksize, not file size."""
+        chunksize = chunksize or self.config['data'].get('chunksize', 100000)
+        return (self.compact_numeric(chunk) for chunk in pd.read_csv(path, chunksize=chunksize, dtype=self.chunk_dtypes))
+
+    @classmethod
+    def compact_numeric(cls, chunk):
+        """Coerce the numeric columns of a raw chunk to float32 in place; unparseable cells become NaN."""
+        for col in cls.numeric_chunk_cols:
+            if col in chunk.columns:
+                chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype("float32")
+        return chunk
+
+    def iter_data(self, chunksize=None):
+        train_data_path = self.config['data']['train_path']
+        test_data_path = self.config['data']['test_path']
+        return self.iter_chunks(train_data_path, chunksize), self.iter_chunks(test_data_path, chunksize)
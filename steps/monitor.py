@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+PSI_EPSILON = 1e-4
+
+
+def _psi(ref_counts, cur_counts):
+    ref = np.clip(ref_counts / max(ref_counts.sum(), 1), PSI_EPSILON, None)
+    cur = np.clip(cur_counts / max(cur_counts.sum(), 1), PSI_EPSILON, None)
+    return float(np.sum((cur - ref) * np.log(cur / ref)))
+
+
+def _binned_ks(ref_counts, cur_counts):
+    # KS over the shared bin edges (missing bin excluded); a lower bound of the exact statistic
+    # scipy is imported lazily: it is only needed when a report is built, not on the serving path
+    from scipy.special import kolmogorov
+
+    n_ref, n_cur = ref_counts.sum(), cur_counts.sum()
+    if n_ref == 0 or n_cur == 0:
+        return 0.0, 1.0
+    stat = float(np.max(np.abs(np.cumsum(ref_counts) / n_ref - np.cumsum(cur_counts) / n_cur)))
+    n_eff = n_ref * n_cur / (n_ref + n_cur)
+    return stat, float(kolmogorov(np.sqrt(n_eff) * stat))
+
+
+def _chi2(ref_counts, cur_counts):
+    from scipy.stats import chi2_contingency
+
+    table = np.vstack([ref_counts, cur_counts])
+    table = table[:, table.sum(axis=0) > 0]
+    if table.shape[1] < 2 or cur_counts.sum() == 0:
+        return 0.0, 1.0
+    stat, pvalue, _, _ = chi2_contingency(table)
+    return float(stat), float(pvalue)
+
+
+class DriftReference:
+    """
+    Compact reference profile of the training data for streaming drift checks.
+    - Numeric features: fixed quantile bin edges and per-bin counts, plus a missing bin
+    - Categorical features (DDD_CAR, prediction): per-category counts, plus an "other" bin
+    """
+
+    numeric_cols = ["TN", "TX", "TAVG", "RH_AVG", "SS", "FF_X", "DDD_X", "FF_AVG", "Month", "Day"]
+    categorical_cols = ["DDD_CAR", "prediction"]
+
+    def __init__(self, edges, categories, counts):
+        self.edges = {col: np.asarray(e, dtype=float) for col, e in edges.items()}
+        self.categories = {col: list(c) for col, c in categories.items()}
+        self.counts = {col: np.asarray(c, dtype=np.int64) for col, c in counts.items()}
+        self._category_index = {col: {v: i for i, v in enumerate(c)} for col, c in self.categories.items()}
+
+    @classmethod
+    def from_data(cls, features, predictions, n_bins=20):
+        edges, categories = {}, {}
+        for col in cls.numeric_cols:
+            values = np.asarray(features[col], dtype=float)
+            values = values[~np.isnan(values)]
+            cuts = np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]) if len(values) else []
+            edges[col] = np.unique(cuts)
+        columns = {"DDD_CAR": features["DDD_CAR"], "prediction": predictions}
+        for col in cls.categorical_cols:
+            categories[col] = sorted({str(v) for v in columns[col] if v is not None and v == v})
+        reference = cls(edges, categories, {})
+        reference.counts = reference.bin_counts(features, predictions)
+        return reference
+
+    def n_bins(self, col):
+        # numeric: len(edges) + 1 value bins and a missing bin; categorical: categories and an "other" bin
+        return len(self.edges[col]) + 2 if col in self.edges else len(self.categories[col]) + 1
+
+    def bin_counts(self, features, predictions=None):
+        """Per-column bin counts for a batch of feature rows (and optional predicted classes)."""
+        counts = {}
+        for col in self.numeric_cols:
+            values = np.asarray(features[col], dtype=float)
+            bins = np.searchsorted(self.edges[col], values, side="right")
+            bins[np.isnan(values)] = len(self.edges[col]) + 1
+            counts[col] = np.bincount(bins, minlength=self.n_bins(col))
+        columns = {"DDD_CAR": features["DDD_CAR"], "prediction": [] if predictions is None else predictions}
+        for col in self.categorical_cols:
+            index = self._category_index[col]
+            other = len(index)
+            bins = np.fromiter((index.get(str(v), other) for v in columns[col]), dtype=np.int64)
+            counts[col] = np.bincount(bins, minlength=self.n_bins(col))
+        return counts
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as reference_file:
+            json.dump({
+                "edges": {col: e.tolist() for col, e in self.edges.items()},
+                "categories": self.categories,
+                "counts": {col: c.tolist() for col, c in self.counts.items()},
+            }, reference_file)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as reference_file:
+            data = json.load(reference_file)
+        return cls(data["edges"], data["categories"], data["counts"])
+
+
+class DriftMonitor:
+    """
+    Sliding-window drift monitor over the prediction stream.
+    - The window is a ring of n_buckets count arrays, so memory is constant in the traffic volume
+    - update() bins each batch once; report() compares the window against the reference
+      (binned KS and PSI for numeric features, chi-square and PSI for categorical ones)
+    """
+
+    def __init__(self, reference: DriftReference, window_size=10000, n_buckets=10, clock=time.time):
+        self.reference = reference
+        self.bucket_size = max(window_size // n_buckets, 1)
+        self.buckets = deque(maxlen=n_buckets)
+        self.clock = clock
+        self.total_rows = 0
+        self._lock = threading.Lock()
+        self._new_bucket()
+
+    def _new_bucket(self):
+        bins = {col: np.zeros(len(c), dtype=np.int64) for col, c in self.reference.counts.items()}
+        self.buckets.append({"rows": 0, "counts": bins})
+
+    def update(self, features, predictions=None):
+        """Add a batch of feature rows (DataFrame or dict of columns) and their predictions to the window."""
+        n_rows = len(features["TN"])
+        if predictions is not None:
+            predictions = list(predictions)
+        start = 0
+        with self._lock:
+            while start < n_rows:
+                bucket = self.buckets[-1]
+                if bucket["rows"] >= self.bucket_size:
+                    self._new_bucket()
+                    bucket = self.buckets[-1]
+                stop = min(n_rows, start + self.bucket_size - bucket["rows"])
+                part = {col: np.asarray(features[col])[start:stop] for col in self.reference.numeric_cols + ["DDD_CAR"]}
+                counts = self.reference.bin_counts(part, None if predictions is None else predictions[start:stop])
+                for col, c in counts.items():
+                    bucket["counts"][col] += c
+                bucket["rows"] += stop - start
+                start = stop
+            self.total_rows += n_rows
+
+    def window_counts(self):
+        with self._lock:
+            rows = sum(b["rows"] for b in self.buckets)
+            counts = {col: sum(b["counts"][col] for b in self.buckets) for col in self.reference.counts}
+        return rows, counts
+
+    def report(self):
+        rows, counts = self.window_counts()
+        drift = {}
+        for col in self.reference.numeric_cols:
+            # the last bin is "missing"; KS is computed over the value bins only
+            stat, pvalue = _binned_ks(self.reference.counts[col][:-1], counts[col][:-1])
+            drift[col] = {"test": "ks_binned", "stat": stat, "pvalue": pvalue, "psi": _psi(self.reference.counts[col], counts[col])}
+        for col in self.reference.categorical_cols:
+            stat, pvalue = _chi2(self.reference.counts[col], counts[col])
+            drift[col] = {"test": "chi2", "stat": stat, "pvalue": pvalue, "psi": _psi(self.reference.counts[col], counts[col])}
+        return {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.clock())),
+            "window_rows": int(rows),
+            "total_rows": int(self.total_rows),
+            "drift": drift,
+        }
+
+    def write_report(self, path):
+        report = self.report()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+        os.replace(tmp_path, path)
+        return report
@@ -0,0 +1,43 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import joblib
+
+# per-process state of the pool workers, filled by _init_worker
+worker_data = {}
+
+
+def _init_worker(data_path, model_map):
+    # arrays are memory-mapped once per worker instead of being pickled per task
+    worker_data["arrays"] = joblib.load(data_path, mmap_mode="r")
+    worker_data["model_map"] = model_map
+
+
+def resample(pipeline_steps, X_fit, y_fit):
+    """Apply the pipeline's samplers (SMOTE, undersampling) to already preprocessed training rows."""
+    for _, step in pipeline_steps:
+        if hasattr(step, "fit_resample"):
+            X_fit, y_fit = step.fit_resample(X_fit, y_fit)
+    return X_fit, y_fit
+
+
+def n_workers(n_jobs, n_tasks):
+    """Pool size for n_jobs (-1/None = all cores), never more than the tasks and never below 1."""
+    n_jobs = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+    return max(1, min(n_jobs, n_tasks))
+
+
+@contextmanager
+def memmap_pool(arrays, n_jobs, n_tasks, model_map):
+    """Process pool whose workers see `arrays` as worker_data["arrays"], memory-mapped from a temporary file."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = os.path.join(tmp_dir, "arrays.joblib")
+        joblib.dump(arrays, data_path)
+        with ProcessPoolExecutor(
+            max_workers=n_workers(n_jobs, n_tasks),
+            initializer=_init_worker,
+            initargs=(data_path, model_map),
+        ) as pool:
+            yield pool
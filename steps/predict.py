@@ -1,11 +1,15 @@
 import os
 import joblib
-from sklearn.metrics import accuracy_score, classification_report, roc_auc_score
+import numpy as np
+from steps.evaluate import Evaluator, classification_report_text
 
 class Predictor:
-    def __init__(self):
-        self.model_path = self.load_config()['model']['store_path']
-        self.pipeline = self.load_model()
+    def __init__(self, pipeline=None):
+        # a pipeline fitted in this process is used as-is instead of being re-read from model.pkl
+        if pipeline is None:
+            self.model_path = self.load_config()['model']['store_path']
+            pipeline = self.load_model()
+        self.pipeline = pipeline
 
     def load_config(self):
         import yaml
@@ -22,8 +26,30 @@ class Predictor:
         return X, y
 
     def evaluate_model(self, X_test, y_test):
-        y_pred = self.pipeline.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
-        class_report = classification_report(y_test, y_pred)
-        roc_auc = roc_auc_score(y_test, y_pred)
-        return accuracy, class_report, roc_auc
+        # ROC AUC from P(Rain=1), not from hard labels
+        metrics = self.evaluate(X_test, y_test)
+        return metrics['accuracy'], classification_report_text(metrics['classification_report']), metrics['roc_auc']
+
+    def evaluate(self, X_test, y_test, chunk_size=None, **evaluator_options):
+        """All evaluation metrics from one predict_proba pass, chunk_size rows at a time."""
+        chunk_size = chunk_size or max(len(X_test), 1)
+        return self.evaluate_chunks(
+            ((X_test.iloc[i:i + chunk_size], y_test.iloc[i:i + chunk_size]) for i in range(0, len(X_test), chunk_size)),
+            **evaluator_options,
+        )
+
+    def evaluate_chunks(self, chunks, **evaluator_options):
+        """Evaluate (X, y) chunks, e.g. cleaned chunks of a test file too big for memory."""
+        evaluator = Evaluator(**evaluator_options)
+        for X, y in chunks:
+            _, positive = self.score(X)
+            evaluator.update(y, positive, X)
+        return evaluator.result()
+
+    def score(self, X):
+        """Predicted class and P(Rain=1) for every row of a feature frame, from one predict_proba call."""
+        proba = self.pipeline.predict_proba(X)
+        classes = list(self.pipeline.classes_)
+        # a model that never saw rain gives P(Rain=1) = 0
+        positive = proba[:, classes.index(1)] if 1 in classes else np.zeros(len(proba))
+        return self.pipeline.classes_[proba.argmax(axis=1)], positive
@@ -0,0 +1,173 @@
+import copy
+import glob
+import io
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+from steps.clean import Cleaner
+from steps.encoding import preprocessor_statistics
+from steps.ingest import Ingestion
+
+WARM_START_MODELS = ("RandomForestClassifier", "GradientBoostingClassifier")
+
+
+class IncrementalRetrainer:
+    """
+    Warm-start retraining on the rows appended since the last accepted model.
+    - A watermark (byte offset per CSV file in retrain.incoming_dir) limits reading and cleaning to appended rows
+    - The stored preprocessor is reused when the new rows fit its statistics (known categories, bounded mean shift)
+    - RandomForest grows n_new_estimators trees on the new rows; GradientBoosting adds as many boosting stages
+    - The candidate replaces the current model only if its ROC AUC on the newest rows does not regress
+    """
+
+    def __init__(self, trainer, retrain_config):
+        self.trainer = trainer
+        self.incoming_dir = retrain_config.get("incoming_dir", "data/incoming")
+        self.state_path = retrain_config.get("state_path", os.path.join(trainer.model_path, "retrain_state.json"))
+        self.n_new_estimators = retrain_config.get("n_new_estimators", 50)
+        self.validation_fraction = retrain_config.get("validation_fraction", 0.3)
+        self.min_new_rows = retrain_config.get("min_new_rows", 100)
+        self.tolerance = retrain_config.get("tolerance", 0.0)
+        self.max_unknown_category_rate = retrain_config.get("max_unknown_category_rate", 0.05)
+        self.max_mean_shift = retrain_config.get("max_mean_shift", 3.0)
+        self.cleaner = Cleaner()
+
+    def load_state(self):
+        try:
+            with open(self.state_path, "r") as state_file:
+                return json.load(state_file)
+        except FileNotFoundError:
+            return {"offsets": {}}
+
+    def save_state(self, state):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as state_file:
+            json.dump(state, state_file, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    @staticmethod
+    def read_appended(path, offset):
+        """
+        Rows of an append-only CSV after byte offset; returns (frame or None, new offset).
+        A file smaller than the offset was truncated or replaced, so it is read again from the start.
+        """
+        if os.path.getsize(path) < offset:
+            offset = 0
+        with open(path, "rb") as csv_file:
+            header = csv_file.readline()
+            start = max(offset, len(header))
+            csv_file.seek(start)
+            body = csv_file.read()
+        # a partially written last line is left for the next run
+        end = body.rfind(b"\n") + 1
+        if end == 0:
+            return None, start
+        frame = pd.read_csv(io.BytesIO(header + body[:end]), dtype=Ingestion.chunk_dtypes)
+        # a non-numeric cell becomes NaN instead of failing every run at the same offset
+        return Ingestion.compact_numeric(frame), start + end
+
+    def load_new_data(self, state):
+        """Cleaned rows appended to the incoming files since the watermark, plus the advanced watermark."""
+        offsets = dict(state.get("offsets", {}))
+        frames = []
+        for path in sorted(glob.glob(os.path.join(self.incoming_dir, "*.csv"))):
+            name = os.path.basename(path)
+            frame, offsets[name] = self.read_appended(path, offsets.get(name, 0))
+            if frame is not None and len(frame):
+                frames.append(self.cleaner.clean_data(frame))
+        data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=self.cleaner.feature_cols + ["Rain"])
+        return data, offsets
+
+    def preprocessor_is_valid(self, preprocessor, X):
+        """Whether the fitted preprocessor still describes X; returns (valid, reason)."""
+        stats = preprocessor_statistics(preprocessor)
+        categorical_feature, numeric_features = stats["categorical_feature"], stats["numeric_features"]
+
+        values = X[categorical_feature].dropna()
+        unknown_rate = float((~values.isin(set(stats["categories"]))).mean()) if len(values) else 0.0
+        if unknown_rate > self.max_unknown_category_rate:
+            return False, f"{unknown_rate:.1%} of {categorical_feature} values are unknown to the encoder"
+
+        means = X[numeric_features].astype(float).mean().to_numpy()
+        shift = np.abs(means - stats["scale_mean"]) / stats["scale_scale"]
+        worst = int(np.nanargmax(shift))
+        if shift[worst] > self.max_mean_shift:
+            return False, f"mean of {numeric_features[worst]} moved {shift[worst]:.1f} standard deviations"
+        return True, None
+
+    def grow(self, pipeline, X_fit, y_fit):
+        """Copy of pipeline whose model was warm-started on the new rows with the stored preprocessing."""
+        candidate = copy.deepcopy(pipeline)
+        *transforms, (_, model) = candidate.steps
+        X_t, y_t = X_fit, y_fit
+        for _, step in transforms:
+            if hasattr(step, "fit_resample"):
+                X_t, y_t = step.fit_resample(X_t, y_t)
+            else:
+                X_t = step.transform(X_t)
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + self.n_new_estimators)
+        model.fit(X_t, y_t)
+        model.set_params(warm_start=False)
+        return candidate
+
+    @staticmethod
+    def _roc_auc(pipeline, X, y):
+        proba = pipeline.predict_proba(X)[:, list(pipeline.classes_).index(1)]
+        return float(roc_auc_score(y, proba))
+
+    def run(self, pipeline=None):
+        """
+        Returns (result dict, accepted pipeline or None). An accepted result carries the new watermark
+        in result["offsets"]; it is only persisted by commit() once the candidate has been saved, so
+        rejected rows, or rows of a candidate that never got saved, are retried with the next batch.
+        """
+        pipeline = pipeline or joblib.load(os.path.join(self.trainer.model_path, "model.pkl"))
+        model_name = type(pipeline.steps[-1][1]).__name__
+        state = self.load_state()
+        data, offsets = self.load_new_data(state)
+        result = {"n_new_rows": len(data), "model": model_name}
+
+        if model_name not in WARM_START_MODELS:
+            return {**result, "status": "full_retrain_required", "reason": f"{model_name} cannot be warm-started"}, None
+        if len(data) < self.min_new_rows:
+            return {**result, "status": "no_new_data"}, None
+
+        X, y = self.trainer.feature_target_separator(data)
+        valid, reason = self.preprocessor_is_valid(pipeline.steps[0][1], X)
+        if not valid:
+            return {**result, "status": "full_retrain_required", "reason": reason}, None
+
+        # rows are appended in date order: validate on the newest rows, grow on the rest
+        n_val = max(int(len(data) * self.validation_fraction), 1)
+        X_fit, y_fit, X_val, y_val = X.iloc[:-n_val], y.iloc[:-n_val], X.iloc[-n_val:], y.iloc[-n_val:]
+        if y_fit.nunique() < 2 or y_val.nunique() < 2:
+            return {**result, "status": "rejected", "reason": "new rows need both classes for training and validation"}, None
+
+        candidate = self.grow(pipeline, X_fit, y_fit)
+        current_auc = self._roc_auc(pipeline, X_val, y_val)
+        candidate_auc = self._roc_auc(candidate, X_val, y_val)
+        result.update({
+            "roc_auc_current": current_auc,
+            "roc_auc_candidate": candidate_auc,
+            "n_estimators": candidate.steps[-1][1].n_estimators,
+        })
+        if candidate_auc < current_auc - self.tolerance:
+            return {**result, "status": "rejected", "reason": "validation ROC AUC regressed"}, None
+
+        return {**result, "status": "accepted", "offsets": offsets}, candidate
+
+    def commit(self, result):
+        """Advance the watermark past the rows of an accepted (and saved) candidate."""
+        self.save_state({"offsets": result["offsets"]})
+
+    def reset(self):
+        """Forget the watermark, e.g. after a full retrain: the next run reads every incoming row again."""
+        try:
+            os.remove(self.state_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import logging
+import os
+
+import joblib
+import yaml
+
+from steps.store import _file_hash
+
+
+class Step:
+    """
+    One cached pipeline step: fn(config, *dependency outputs) -> output.
+    - deps: names of earlier steps whose outputs are passed to fn, in order
+    - files: dotted config keys holding input file paths (e.g. "data.train_path"), hashed by content
+    - config_keys: config.yml sections / dotted keys the step reads
+    - code: modules whose source is part of the step's version
+    - outputs: files the step writes as a side effect; a missing or since rewritten one forces a rerun
+    """
+
+    def __init__(self, name, fn, deps=(), files=(), config_keys=(), code=(), outputs=()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.files = tuple(files)
+        self.config_keys = tuple(config_keys)
+        self.code = tuple(code)
+        self.outputs = tuple(outputs)
+
+
+def _config_value(config, key):
+    value = config
+    for part in key.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+class StepRunner:
+    """
+    Runs a list of Steps as a DAG, skipping every step whose inputs are unchanged.
+    - A step's key hashes its config keys, input file contents, code and the keys of its dependencies
+    - Outputs are cached on disk per key (<cache_dir>/<step>-<key>.joblib) and loaded only when needed
+    - File digests are memoized by (size, mtime) so an unchanged rerun does not re-read the data
+    - The digests of a step's output files are stored next to its cached output; a step reruns when one
+      was changed by something else (e.g. model.pkl rewritten by an incremental retrain), and so do the
+      steps depending on it
+    - Outputs produced in this run stay in memory, so e.g. the trained model goes straight to evaluation
+    """
+
+    def __init__(self, config, cache_dir=".cache/steps", force=()):
+        self.config = config
+        self.cache_dir = cache_dir
+        self.force = set(force)
+        self.index_path = os.path.join(cache_dir, "file_hashes.json")
+        self.executed = []
+        self.skipped = []
+        self._outputs = {}
+        self._paths = {}
+        self._rebuilt = set()
+        self._file_index = None
+
+    def _file_digest(self, path):
+        if self._file_index is None:
+            try:
+                with open(self.index_path, "r") as index_file:
+                    self._file_index = json.load(index_file)
+            except FileNotFoundError:
+                self._file_index = {}
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        entry = self._file_index.get(os.path.abspath(path))
+        if entry is None or entry[0] != signature:
+            entry = self._file_index[os.path.abspath(path)] = [signature, _file_hash(path)]
+        return entry[1]
+
+    def _save_file_index(self):
+        if self._file_index is not None:
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w") as index_file:
+                json.dump(self._file_index, index_file)
+            os.replace(tmp_path, self.index_path)
+
+    def step_key(self, step, dep_keys):
+        digest = hashlib.sha256(step.name.encode())
+        for key in step.config_keys:
+            digest.update(yaml.safe_dump({key: _config_value(self.config, key)}, sort_keys=True).encode())
+        for file_key in step.files:
+            path = _config_value(self.config, file_key)
+            if path is None:
+                continue
+            digest.update(path.encode())
+            digest.update(self._file_digest(path).encode() if os.path.exists(path) else b"missing")
+        for module in step.code:
+            with open(module.__file__, "rb") as source:
+                digest.update(source.read())
+        for dep_key in dep_keys:
+            digest.update(dep_key.encode())
+        return digest.hexdigest()[:16]
+
+    def output(self, name):
+        """Output of a step from this run, loading it from the cache only on first use."""
+        if name not in self._outputs:
+            self._outputs[name] = joblib.load(self._paths[name])
+        return self._outputs[name]
+
+    def run(self, steps):
+        """Run or skip every step in order; returns {step name: cache key}."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        keys = {}
+        for step in steps:
+            missing = [dep for dep in step.deps if dep not in keys]
+            if missing:
+                raise ValueError(f"Step {step.name} depends on steps that do not run before it: {missing}")
+            keys[step.name] = key = self.step_key(step, [keys[dep] for dep in step.deps])
+            path = self._paths[step.name] = os.path.join(self.cache_dir, f"{step.name}-{key}.joblib")
+
+            # a dependency rerun under an unchanged key (forced, or its outputs were rewritten) may differ from its cache
+            deps_rebuilt = any(dep in self._rebuilt for dep in step.deps)
+            if step.name not in self.force and not deps_rebuilt and os.path.exists(path) and self._outputs_unchanged(step, path):
+                self.skipped.append(step.name)
+                logging.info(f"Step {step.name} unchanged, using cached output ({key})")
+                continue
+
+            self._rebuilt.add(step.name)
+            result = step.fn(self.config, *(self.output(dep) for dep in step.deps))
+            self._outputs[step.name] = result
+            tmp_path = path + ".tmp"
+            joblib.dump(result, tmp_path)
+            os.replace(tmp_path, path)
+            self._save_output_digests(step, path)
+            self._remove_stale(step.name, path)
+            self.executed.append(step.name)
+            logging.info(f"Step {step.name} completed ({key})")
+        self._save_file_index()
+        return keys
+
+    def _output_digests(self, step):
+        return {output: self._file_digest(output) for output in step.outputs if os.path.exists(output)}
+
+    def _outputs_unchanged(self, step, path):
+        if not step.outputs:
+            return True
+        try:
+            with open(path + ".outputs.json", "r") as digests_file:
+                recorded = json.load(digests_file)
+        except FileNotFoundError:
+            return False
+        current = self._output_digests(step)
+        return len(current) == len(step.outputs) and current == recorded
+
+    def _save_output_digests(self, step, path):
+        tmp_path = path + ".outputs.json.tmp"
+        with open(tmp_path, "w") as digests_file:
+            json.dump(self._output_digests(step), digests_file)
+        os.replace(tmp_path, path + ".outputs.json")
+
+    def _remove_stale(self, name, current_path):
+        # one cached output per step: older keys can only come back by reverting an input, which reruns the step
+        for entry in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, entry)
+            stale = path not in (current_path, current_path + ".outputs.json")
+            if entry.startswith(f"{name}-") and entry.endswith((".joblib", ".outputs.json")) and stale:
+                os.remove(path)
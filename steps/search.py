@@ -0,0 +1,111 @@
+import math
+import time
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, train_test_split
+
+from steps.parallel import memmap_pool, resample, worker_data
+
+
+def _fit_candidate(task):
+    candidate_id, model_name, params, n_samples = task
+    X_fit, y_fit, X_val, y_val = worker_data["arrays"]
+    model = worker_data["model_map"][model_name](**params)
+
+    start = time.perf_counter()
+    model.fit(X_fit[:n_samples], y_fit[:n_samples])
+    fit_time = time.perf_counter() - start
+
+    proba = model.predict_proba(X_val)[:, list(model.classes_).index(1)] if len(model.classes_) > 1 else np.zeros(len(y_val))
+    roc_auc = roc_auc_score(y_val, proba) if len(np.unique(y_val)) > 1 else float("nan")
+    return {
+        "candidate": candidate_id,
+        "model": model_name,
+        "params": params,
+        "n_samples": int(n_samples),
+        "roc_auc": float(roc_auc),
+        "fit_time": fit_time,
+    }
+
+
+class HyperparameterSearch:
+    """
+    Successive-halving search over the per-model spaces in config.yml (search.spaces).
+    - Fits the preprocessor (and resampler) once and shares the transformed arrays with all candidates
+    - Evaluates candidates in parallel with a process pool
+    - Each rung trains on eta times more rows and keeps the best 1/eta candidates by validation ROC AUC
+    """
+
+    def __init__(self, trainer, search_config, train_config=None):
+        self.trainer = trainer
+        self.method = search_config.get("method", "grid")
+        self.n_iter = search_config.get("n_iter", 20)
+        self.n_jobs = search_config.get("n_jobs", -1)
+        self.eta = search_config.get("eta", 3)
+        self.min_resources = search_config.get("min_resources", 0.1)
+        self.random_state = search_config.get("random_state", 42)
+        self.spaces = search_config["spaces"]
+        train_config = train_config or {}
+        self.validation_size = train_config.get("test_size", 0.2)
+
+    def candidates(self):
+        candidates = []
+        for model_name, space in self.spaces.items():
+            if model_name not in self.trainer.model_map:
+                raise ValueError(f"Unknown model in search space: {model_name}")
+            space = {k: v if isinstance(v, list) else [v] for k, v in space.items()}
+            if self.method == "random":
+                params_list = ParameterSampler(space, n_iter=self.n_iter, random_state=self.random_state)
+            elif self.method == "grid":
+                params_list = ParameterGrid(space)
+            else:
+                raise ValueError(f"Unknown search method: {self.method}")
+            candidates.extend((model_name, self.trainer.model_params_for(model_name, dict(params))) for params in params_list)
+        return candidates
+
+    def prepare_data(self, X_train, y_train):
+        """Split off a validation set and run preprocessing + resampling once for every candidate."""
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=self.validation_size, random_state=self.random_state, stratify=y_train
+        )
+        preprocessor = self.trainer.create_preprocessor()
+        X_fit = preprocessor.fit_transform(X_fit)
+        X_val = preprocessor.transform(X_val)
+        X_fit, y_fit = resample(self.trainer.pipeline.steps, X_fit, y_fit)
+
+        # shuffle once so every rung trains on a random prefix of the resampled rows
+        order = np.random.default_rng(self.random_state).permutation(len(y_fit))
+        X_fit, y_fit = np.asarray(X_fit)[order], np.asarray(y_fit)[order]
+        return X_fit, y_fit, np.asarray(X_val), np.asarray(y_val)
+
+    def rung_sizes(self, n_candidates, n_rows):
+        n_rungs = max(1, math.ceil(math.log(max(n_candidates, 1), self.eta)) + 1)
+        smallest = max(int(n_rows * self.min_resources), 1)
+        sizes = [min(n_rows, int(smallest * self.eta ** k)) for k in range(n_rungs)]
+        sizes[-1] = n_rows
+        return sizes
+
+    def run(self, X_train, y_train):
+        candidates = self.candidates()
+        if not candidates:
+            # e.g. an empty grid: fail before preprocessing instead of inside the process pool
+            raise ValueError("search.spaces produced no candidates")
+        arrays = self.prepare_data(X_train, y_train)
+
+        trials = []
+        survivors = list(range(len(candidates)))
+        with memmap_pool(arrays, self.n_jobs, len(candidates), self.trainer.model_map) as pool:
+            for rung, n_samples in enumerate(self.rung_sizes(len(candidates), len(arrays[1]))):
+                tasks = [(i, *candidates[i], n_samples) for i in survivors]
+                results = list(pool.map(_fit_candidate, tasks))
+                for result in results:
+                    result["rung"] = rung
+                trials.extend(results)
+
+                ranked = sorted(results, key=lambda r: -np.nan_to_num(r["roc_auc"], nan=-1.0))
+                keep = max(1, math.ceil(len(ranked) / self.eta))
+                survivors = [r["candidate"] for r in ranked[:keep]]
+
+        best = next(r for r in reversed(trials) if r["candidate"] == survivors[0])
+        return best, trials
@@ -0,0 +1,158 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import steps.clean
+from steps.clean import Cleaner
+
+
+def _file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as raw_file:
+        for block in iter(lambda: raw_file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _frame_hash(frame: pd.DataFrame) -> str:
+    return hashlib.sha256(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes()).hexdigest()
+
+
+class FeatureStore:
+    """
+    Partitioned Parquet store of cleaned data.
+    - One dataset per raw file under <root>/<name>/, partitioned year=YYYY/month=MM from TANGGAL
+    - A manifest keys every partition by the hash of its raw rows and the cleaning logic version
+    - sync() rebuilds only the partitions whose raw rows (or the cleaning code) changed
+    - read() memory-maps only the requested partitions and columns
+    """
+
+    row_column = "_row"
+
+    def __init__(self, root: str, cleaner: Cleaner = None):
+        self.root = root
+        self.cleaner = cleaner or Cleaner()
+        # the whole module: clean_data also depends on module-level helpers such as decode_dates
+        self.clean_version = hashlib.sha256(inspect.getsource(steps.clean).encode()).hexdigest()[:16]
+
+    def dataset_path(self, name):
+        return os.path.join(self.root, name)
+
+    def _manifest_path(self, name):
+        return os.path.join(self.dataset_path(name), "_manifest.json")
+
+    def load_manifest(self, name):
+        try:
+            with open(self._manifest_path(name), "r") as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, name, manifest):
+        tmp_path = self._manifest_path(name) + ".tmp"
+        with open(tmp_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        os.replace(tmp_path, self._manifest_path(name))
+
+    @staticmethod
+    def _stat_signature(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def is_fresh(self, name, raw_path):
+        """Cheap freshness check: same cleaning version and same raw file size/mtime (or content hash)."""
+        manifest = self.load_manifest(name)
+        if manifest.get("clean_version") != self.clean_version:
+            return False
+        if manifest.get("raw_stat") == self._stat_signature(raw_path):
+            return True
+        if manifest.get("raw_hash") == _file_hash(raw_path):
+            manifest["raw_stat"] = self._stat_signature(raw_path)
+            self._save_manifest(name, manifest)
+            return True
+        return False
+
+    def partition_keys(self, raw: pd.DataFrame) -> pd.Series:
+        if "TANGGAL" not in raw.columns:
+            return pd.Series("year=unknown/month=unknown", index=raw.index)
+        dates = pd.to_datetime(raw["TANGGAL"].astype("string"), format="%d-%m-%Y", errors="coerce")
+        keys = "year=" + dates.dt.year.astype("Int64").astype("string") + "/month=" + dates.dt.month.astype("Int64").astype("string").str.zfill(2)
+        return keys.fillna("year=unknown/month=unknown")
+
+    def stored_partitions(self, name):
+        """Partition keys (year=YYYY/month=MM) that have a directory on disk."""
+        root = self.dataset_path(name)
+        if not os.path.isdir(root):
+            return []
+        return [
+            f"{year}/{month}"
+            for year in os.listdir(root) if year.startswith("year=") and os.path.isdir(os.path.join(root, year))
+            for month in os.listdir(os.path.join(root, year)) if month.startswith("month=")
+        ]
+
+    def sync(self, name, raw_path):
+        """Bring the stored dataset up to date with raw_path; returns the rebuilt partition keys."""
+        if self.is_fresh(name, raw_path):
+            return []
+
+        manifest = self.load_manifest(name)
+        previous_partitions = set(manifest.get("partitions", {})) | set(self.stored_partitions(name))
+        # partitions cleaned by another version of the cleaning code are all rebuilt
+        old_partitions = manifest.get("partitions", {}) if manifest.get("clean_version") == self.clean_version else {}
+
+        raw = pd.read_csv(raw_path, dtype={"TANGGAL": str, "DDD_CAR": str})
+        raw[self.row_column] = np.arange(len(raw), dtype=np.int64)
+        keys = self.partition_keys(raw)
+
+        partitions = {}
+        rebuilt = []
+        for key, raw_part in raw.groupby(keys, sort=True):
+            partitions[key] = _frame_hash(raw_part)
+            if old_partitions.get(key) == partitions[key]:
+                continue
+            self._write_partition(name, key, raw_part)
+            rebuilt.append(key)
+
+        for key in previous_partitions - set(partitions):
+            shutil.rmtree(os.path.join(self.dataset_path(name), key), ignore_errors=True)
+
+        self._save_manifest(name, {
+            "raw_path": raw_path,
+            "raw_hash": _file_hash(raw_path),
+            "raw_stat": self._stat_signature(raw_path),
+            "clean_version": self.clean_version,
+            "partitions": partitions,
+        })
+        return rebuilt
+
+    def _write_partition(self, name, key, raw_part):
+        clean = self.cleaner.clean_data(raw_part).assign(**{self.row_column: raw_part[self.row_column].to_numpy()})
+        clean = clean.astype({"Month": "float64", "Day": "float64", "DDD_CAR": object})
+
+        partition_dir = os.path.join(self.dataset_path(name), key)
+        tmp_path = os.path.join(partition_dir, ".part-0.parquet.tmp")
+        os.makedirs(partition_dir, exist_ok=True)
+        clean.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, os.path.join(partition_dir, "part-0.parquet"))
+
+    def read(self, name, columns=None, filter=None) -> pd.DataFrame:
+        """Memory-mapped read of the stored dataset in original row order."""
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+
+        dataset = ds.dataset(
+            self.dataset_path(name),
+            format="parquet",
+            partitioning="hive",
+            filesystem=fs.LocalFileSystem(use_mmap=True),
+        )
+        read_columns = None if columns is None else list(columns) + [self.row_column]
+        table = dataset.to_table(columns=read_columns, filter=filter)
+        frame = table.to_pandas().sort_values(self.row_column, kind="stable")
+        frame = frame.drop(columns=[c for c in ("year", "month", self.row_column) if c in frame.columns])
+        return frame.reset_index(drop=True)
@@ -6,24 +6,46 @@ from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline as SkPipeline
 from imblearn.over_sampling import SMOTE
+from imblearn.under_sampling import RandomUnderSampler
+from sklearn.neighbors import NearestNeighbors
 from imblearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.tree import DecisionTreeClassifier
+from steps.compact import ModelCompactor
+from steps.compile import compile_pipeline
+from steps.cv import CrossValidator
+from steps.encoding import FeatureEncoder
+from steps.retrain import IncrementalRetrainer
+from steps.search import HyperparameterSearch
 
 
 class Trainer:
+    imbalance_strategies = ("none", "class_weight", "undersample", "smote")
+    model_map = {
+        "RandomForestClassifier": RandomForestClassifier,
+        "DecisionTreeClassifier": DecisionTreeClassifier,
+        "GradientBoostingClassifier": GradientBoostingClassifier,
+    }
+
     def __init__(self):
         self.config = self.load_config()
         self.model_name = self.config["model"]["name"]
         self.model_params = self.config["model"]["params"]
         self.model_path = self.config["model"]["store_path"]
+        self.imbalance = self.config["model"].get("imbalance", {})
+        self.imbalance_strategy = self.imbalance.get("strategy", "smote")
+        if self.imbalance_strategy not in self.imbalance_strategies:
+            raise ValueError(f"Unknown imbalance strategy: {self.imbalance_strategy}")
         self.pipeline = self.create_pipeline()
 
     def load_config(self):
         with open("config.yml", "r") as config_file:
             return yaml.safe_load(config_file)
 
-    def create_pipeline(self):
+    def create_preprocessor(self):
+        if self.config["model"].get("encoder", "sklearn") == "fast":
+            return FeatureEncoder()
+
         numeric_features = ["TN", "TX", "TAVG", "RH_AVG", "SS", "FF_X", "DDD_X", "FF_AVG", "Month", "Day"]
         categorical_features = ["DDD_CAR"]
 
@@ -47,25 +69,47 @@ class Trainer:
                 ("categorical", categorical_pipeline, categorical_features),
             ]
         )
+        return preprocessor
 
-        smote = SMOTE(sampling_strategy=1.0)
+    def model_params_for(self, model_name, model_params):
+        """Model params with the class_weight imbalance strategy applied (used by search and cv too)."""
+        if self.imbalance_strategy != "class_weight":
+            return model_params
+        if "class_weight" not in self.model_map[model_name]().get_params():
+            raise ValueError(f"{model_name} does not support the class_weight imbalance strategy")
+        return {"class_weight": "balanced", **model_params}
 
-        model_map = {
-            "RandomForestClassifier": RandomForestClassifier,
-            "DecisionTreeClassifier": DecisionTreeClassifier,
-            "GradientBoostingClassifier": GradientBoostingClassifier,
-        }
+    def create_model(self, model_name=None, model_params=None):
+        model_name = model_name or self.model_name
+        model_class = self.model_map[model_name]
+        return model_class(**self.model_params_for(model_name, self.model_params if model_params is None else model_params))
 
-        model_class = model_map[self.model_name]
-        model = model_class(**self.model_params)
+    def create_sampler(self):
+        """The resampling step for model.imbalance, or None when the strategy does not resample."""
+        sampling_strategy = self.imbalance.get("sampling_strategy", 1.0)
+        random_state = self.imbalance.get("random_state")
+        if self.imbalance_strategy == "undersample":
+            return RandomUnderSampler(sampling_strategy=sampling_strategy, random_state=random_state)
+        if self.imbalance_strategy == "smote":
+            # the neighbour index only covers the minority class; a tree index with n_jobs keeps the kNN query parallel
+            neighbors = NearestNeighbors(
+                n_neighbors=self.imbalance.get("k_neighbors", 5) + 1,
+                algorithm=self.imbalance.get("algorithm", "auto"),
+                n_jobs=self.imbalance.get("n_jobs"),
+            )
+            return SMOTE(sampling_strategy=sampling_strategy, k_neighbors=neighbors, random_state=random_state)
+        return None
 
-        pipeline = Pipeline(
-            steps=[
-                ("preprocessor", preprocessor),
-                ("smote", smote),
-                ("model", model),
-            ]
-        )
+    def create_pipeline(self):
+        preprocessor = self.create_preprocessor()
+        sampler = self.create_sampler()
+        model = self.create_model()
+
+        steps = [("preprocessor", preprocessor)]
+        if sampler is not None:
+            steps.append(("sampler", sampler))
+        steps.append(("model", model))
+        pipeline = Pipeline(steps=steps)
 
         return pipeline
 
@@ -74,9 +118,46 @@ class Trainer:
         y = data.iloc[:, -1]
         return X, y
 
+    def search(self, X_train, y_train):
+        """Run the config.yml search and switch this trainer to the best model/params found."""
+        search = HyperparameterSearch(self, self.config["search"], self.config.get("train"))
+        best, trials = search.run(X_train, y_train)
+        self.model_name = best["model"]
+        self.model_params = best["params"]
+        self.pipeline = self.create_pipeline()
+        return best, trials
+
+    def cross_validate(self, X_train, y_train):
+        """Cross-validate the config.yml cv models in parallel; returns (comparison table, out-of-fold probabilities)."""
+        return CrossValidator(self, self.config["cv"]).run(X_train, y_train)
+
+    def retrain_incremental(self):
+        """Warm-start the saved model on rows appended since the last accepted version (config.yml retrain section)."""
+        result, pipeline = IncrementalRetrainer(self, self.config.get("retrain", {})).run()
+        if pipeline is not None:
+            self.pipeline = pipeline
+        return result
+
+    def commit_incremental(self, result):
+        """Persist the watermark of an accepted incremental retrain; call after save_model succeeded."""
+        IncrementalRetrainer(self, self.config.get("retrain", {})).commit(result)
+
+    def reset_incremental(self):
+        """Clear the incremental watermark after a full retrain."""
+        IncrementalRetrainer(self, self.config.get("retrain", {})).reset()
+
     def train_model(self, X_train, y_train):
         self.pipeline.fit(X_train, y_train)
 
-    def save_model(self):
+    def compact(self, X, y):
+        """Prune, quantize and compress the fitted pipeline and measure each variant (config.yml compaction section)."""
+        return ModelCompactor(self.config.get("compaction", {})).run(self.pipeline, X, y)
+
+    def save_model(self, compress=0):
         model_file_path = os.path.join(self.model_path, "model.pkl")
-        joblib.dump(self.pipeline, model_file_path)
+        joblib.dump(self.pipeline, model_file_path, compress=compress)
+
+    def export_compiled(self):
+        """Publish the array-backed inference copy of the fitted pipeline as a new version next to model.pkl."""
+        compiled_root = os.path.join(self.model_path, "compiled")
+        return compile_pipeline(self.pipeline).publish(compiled_root)
@@ -1,7 +1,11 @@
+import os
 import streamlit as st
 import pandas as pd
 import joblib
-from datetime import datetime
+import yaml
+
+from serving.cache import PredictionCache
+from steps.clean import decode_date
 
 # =========================
 # KONFIGURASI LABEL OUTPUT
@@ -29,15 +33,53 @@ FEATURE_INFO = {
     "DDD_CAR": "Arah angin dominan (kode mata angin: N, NE, E, SE, S, SW, W, NW).",
 }
 
+MODEL_PATH = "models/model.pkl"
+
+def model_signature():
+    # sama dengan PredictionCache: model dimuat ulang ketika file model berubah, bersamaan dengan cache-nya
+    stat = os.stat(MODEL_PATH)
+    return stat.st_mtime_ns, stat.st_size
+
+@st.cache_resource(max_entries=1)
+def load_model(signature):
+    return joblib.load(MODEL_PATH)
+
 @st.cache_resource
-def load_model():
-    return joblib.load("models/model.pkl")
+def load_prediction_cache():
+    # Cache hasil prediksi untuk input yang sama (form yang disubmit ulang)
+    with open("config.yml", "r") as config_file:
+        cache_config = yaml.safe_load(config_file).get("serving", {}).get("cache", {})
+    if not cache_config.get("enabled", False):
+        return None
+    return PredictionCache(
+        FEATURE_COLUMNS,
+        max_size=cache_config.get("max_size", 10000),
+        ttl_seconds=cache_config.get("ttl_seconds", 300),
+        model_path=MODEL_PATH,
+    )
+
+def predict_with_cache(model, cache, df):
+    if cache is not None:
+        key = cache.key(df.iloc[0])
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    pred = model.predict(df)[0]
+    proba = model.predict_proba(df)[0] if hasattr(model, "predict_proba") else None
+    if cache is not None:
+        cache.put(key, (pred, proba))
+    return pred, proba
 
 def parse_date(date_str: str):
-    return datetime.strptime(date_str, "%d-%m-%Y")
+    month_day = decode_date(date_str)
+    if month_day is None:
+        raise ValueError(f"TANGGAL tidak valid: {date_str}")
+    return month_day
+
+FEATURE_COLUMNS = ["TN", "TX", "TAVG", "RH_AVG", "SS", "FF_X", "DDD_X", "FF_AVG", "Month", "Day", "DDD_CAR"]
 
 def build_features(tanggal, TN, TX, TAVG, RH_AVG, SS, FF_X, DDD_X, FF_AVG, DDD_CAR):
-    dt = parse_date(tanggal)
+    month, day = parse_date(tanggal)
     return pd.DataFrame([{
         "TN": TN,
         "TX": TX,
@@ -47,8 +89,8 @@ def build_features(tanggal, TN, TX, TAVG, RH_AVG, SS, FF_X, DDD_X, FF_AVG, DDD_C
         "FF_X": FF_X,
         "DDD_X": DDD_X,
         "FF_AVG": FF_AVG,
-        "Month": dt.month,
-        "Day": dt.day,
+        "Month": month,
+        "Day": day,
         "DDD_CAR": DDD_CAR,
     }])
 
@@ -65,7 +107,8 @@ with st.sidebar:
     for k, v in FEATURE_INFO.items():
         st.markdown(f"**{k}** — {v}")
 
-model = load_model()
+model = load_model(model_signature())
+prediction_cache = load_prediction_cache()
 
 with st.form("form_prediksi", clear_on_submit=False):
     tanggal = st.text_input("TANGGAL (DD-MM-YYYY)", value="14-12-2025", help=FEATURE_INFO["TANGGAL"])
@@ -90,7 +133,7 @@ if submitted:
     try:
         df = build_features(tanggal, TN, TX, TAVG, RH_AVG, SS, FF_X, DDD_X, FF_AVG, DDD_CAR)
 
-        pred = model.predict(df)[0]
+        pred, proba = predict_with_cache(model, prediction_cache, df)
         label = CLASS_LABELS.get(int(pred), f"Class {pred}")
 
         st.subheader("Hasil Prediksi")
@@ -100,8 +143,7 @@ if submitted:
             st.success(f"Prediksi: **{label}** 🌤️")
 
         # Kalau model kamu punya predict_proba, tampilkan confidence biar keren:
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(df)[0]
+        if proba is not None:
             st.write("Probabilitas (confidence):")
             # asumsi kelas 0 & 1
             st.progress(float(max(proba)))
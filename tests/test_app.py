@@ -0,0 +1,168 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+
+
+ROWS = [
+    {"TANGGAL": "01-01-2025", "TN": 23.4, "TX": 29.2, "TAVG": 25.9, "RH_AVG": 92, "SS": 3.4,
+     "FF_X": 5.0, "DDD_X": 330, "FF_AVG": 1.0, "DDD_CAR": "C"},
+    {"TANGGAL": "02-01-2025", "TN": 24.4, "TX": 33.6, "TAVG": 28.1, "RH_AVG": 82, "SS": 0.4,
+     "FF_X": 4.0, "DDD_X": 140, "FF_AVG": 2.0, "DDD_CAR": "N"},
+]
+
+
+@pytest.fixture
+def client():
+    with TestClient(app_module.app) as test_client:
+        yield test_client
+
+
+def test_predict_batch_matches_single_predict(client):
+    response = client.post("/predict_batch", json=ROWS)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["n_rows"] == 2 and body["n_errors"] == 0
+
+    for row, result in zip(ROWS, body["results"]):
+        single = client.post("/predict", json=row).json()
+        assert result["predicted_class"] == single["predicted_class"]
+        assert 0.0 <= result["probability"] <= 1.0
+
+
+def test_predict_batch_reports_row_errors(client):
+    bad = dict(ROWS[0], TANGGAL="2025-01-01")
+    response = client.post("/predict_batch", json=[ROWS[0], bad, "oops"])
+    results = response.json()["results"]
+
+    assert "predicted_class" in results[0]
+    assert results[1]["error"] == "TANGGAL harus format DD-MM-YYYY"
+    assert "error" in results[2]
+
+
+def test_predict_batch_accepts_csv_and_ndjson(client):
+    header = ",".join(ROWS[0])
+    csv_body = "\n".join([header] + [",".join(str(v) for v in row.values()) for row in ROWS])
+    csv_response = client.post("/predict_batch", content=csv_body, headers={"content-type": "text/csv"})
+
+    ndjson_body = "\n".join(json.dumps(row) for row in ROWS)
+    ndjson_response = client.post(
+        "/predict_batch", content=ndjson_body, headers={"content-type": "application/x-ndjson"}
+    )
+
+    assert csv_response.json()["results"] == ndjson_response.json()["results"]
+    assert csv_response.json()["n_errors"] == 0
+
+
+def test_predict_with_micro_batching(monkeypatch):
+    monkeypatch.setitem(app_module.serving_config, "batching", {"enabled": True, "max_batch_size": 8, "max_wait_ms": 1})
+    with TestClient(app_module.app) as batching_client:
+        response = batching_client.post("/predict", json=ROWS[0])
+        stats = batching_client.get("/stats").json()["batching"]
+
+    assert response.status_code == 200
+    assert response.json()["predicted_class"] in (0, 1)
+    assert stats["rows"] == 1 and stats["batches"] == 1
+
+
+def test_predict_uses_prediction_cache(monkeypatch):
+    monkeypatch.setitem(app_module.serving_config, "cache", {"enabled": True, "max_size": 16, "ttl_seconds": 60})
+    monkeypatch.setattr(app_module, "prediction_cache", app_module.create_cache())
+    with TestClient(app_module.app) as cache_client:
+        first = cache_client.post("/predict", json=ROWS[0]).json()
+        second = cache_client.post("/predict", json=ROWS[0]).json()
+        stats = cache_client.get("/stats").json()["cache"]
+
+    assert first == second
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_predict_updates_drift_monitor(monkeypatch):
+    reference = app_module.DriftReference.from_data(
+        {col: [row.get(col, 1) for row in ROWS] for col in app_module.DriftReference.numeric_cols + ["DDD_CAR"]},
+        [0, 1],
+    )
+    monkeypatch.setattr(app_module, "drift_monitor", app_module.DriftMonitor(reference, window_size=100))
+    with TestClient(app_module.app) as monitor_client:
+        monitor_client.post("/predict", json=ROWS[0])
+        monitor_client.post("/predict_batch", json=ROWS)
+        report = monitor_client.get("/drift").json()
+
+    assert report["window_rows"] == 3
+    assert set(report["drift"]) == set(reference.counts)
+
+
+def test_predict_writes_prediction_log(monkeypatch, tmp_path):
+    from serving.logger import PredictionLogger, read_prediction_logs
+
+    monkeypatch.setattr(app_module, "prediction_logger", PredictionLogger(str(tmp_path), flush_interval_ms=10))
+    with TestClient(app_module.app) as logging_client:
+        single = logging_client.post("/predict", json=ROWS[0]).json()
+        logging_client.post("/predict_batch", json=ROWS)
+
+    logs = read_prediction_logs(str(tmp_path))
+    assert len(logs) == 3
+    assert logs["prediction"].iloc[0] == single["predicted_class"]
+    assert {"model_version", "probability", "latency_ms", "DDD_CAR", "Month"} <= set(logs.columns)
+
+
+def test_reload_reports_model_version(client):
+    version = client.get("/").json()["model_version"]
+    response = client.post("/reload").json()
+
+    assert response["reloaded"] is False and response["version"] == version
+    assert client.post("/predict", json=ROWS[0]).json()["model_version"] == version
+
+
+def test_ready_after_startup(client):
+    body = client.get("/ready").json()
+    assert body["ready"] is True
+    assert body["startup_seconds"] > 0
+
+
+def test_metrics_cover_predict_stages_and_errors(client):
+    client.post("/predict", json=ROWS[0])
+    client.post("/predict", json=dict(ROWS[0], TANGGAL="2025-01-01"))
+    text = client.get("/metrics").text
+
+    for stage in ("validation", "parse_date", "dataframe", "preprocess", "model", "postprocess"):
+        assert f'predict_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert 'predict_errors_total{reason="bad_date"}' in text
+    assert 'http_requests_total{endpoint="/predict",status="400"}' in text
+    assert 'http_requests_in_flight{endpoint="/predict"} 0.0' in text
+
+
+def test_predict_batch_rejects_undecodable_bodies(client):
+    csv = {"content-type": "text/csv"}
+    assert client.post("/predict_batch", content=b"\xff\xfe\x00", headers=csv).status_code == 400
+    assert client.post("/predict_batch", content=b"", headers=csv).status_code == 400
+    malformed = client.post("/predict_batch", content='TANGGAL,TN\n"01-01-2025,1\n', headers=csv)
+    assert malformed.status_code == 400 and malformed.json()["detail"] == "Body CSV tidak valid"
+
+
+def test_positive_proba_is_zero_without_rain_class():
+    class NoRainModel:
+        classes_ = app_module.np.array([0])
+
+    proba = app_module.np.ones((3, 1))
+    assert app_module._positive_proba(NoRainModel(), proba).tolist() == [0.0, 0.0, 0.0]
+
+
+def test_predict_batch_scores_off_the_event_loop(client, monkeypatch):
+    score_batch = app_module._score_batch
+    loops = []
+
+    def recording(*args):
+        try:
+            loops.append(app_module.asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return score_batch(*args)
+
+    monkeypatch.setattr(app_module, "_score_batch", recording)
+    response = client.post("/predict_batch", json=ROWS)
+
+    assert response.status_code == 200 and len(response.json()["results"]) == 2
+    assert loops == [None]
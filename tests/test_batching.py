@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+import pytest
+
+from serving.batching import MicroBatcher, QueueFullError
+
+
+def test_micro_batcher_coalesces_concurrent_rows():
+    calls = []
+
+    def score(rows):
+        calls.append(len(rows))
+        return [row * 2 for row in rows]
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=4, max_wait_ms=50, max_queue_size=16)
+        await batcher.start()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        stats = batcher.stats()
+        await batcher.stop()
+        return results, stats
+
+    results, stats = asyncio.run(run())
+
+    assert results == [i * 2 for i in range(10)]
+    assert calls == [4, 4, 2]
+    assert stats["batches"] == 3 and stats["rows"] == 10
+    assert stats["max_batch_seen"] == 4
+
+
+def test_micro_batcher_rejects_when_queue_is_full():
+    async def run():
+        batcher = MicroBatcher(lambda rows: rows, max_batch_size=1, max_wait_ms=1, max_queue_size=1)
+        await batcher.start()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        rejected = batcher.stats()["rejected"]
+        await batcher.stop()
+        return results, rejected
+
+    results, rejected = asyncio.run(run())
+
+    assert results[0] == 0
+    assert all(isinstance(r, QueueFullError) for r in results[1:])
+    assert rejected == 2
+
+
+def test_micro_batcher_propagates_scoring_errors():
+    def score(rows):
+        raise RuntimeError("boom")
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=2, max_wait_ms=1)
+        await batcher.start()
+        with pytest.raises(RuntimeError):
+            await batcher.submit(1)
+        await batcher.stop()
+
+    asyncio.run(run())
+
+
+def test_micro_batcher_stop_finishes_the_batch_in_flight():
+    scoring, release = threading.Event(), threading.Event()
+
+    def score(rows):
+        scoring.set()
+        release.wait(5)
+        return [row * 2 for row in rows]
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=2, max_wait_ms=1, max_queue_size=16)
+        await batcher.start()
+        requests = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        while not scoring.is_set():
+            await asyncio.sleep(0.001)
+        stopping = asyncio.ensure_future(batcher.stop())
+        await asyncio.sleep(0.01)
+        release.set()
+        await stopping
+        return await asyncio.gather(*requests), batcher.stats()
+
+    results, stats = asyncio.run(run())
+
+    # the queued third row is drained as well
+    assert results == [0, 2, 4]
+    assert stats["rows"] == 3
+
+
+def test_micro_batcher_cancelled_worker_fails_the_batch_in_flight():
+    release = threading.Event()
+
+    def score(rows):
+        release.wait(5)
+        return rows
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=2, max_wait_ms=1, max_queue_size=16)
+        await batcher.start()
+        requests = [asyncio.ensure_future(batcher.submit(i)) for i in range(2)]
+        await asyncio.sleep(0.05)
+        batcher.worker.cancel()
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        release.set()
+        batcher.worker = None
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) and str(result) == "batcher stopped" for result in results)
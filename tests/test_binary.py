@@ -0,0 +1,108 @@
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from serving.binary import (
+    LENGTH,
+    ROW_BAD_DATE,
+    STATUS_BAD_REQUEST,
+    STATUS_INTERNAL_ERROR,
+    STATUS_OK,
+    STATUS_TOO_MANY_ROWS,
+    BinaryClient,
+    decode_request,
+    encode_request,
+    pack_rows,
+)
+from tests.test_app import ROWS
+
+
+def test_request_round_trip():
+    rows = ROWS + [dict(ROWS[0], TANGGAL="2025-01-01", DDD_CAR="SW")]
+
+    message = encode_request(rows)
+    (length,) = LENGTH.unpack_from(message)
+    decoded = decode_request(message[LENGTH.size:])
+
+    assert length == len(message) - LENGTH.size
+    np.testing.assert_array_equal(decoded, pack_rows(rows))
+    assert decoded["TANGGAL"][2] == b"2025-01-01" and decoded["DDD_CAR"][2] == b"SW"
+    assert decoded["values"][1, 0] == ROWS[1]["TN"]
+
+
+@pytest.fixture
+def binary_client(monkeypatch):
+    monkeypatch.setitem(app_module.serving_config, "binary", {"enabled": True, "port": 0})
+    monkeypatch.setitem(app_module.serving_config, "max_batch_rows", 5)
+    with TestClient(app_module.app) as http_client:
+        with BinaryClient(port=app_module.binary_server.port) as client:
+            yield http_client, client
+
+
+def test_binary_predictions_match_json_api(binary_client):
+    http_client, client = binary_client
+    rows = ROWS + [dict(ROWS[0], TANGGAL="31-02-2025"), dict(ROWS[1], DDD_CAR="ZZ")]
+
+    status, version, results = client.predict(rows)
+
+    assert status == STATUS_OK
+    assert list(results["error"]) == [0, 0, ROW_BAD_DATE, 0]
+    assert results["predicted_class"][2] == -1
+    for row, result in zip([rows[0], rows[1], rows[3]], results[[0, 1, 3]]):
+        single = http_client.post("/predict", json=row).json()
+        assert result["predicted_class"] == single["predicted_class"]
+        assert str(single["model_version"]) == version
+    batch = http_client.post("/predict_batch", json=ROWS).json()["results"]
+    np.testing.assert_allclose(results["probability"][:2], [r["probability"] for r in batch])
+
+
+def test_binary_streaming_and_frame_errors(binary_client):
+    http_client, client = binary_client
+
+    responses = list(client.stream([ROWS] * 6, window=3))
+    assert [status for status, _, _ in responses] == [STATUS_OK] * 6
+    assert all(len(results) == 2 for _, _, results in responses)
+
+    assert client.predict(ROWS * 3)[0] == STATUS_TOO_MANY_ROWS
+    client.sock.sendall(LENGTH.pack(3) + b"bad")
+    assert client._read_response()[0] == STATUS_BAD_REQUEST
+    # the connection is still usable after rejected frames
+    assert client.predict(ROWS)[0] == STATUS_OK
+    assert http_client.get("/stats").json()["binary"]["frames"] == 7
+
+
+def test_binary_scoring_failure_returns_error_frame(binary_client, monkeypatch):
+    _, client = binary_client
+
+    def broken(*args):
+        raise ValueError("Input contains infinity")
+
+    score_packed = app_module._score_packed
+    monkeypatch.setattr(app_module, "_score_packed", broken)
+    status, message, results = client.predict(ROWS)
+    assert status == STATUS_INTERNAL_ERROR and "infinity" in message and len(results) == 0
+
+    monkeypatch.setattr(app_module, "_score_packed", score_packed)
+    assert client.predict(ROWS)[0] == STATUS_OK
+
+
+def test_binary_frames_are_logged_from_the_event_loop(monkeypatch, tmp_path):
+    from serving.logger import PredictionLogger, read_prediction_logs
+
+    monkeypatch.setitem(app_module.serving_config, "binary", {"enabled": True, "port": 0})
+    monkeypatch.setattr(app_module, "prediction_logger", PredictionLogger(str(tmp_path), batch_size=2, flush_interval_ms=60000))
+    with TestClient(app_module.app):
+        with BinaryClient(port=app_module.binary_server.port) as client:
+            client.predict(ROWS)
+        # batch_size rows wake the writer long before the flush interval
+        for _ in range(200):
+            if app_module.prediction_logger.stats()["written"] == 2:
+                break
+            time.sleep(0.01)
+        written = app_module.prediction_logger.stats()["written"]
+
+    assert written == 2
+    assert len(read_prediction_logs(str(tmp_path))) == 2
@@ -0,0 +1,59 @@
+from serving.cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+FEATURES = {"TN": 23.4, "TX": 29.2, "Month": 1, "Day": 1, "DDD_CAR": "C"}
+
+
+def test_cache_hits_and_lru_eviction():
+    cache = PredictionCache(["TN", "TX", "Month", "Day", "DDD_CAR"], max_size=2, ttl_seconds=60)
+    first = cache.key(FEATURES)
+    second = cache.key(dict(FEATURES, TN=20.0))
+    third = cache.key(dict(FEATURES, TN=21.0))
+
+    assert cache.get(first) is None
+    cache.put(first, 1)
+    cache.put(second, 0)
+    assert cache.get(first) == 1
+    cache.put(third, 1)
+
+    assert cache.get(second) is None
+    assert cache.get(first) == 1
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2 and stats["evictions"] == 1
+
+
+def test_cache_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = PredictionCache(list(FEATURES), ttl_seconds=10, clock=clock)
+    key = cache.key(FEATURES)
+    cache.put(key, 1)
+
+    clock.now = 5.0
+    assert cache.get(key) == 1
+    clock.now = 16.0
+    assert cache.get(key) is None
+
+
+def test_cache_invalidated_on_model_change(tmp_path):
+    clock = FakeClock()
+    model_file = tmp_path / "model.pkl"
+    model_file.write_bytes(b"v1")
+    cache = PredictionCache(list(FEATURES), model_path=str(model_file), check_interval=1.0, clock=clock)
+    key = cache.key(FEATURES)
+    cache.put(key, 1)
+
+    model_file.write_bytes(b"model v2")
+    clock.now = 2.0
+    assert cache.get(key) is None
+
+    cache.put(key, 0)
+    cache.set_model_version(2)
+    assert cache.get(key) is None
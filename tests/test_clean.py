@@ -47,3 +47,26 @@ def test_clean_data(sample_data):
     # Binary label derived from RR > 0
     # sample_data RR: [0, 5.4, NaN, 0] -> Rain: [0,1,0,0]
     assert cleaned_data["Rain"].tolist() == [0, 1, 0, 0]
+
+
+def test_build_features_flags_invalid_rows():
+    raw = pd.DataFrame(
+        {
+            "TANGGAL": ["01-01-2025", "2025-01-02", "03-01-2025"],
+            "TN": [23.4, 24.4, "abc"],
+            "TX": [29.2, 33.6, 32.1],
+            "TAVG": [25.9, 28.1, 27.5],
+            "RH_AVG": [92, 82, 88],
+            "SS": [3.4, 0.4, 5.4],
+            "FF_X": [5, 4, 4],
+            "DDD_X": [330, 140, 320],
+            "FF_AVG": [1, 2, 1],
+            "DDD_CAR": ["C", "N", "E"],
+        }
+    )
+    features, invalid = Cleaner().build_features(raw)
+
+    assert list(features.columns) == Cleaner.feature_cols
+    assert features.loc[0, "Month"] == 1 and features.loc[0, "Day"] == 1
+    assert invalid.any(axis=1).tolist() == [False, True, True]
+    assert invalid.loc[1, "TANGGAL"] and invalid.loc[2, "TN"]
@@ -0,0 +1,103 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import roc_auc_score
+
+from dataset import _generate_weather_rows
+from steps.clean import Cleaner
+from steps.compact import ModelCompactor, quantize, select_trees, tree_probabilities
+from steps.compile import CompiledModel, compile_pipeline
+from steps.train import Trainer
+
+
+def _trained(monkeypatch, tmp_path, n_estimators=30):
+    config = {
+        "model": {
+            "name": "RandomForestClassifier",
+            "params": {"n_estimators": n_estimators, "max_depth": 6, "random_state": 0},
+            "store_path": str(tmp_path),
+            "encoder": "fast",
+            "imbalance": {"strategy": "none"},
+        }
+    }
+    monkeypatch.setattr(Trainer, "load_config", lambda self: config)
+    trainer = Trainer()
+    data = Cleaner().clean_data(_generate_weather_rows(3000, seed=4))
+    X, _ = trainer.feature_target_separator(data)
+    # a denser label than RR > 0 so ROC AUC is stable on a few hundred rows
+    y = pd.Series(((X["RH_AVG"] > X["RH_AVG"].median()) ^ (np.arange(len(X)) % 9 == 0)).astype(int))
+    trainer.train_model(X[:2000], y[:2000])
+    return trainer, X[2000:], y[2000:]
+
+
+def test_quantized_thresholds_round_down_and_predictions_match(monkeypatch, tmp_path):
+    trainer, X, _ = _trained(monkeypatch, tmp_path)
+    compiled = compile_pipeline(trainer.pipeline)
+
+    quantized = quantize(compiled)
+
+    assert quantized.threshold.dtype == np.float32 and quantized.children_left.dtype == np.uint8
+    assert quantized.feature.dtype == np.uint8 and quantized.value.dtype == np.float32
+    # every float32 feature value near a threshold takes the same branch as with the float64 threshold
+    threshold = compiled.threshold.astype(np.float32)
+    for x in (threshold, np.nextafter(threshold, np.float32(np.inf)), np.nextafter(threshold, np.float32(-np.inf))):
+        np.testing.assert_array_equal(x <= compiled.threshold, x <= quantized.threshold)
+    np.testing.assert_array_equal(quantized.predict(X), trainer.pipeline.predict(X))
+    np.testing.assert_allclose(quantized.predict_proba(X), trainer.pipeline.predict_proba(X), atol=1e-6)
+
+
+def test_select_trees_stays_within_auc_budget(monkeypatch, tmp_path):
+    trainer, X, y = _trained(monkeypatch, tmp_path)
+    tree_proba = tree_probabilities(trainer.pipeline, X)
+
+    keep = select_trees(tree_proba, y, max_auc_drop=0.002, min_trees=5)
+
+    assert 5 <= len(keep) < len(tree_proba)
+    full = roc_auc_score(y, tree_proba.mean(axis=0))
+    assert roc_auc_score(y, tree_proba[keep].mean(axis=0)) >= full - 0.002
+
+
+def test_compactor_reports_every_variant(monkeypatch, tmp_path):
+    trainer, X, y = _trained(monkeypatch, tmp_path)
+
+    report, pruned, quantized = ModelCompactor({"max_auc_drop": 0.002, "min_trees": 5, "n_latency": 3}).run(trainer.pipeline, X, y)
+
+    rows = {row["variant"]: row for row in report}
+    assert list(rows) == [
+        "original", "compressed", "pruned_compressed", "compiled", "compiled_quantized", "compiled_quantized_compressed",
+    ]
+    assert rows["compressed"]["size_bytes"] < rows["original"]["size_bytes"]
+    assert rows["pruned_compressed"]["n_trees"] == len(pruned.steps[-1][1].estimators_) < 30
+    assert rows["pruned_compressed"]["roc_auc_delta"] >= -0.002
+    assert rows["compiled_quantized"]["size_bytes"] < rows["compiled"]["size_bytes"]
+    assert rows["compiled_quantized"]["agreement"] == rows["pruned_compressed"]["agreement"]
+    assert rows["compiled_quantized_compressed"]["size_bytes"] < rows["compiled_quantized"]["size_bytes"]
+
+    quantized.save(str(tmp_path / "packed"), compress=True)
+    np.testing.assert_array_equal(CompiledModel.load(str(tmp_path / "packed")).predict(X), pruned.predict(X))
+
+
+def test_applied_compaction_keeps_model_pkl_memory_mappable(monkeypatch, tmp_path):
+    mlflow = pytest.importorskip("mlflow")
+    import joblib
+
+    from main import compact_model
+
+    trainer, X, y = _trained(monkeypatch, tmp_path)
+    trainer.config["compaction"] = {"apply": True, "max_auc_drop": 0.002, "min_trees": 5, "n_latency": 3}
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", f"file://{tmp_path}/mlruns")
+    with mlflow.start_run():
+        X_eval, y_eval = compact_model(trainer, X, y)
+
+    # the rows used to choose the trees are left out of the evaluation
+    selection, measured = ModelCompactor(trainer.config["compaction"]).split(len(X))
+    assert X_eval.index.tolist() == X.index[measured].tolist() and len(y_eval) == len(measured)
+    assert not set(X_eval.index) & set(X.index[selection])
+
+    # joblib warns (here: fails) when asked to memory-map a compressed pickle
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        loaded = joblib.load(tmp_path / "model.pkl", mmap_mode="r")
+    assert len(loaded.steps[-1][1].estimators_) == len(trainer.pipeline.steps[-1][1].estimators_) < 30
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+
+from dataset import _generate_weather_rows
+from steps.clean import Cleaner
+from steps.compile import CompiledModel, compile_pipeline, list_versions, resolve_current
+from steps.train import Trainer
+
+
+def _fit_trainer(monkeypatch, tmp_path, name, params):
+    config = {"model": {"name": name, "params": params, "store_path": str(tmp_path)}}
+    monkeypatch.setattr(Trainer, "load_config", lambda self: config)
+    trainer = Trainer()
+    X, y = trainer.feature_target_separator(Cleaner().clean_data(_generate_weather_rows(200)))
+    trainer.train_model(X, y)
+    return trainer, X
+
+
+def test_compiled_forest_matches_pipeline(monkeypatch, tmp_path):
+    trainer, X = _fit_trainer(monkeypatch, tmp_path, "RandomForestClassifier", {"n_estimators": 15, "max_depth": 4, "random_state": 0})
+    X = X.copy()
+    X.loc[0, "TN"] = np.nan
+    X.loc[1, "DDD_CAR"] = np.nan
+    X.loc[2, "DDD_CAR"] = "ZZ"
+
+    compiled = compile_pipeline(trainer.pipeline)
+
+    np.testing.assert_array_equal(compiled.predict_proba(X), trainer.pipeline.predict_proba(X))
+    np.testing.assert_array_equal(compiled.predict(X), trainer.pipeline.predict(X))
+
+
+def test_export_and_load_round_trip(monkeypatch, tmp_path):
+    trainer, X = _fit_trainer(monkeypatch, tmp_path, "DecisionTreeClassifier", {"max_depth": 3})
+    compiled_path = trainer.export_compiled()
+
+    loaded = CompiledModel.load(compiled_path, mmap_mode="r")
+
+    np.testing.assert_array_equal(loaded.predict_proba(X), trainer.pipeline.predict_proba(X))
+
+
+def test_compile_rejects_unsupported_model(monkeypatch, tmp_path):
+    trainer, _ = _fit_trainer(monkeypatch, tmp_path, "GradientBoostingClassifier", {"n_estimators": 5})
+    with pytest.raises(ValueError):
+        compile_pipeline(trainer.pipeline)
+
+
+def test_publish_versions_and_current_pointer(monkeypatch, tmp_path):
+    trainer, X = _fit_trainer(monkeypatch, tmp_path, "DecisionTreeClassifier", {"max_depth": 3})
+    root = str(tmp_path / "published")
+    compiled = compile_pipeline(trainer.pipeline)
+    for _ in range(4):
+        compiled.publish(root, keep=2)
+
+    assert list_versions(root) == [3, 4]
+    assert resolve_current(root) == (4, os.path.join(root, "v4"))
+    loaded = CompiledModel.load(root, mmap_mode="r")
+    assert isinstance(loaded.threshold, np.memmap)
+    np.testing.assert_array_equal(loaded.predict_proba(X), trainer.pipeline.predict_proba(X))
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from dataset import _generate_weather_rows
+from steps.clean import Cleaner
+from steps.parallel import n_workers
+from steps.train import Trainer
+
+
+def _trainer(monkeypatch, tmp_path, cv_config):
+    config = {
+        "model": {"name": "DecisionTreeClassifier", "params": {"max_depth": 3}, "store_path": str(tmp_path)},
+        "cv": cv_config,
+    }
+    monkeypatch.setattr(Trainer, "load_config", lambda self: config)
+    trainer = Trainer()
+    X, y = trainer.feature_target_separator(Cleaner().clean_data(_generate_weather_rows(1500)))
+    return trainer, X, y
+
+
+@pytest.mark.parametrize("backend", ["process", "joblib"])
+def test_kfold_compares_models_with_out_of_fold_probabilities(monkeypatch, tmp_path, backend):
+    trainer, X, y = _trainer(monkeypatch, tmp_path, {
+        "method": "kfold",
+        "n_splits": 3,
+        "backend": backend,
+        "n_jobs": 2,
+        "models": {
+            "DecisionTreeClassifier": {"max_depth": 3, "random_state": 0},
+            "RandomForestClassifier": {"n_estimators": 10, "max_depth": 4, "random_state": 0},
+        },
+    })
+
+    table, oof = trainer.cross_validate(X, y)
+
+    assert set(table["model"]) == {"DecisionTreeClassifier", "RandomForestClassifier"}
+    assert (table["n_folds"] == 3).all()
+    assert table["roc_auc"].is_monotonic_decreasing
+    for proba in oof.values():
+        assert not np.isnan(proba).any() and ((proba >= 0) & (proba <= 1)).all()
+
+
+def test_timeseries_cv_leaves_first_block_unscored(monkeypatch, tmp_path):
+    trainer, X, y = _trainer(monkeypatch, tmp_path, {"method": "timeseries", "n_splits": 3, "n_jobs": 1})
+
+    table, oof = trainer.cross_validate(X, y)
+
+    proba = oof["DecisionTreeClassifier"]
+    assert np.isnan(proba[: len(y) // 4]).all()
+    assert not np.isnan(proba[-10:]).any()
+    assert list(table["model"]) == ["DecisionTreeClassifier"]
+
+
+def test_n_workers_stays_between_one_and_the_task_count():
+    assert n_workers(4, 0) == 1
+    assert n_workers(0, 5) == 1
+    assert n_workers(8, 3) == 3
+    assert 1 <= n_workers(-1, 2) <= 2
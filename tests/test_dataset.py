@@ -1,7 +1,10 @@
+import numpy as np
 import pytest
 import pandas as pd
 from unittest.mock import patch, mock_open
 from steps.ingest import Ingestion
+from steps.clean import Cleaner
+import dataset as data_module
 
 # Sample configuration data
 @pytest.fixture
@@ -40,3 +43,73 @@ def test_load_data(mock_read_csv, mock_safe_load, mock_open, config_data, sample
     # Verify the correct file paths were read
     mock_read_csv.assert_any_call('train.csv')
     mock_read_csv.assert_any_call('test.csv')
+
+
+def test_iter_chunks_streams_with_compact_dtypes(tmp_path, monkeypatch):
+    raw_path = tmp_path / "raw.csv"
+    raw = data_module._generate_weather_rows(250)
+    raw.to_csv(raw_path, index=False)
+    monkeypatch.setattr(Ingestion, "load_config", lambda self: {"data": {"chunksize": 100}})
+
+    chunks = list(Ingestion().iter_chunks(str(raw_path)))
+    assert [len(c) for c in chunks] == [100, 100, 50]
+    assert chunks[0]["TN"].dtype == "float32"
+    assert chunks[0]["DDD_CAR"].dtype == "category"
+
+    cleaner = Cleaner()
+    out_path = tmp_path / "clean" / "train.csv"
+    n_rows = cleaner.clean_to_file(Ingestion().iter_chunks(str(raw_path)), str(out_path))
+    streamed = pd.read_csv(out_path)
+    expected = cleaner.clean_data(raw)
+
+    assert n_rows == 250
+    assert list(streamed.columns) == list(expected.columns)
+    assert streamed["Rain"].tolist() == expected["Rain"].tolist()
+    pd.testing.assert_series_equal(streamed["TN"], expected["TN"], atol=1e-4, check_dtype=False)
+
+
+def test_iter_chunks_coerces_non_numeric_cells(tmp_path, monkeypatch):
+    raw_path = tmp_path / "raw.csv"
+    raw = data_module._generate_weather_rows(20)
+    raw["TN"] = raw["TN"].astype(object)
+    raw.loc[3, "TN"] = "x"
+    raw.to_csv(raw_path, index=False)
+    monkeypatch.setattr(Ingestion, "load_config", lambda self: {"data": {"chunksize": 10}})
+
+    chunks = list(Ingestion().iter_chunks(str(raw_path)))
+
+    assert [c["TN"].dtype for c in chunks] == ["float32", "float32"]
+    assert chunks[0]["TN"].isna().tolist() == [i == 3 for i in range(10)]
+    assert len(Cleaner().clean_data(chunks[0])) == 10
+
+
+def test_generate_dataset_is_chunked_and_reproducible(tmp_path):
+    kwargs = dict(chunk_size=40, n_stations=2, end="2025-01-31", sentinel_rate=0.1, seed=7)
+    serial = data_module.generate_dataset(100, str(tmp_path / "serial"), n_jobs=1, **kwargs)
+    parallel = data_module.generate_dataset(100, str(tmp_path / "parallel"), n_jobs=2, **kwargs)
+
+    assert len(serial) == 3
+    frames = [pd.read_parquet(path) for path in serial]
+    for path, frame in zip(parallel, frames):
+        pd.testing.assert_frame_equal(pd.read_parquet(path), frame)
+
+    data = pd.concat(frames, ignore_index=True)
+    assert len(data) == 100
+    assert data.loc[30, "TANGGAL"] == "31-01-2025" and data.loc[31, "TANGGAL"] == "01-01-2025"
+    assert data.loc[31, "STATION"] == "ST001" and data.loc[62, "STATION"] == "ST000"
+    assert data["TN"].isin([8888, 9999]).any()
+
+    cleaned = Cleaner().clean_data(data)
+    assert cleaned["TN"].isnull().sum() == data["TN"].isin([8888, 9999]).sum()
+
+
+def test_generate_dataset_npy_output(tmp_path):
+    paths = data_module.generate_dataset(10, str(tmp_path), chunk_size=10, fmt="npy")
+    records = np.load(paths[0])
+    assert records.shape == (10,)
+    assert records["TANGGAL"][0] == "01-01-2025"
+
+
+def test_generate_dataset_rejects_inverted_range(tmp_path):
+    with pytest.raises(ValueError, match="must not be before start"):
+        data_module.generate_dataset(10, str(tmp_path), start="2025-02-01", end="2025-01-01")
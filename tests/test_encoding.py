@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import steps.clean
+from dataset import _generate_weather_rows
+from steps.clean import Cleaner, decode_date, decode_dates
+from steps.compile import compile_pipeline
+from steps.encoding import COMPASS_VOCABULARY, FeatureEncoder
+from steps.train import Trainer
+
+
+def _features(n=300):
+    X = Cleaner().clean_data(_generate_weather_rows(n)).iloc[:, :-1].copy()
+    X.loc[0, "TN"] = np.nan
+    X.loc[1, "DDD_CAR"] = np.nan
+    X.loc[2, "DDD_CAR"] = "ZZ"
+    return X
+
+
+def _trainer(monkeypatch, tmp_path, encoder):
+    config = {
+        "model": {
+            "name": "RandomForestClassifier",
+            "params": {"n_estimators": 10, "max_depth": 4, "random_state": 0},
+            "store_path": str(tmp_path),
+            "encoder": encoder,
+        }
+    }
+    monkeypatch.setattr(Trainer, "load_config", lambda self: config)
+    return Trainer()
+
+
+def test_encoder_matches_column_transformer(monkeypatch, tmp_path):
+    X = _features()
+    reference = _trainer(monkeypatch, tmp_path, "sklearn").create_preprocessor().fit(X)
+    encoder = FeatureEncoder().fit(X)
+
+    expected = reference.transform(X)
+    encoded = encoder.transform(X)
+
+    assert encoded.dtype == np.float32
+    np.testing.assert_allclose(encoded[:, :10], expected[:, :10], rtol=1e-6, atol=1e-6)
+    # same one-hot for known codes, reordered to the fixed vocabulary; unknown codes get their own column
+    learned = list(reference.named_transformers_["categorical"].named_steps["onehot"].categories_[0])
+    known = [i for i, code in enumerate(learned) if code in COMPASS_VOCABULARY]
+    order = [10 + COMPASS_VOCABULARY.index(learned[i]) for i in known]
+    np.testing.assert_array_equal(encoded[:, order], expected[:, [10 + i for i in known]])
+    assert encoded[2, -1] == 1.0 and encoded[np.arange(len(X)) != 2, -1].sum() == 0
+
+
+def test_encode_rows_equals_transform():
+    X = _features()
+    encoder = FeatureEncoder().fit(X)
+    rows = X.to_dict(orient="records")
+    rows[3]["DDD_CAR"] = None
+
+    expected = encoder.transform(X.assign(DDD_CAR=[None if i == 3 else v for i, v in enumerate(X["DDD_CAR"])]))
+
+    np.testing.assert_array_equal(encoder.encode_rows(rows), expected)
+    np.testing.assert_array_equal(encoder.encode_arrays(X[encoder._numeric_features()].to_numpy(), X["DDD_CAR"].to_numpy()), encoder.transform(X))
+
+
+def test_compiled_fast_encoder_pipeline_matches(monkeypatch, tmp_path):
+    trainer = _trainer(monkeypatch, tmp_path, "fast")
+    X = _features()
+    y = (np.arange(len(X)) % 7 == 0).astype(int)
+    trainer.train_model(X, pd.Series(y))
+
+    compiled = compile_pipeline(trainer.pipeline)
+
+    np.testing.assert_array_equal(compiled.predict_proba(X), trainer.pipeline.predict_proba(X))
+
+
+def test_decode_dates_validates_and_caches():
+    values = np.array(["01-02-2025", "31-02-2025", None, "2025-01-01", "01-02-2025", "29-02-2024"], dtype=object)
+
+    month, day = decode_dates(values)
+
+    np.testing.assert_array_equal(month, [2, np.nan, np.nan, np.nan, 2, 2])
+    np.testing.assert_array_equal(day, [1, np.nan, np.nan, np.nan, 1, 29])
+    assert decode_date("01-02-2025") == (2, 1)
+    assert decode_date("31-02-2025") is None
+    assert decode_date(None) is None
+
+
+@pytest.mark.parametrize("single_first", [True, False])
+def test_decode_date_agrees_with_decode_dates(single_first):
+    values = ["01-02-0025", "1-2-2025", "01-02-2025 ", "29-02-2023"]
+    steps.clean._date_cache.clear()
+
+    if single_first:
+        single = [decode_date(value) for value in values]
+        month, day = decode_dates(np.array(values, dtype=object))
+    else:
+        month, day = decode_dates(np.array(values, dtype=object))
+        single = [decode_date(value) for value in values]
+
+    batch = [None if np.isnan(m) else (int(m), int(d)) for m, d in zip(month, day)]
+    assert single == batch
+    assert single[0] is None
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import average_precision_score, classification_report, log_loss, roc_auc_score
+
+from steps.evaluate import Evaluator
+
+
+def _scores(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n) < 0.2).astype(int)
+    proba = np.clip(rng.normal(0.3 + 0.3 * y, 0.2), 0, 1)
+    X = pd.DataFrame({"Month": rng.integers(1, 13, n).astype(float), "DDD_CAR": rng.choice(["N", "S", "E"], n)})
+    return X, y, proba
+
+
+def test_metrics_match_sklearn():
+    X, y, proba = _scores()
+    evaluator = Evaluator()
+    evaluator.update(y, proba, X)
+    result = evaluator.result()
+
+    assert result["n_rows"] == len(y)
+    assert result["roc_auc"] == pytest.approx(roc_auc_score(y, proba), abs=1e-3)
+    assert result["pr_auc"] == pytest.approx(average_precision_score(y, proba), abs=1e-3)
+    assert result["log_loss"] == pytest.approx(log_loss(y, proba), rel=1e-6)
+    expected = classification_report(y, (proba > 0.5).astype(int), output_dict=True)
+    assert result["accuracy"] == pytest.approx(expected["accuracy"])
+    for key in ("0", "1", "weighted avg"):
+        for metric in ("precision", "recall", "f1-score"):
+            assert result["classification_report"][key][metric] == pytest.approx(expected[key][metric])
+
+
+def test_chunked_updates_equal_single_pass():
+    X, y, proba = _scores()
+    single = Evaluator()
+    single.update(y, proba, X)
+    chunked = Evaluator()
+    for i in range(0, len(y), 777):
+        chunked.update(y[i:i + 777], proba[i:i + 777], X.iloc[i:i + 777])
+
+    chunked, single = chunked.result(), single.result()
+    for key in ("n_rows", "accuracy", "roc_auc", "pr_auc", "confusion_matrix", "classification_report", "slices"):
+        assert chunked[key] == single[key]
+    assert chunked["log_loss"] == pytest.approx(single["log_loss"])
+    assert [b["mean_probability"] for b in chunked["calibration"]] == pytest.approx([b["mean_probability"] for b in single["calibration"]])
+
+
+def test_slices_and_calibration():
+    X, y, proba = _scores()
+    evaluator = Evaluator(n_calibration_bins=5)
+    evaluator.update(y, proba, X)
+    result = evaluator.result()
+
+    assert set(result["slices"]["Month"]) == set(range(1, 13))
+    north = X["DDD_CAR"].to_numpy() == "N"
+    assert result["slices"]["DDD_CAR"]["N"]["n_rows"] == north.sum()
+    assert result["slices"]["DDD_CAR"]["N"]["roc_auc"] == pytest.approx(roc_auc_score(y[north], proba[north]), abs=1e-3)
+    assert sum(b["n_rows"] for b in result["calibration"]) == len(y)
+    assert all(b["lower"] <= b["mean_probability"] <= b["upper"] for b in result["calibration"])
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from serving.logger import PredictionLogger, read_prediction_logs
+
+
+def _records(n):
+    return [{"TN": 20.0 + i, "DDD_CAR": "C", "prediction": i % 2, "probability": 0.5} for i in range(n)]
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "parquet"])
+def test_logger_writes_rotating_files(tmp_path, fmt):
+    async def run():
+        logger = PredictionLogger(str(tmp_path), fmt=fmt, batch_size=4, flush_interval_ms=10, rotate_rows=5)
+        await logger.start()
+        logger.log_many(_records(12))
+        await asyncio.sleep(0.1)
+        await logger.stop()
+        return logger.stats()
+
+    stats = asyncio.run(run())
+    logs = read_prediction_logs(str(tmp_path))
+
+    assert stats["written"] == 12 and stats["dropped"] == 0
+    assert stats["files"] == 3
+    assert logs["TN"].tolist() == [20.0 + i for i in range(12)]
+
+
+def test_logger_drops_records_when_buffer_is_full(tmp_path):
+    logger = PredictionLogger(str(tmp_path), max_buffer=3)
+    assert logger.log_many(_records(5)) == 3
+    assert not logger.log(_records(1)[0])
+    assert logger.stats()["dropped"] == 3 and logger.stats()["buffered"] == 3
+
+
+def test_parquet_batches_are_cast_to_the_file_schema(tmp_path):
+    logger = PredictionLogger(str(tmp_path), fmt="parquet", rotate_rows=10)
+    # the first batch has no wind direction and integer-valued features
+    first = [dict(record, TN=20, DDD_CAR=None) for record in _records(2)]
+    logger._write_batch(first)
+    logger._write_batch([dict(record, TN=20.5 + i) for i, record in enumerate(_records(3))])
+    logger._close_file()
+    logs = read_prediction_logs(str(tmp_path))
+
+    assert logger.stats()["written"] == 5 and logger.stats()["errors"] == 0
+    assert logs["DDD_CAR"].tolist() == [None, None, "C", "C", "C"]
+    assert logs["TN"].tolist() == [20.0, 20.0, 20.5, 21.5, 22.5]
+
+
+def test_failed_batch_is_requeued_and_retried(tmp_path):
+    async def run():
+        logger = PredictionLogger(str(tmp_path), batch_size=4, flush_interval_ms=10)
+        write_batch, failures = logger._write_batch, [OSError("No space left on device")] * 2
+
+        def flaky(batch):
+            if failures:
+                raise failures.pop()
+            write_batch(batch)
+
+        logger._write_batch = flaky
+        await logger.start()
+        logger.log_many(_records(6))
+        await asyncio.sleep(0.1)
+        await logger.stop()
+        return logger.stats()
+
+    stats = asyncio.run(run())
+    logs = read_prediction_logs(str(tmp_path))
+
+    assert stats["errors"] == 2 and stats["lost"] == 0 and stats["written"] == 6
+    assert logs["TN"].tolist() == [20.0 + i for i in range(6)]
+
+
+def test_batch_failing_past_max_retries_is_lost(tmp_path):
+    async def run():
+        logger = PredictionLogger(str(tmp_path), batch_size=4, flush_interval_ms=10, max_retries=1)
+
+        def broken(batch):
+            raise OSError("Read-only file system")
+
+        logger._write_batch = broken
+        await logger.start()
+        logger.log_many(_records(3))
+        await asyncio.sleep(0.1)
+        await logger.stop()
+        return logger.stats()
+
+    stats = asyncio.run(run())
+
+    assert stats["errors"] == 2 and stats["lost"] == 3 and stats["buffered"] == 0
@@ -0,0 +1,51 @@
+import time
+
+from serving.metrics import MetricsRegistry, StageTimer
+from serving.profiler import SamplingProfiler
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("http_requests", "Requests", ("endpoint", "status"))
+    latency = registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    registry.gauge("cache_hit_ratio", "Hit ratio", callback=lambda: 0.5)
+
+    requests.inc(endpoint="/predict", status=200)
+    requests.inc(endpoint="/predict", status=200)
+    latency.observe(0.05, stage="model")
+    latency.observe(0.5, stage="model")
+    latency.observe(3.0, stage="model")
+    text = registry.render()
+
+    assert "# TYPE http_requests counter" in text
+    assert 'http_requests_total{endpoint="/predict",status="200"} 2.0' in text
+    assert 'latency_seconds_bucket{stage="model",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="model",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{stage="model",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{stage="model"} 3' in text
+    assert "cache_hit_ratio 0.5" in text
+
+
+def test_stage_timer_records_each_lap():
+    registry = MetricsRegistry()
+    stages = registry.histogram("stage_seconds", "Stages", ("stage",))
+    timer = StageTimer(stages)
+    timer.lap("parse_date")
+    timer.lap("model")
+
+    text = registry.render()
+    assert 'stage_seconds_count{stage="parse_date"} 1' in text
+    assert 'stage_seconds_count{stage="model"} 1' in text
+
+
+def test_sampling_profiler_collects_stacks():
+    profiler = SamplingProfiler(interval_ms=1)
+    profiler.start()
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    profiler.stop()
+    report = profiler.report(top=10000)
+
+    assert not report["running"] and report["n_samples"] > 0
+    assert "test_sampling_profiler_collects_stacks" in report["collapsed"]
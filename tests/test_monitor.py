@@ -0,0 +1,42 @@
+import numpy as np
+
+from dataset import _generate_weather_rows
+from steps.clean import Cleaner
+from steps.monitor import DriftMonitor, DriftReference
+
+
+def _features(n, seed):
+    data = Cleaner().clean_data(_generate_weather_rows(n, seed=seed))
+    return data.drop(columns=["Rain"]), data["Rain"].to_numpy()
+
+
+def test_reference_round_trip(tmp_path):
+    features, labels = _features(500, seed=1)
+    reference = DriftReference.from_data(features, labels, n_bins=10)
+    path = tmp_path / "reference.json"
+    reference.save(str(path))
+    loaded = DriftReference.load(str(path))
+
+    for col in reference.counts:
+        assert np.array_equal(loaded.counts[col], reference.counts[col])
+    assert reference.counts["TN"].sum() == 500
+    assert loaded.categories["prediction"] == ["0", "1"]
+
+
+def test_monitor_window_is_bounded_and_detects_shift():
+    features, labels = _features(2000, seed=1)
+    reference = DriftReference.from_data(features, labels)
+    monitor = DriftMonitor(reference, window_size=1000, n_buckets=4)
+
+    same, same_labels = _features(3000, seed=2)
+    monitor.update(same, same_labels)
+    report = monitor.report()
+    assert report["window_rows"] == 1000 and report["total_rows"] == 3000
+    assert report["drift"]["TN"]["pvalue"] > 0.01
+
+    shifted = same.assign(TN=same["TN"] + 3)
+    monitor.update(shifted, same_labels)
+    report = monitor.report()
+    assert report["drift"]["TN"]["pvalue"] < 0.01
+    assert report["drift"]["TN"]["psi"] > 0.2
+    assert report["drift"]["TX"]["pvalue"] > 0.01
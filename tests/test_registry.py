@@ -0,0 +1,83 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.dummy import DummyClassifier
+
+from dataset import _generate_weather_rows
+
+from serving.registry import CompiledModelSource, FileModelSource, ModelManager, RegistryModelSource, load_warmup_rows
+from steps.clean import Cleaner
+from steps.compile import compile_pipeline
+from steps.train import Trainer
+
+
+def _model(constant):
+    return DummyClassifier(strategy="constant", constant=constant).fit(np.zeros((2, 1)), [0, 1])
+
+
+def test_file_source_reloads_on_change_and_keeps_model_on_failure(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    joblib.dump(_model(0), path)
+    swaps = []
+    manager = ModelManager(FileModelSource(path, lambda: joblib.load(path)), on_swap=swaps.append)
+    manager.load_initial()
+    old = manager.current
+
+    assert old.version == 1
+    assert not manager.check()
+
+    joblib.dump(_model(1), path)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+    assert manager.check()
+    assert manager.current.version == 2 and manager.current.model.constant == 1
+    assert old.model.constant == 0  # a request holding the old reference is unaffected
+
+    with open(path, "wb") as model_file:
+        model_file.write(b"not a pickle")
+    assert not manager.check()
+    assert manager.current.version == 2
+    assert manager.stats()["failures"] == 1 and [s.version for s in swaps] == [1, 2]
+
+
+def test_warmup_rows_come_from_samples():
+    rows = load_warmup_rows("samples.json", Cleaner())
+    assert list(rows.columns) == Cleaner.feature_cols and len(rows) > 0
+
+
+def test_registry_source_serves_newest_version(tmp_path, monkeypatch):
+    mlflow = pytest.importorskip("mlflow")
+    import mlflow.sklearn
+
+    tracking_uri = f"file://{tmp_path}/mlruns"
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", tracking_uri)
+    for constant in (0, 1):
+        with mlflow.start_run():
+            mlflow.sklearn.log_model(_model(constant), "model", registered_model_name="weather_model")
+
+    manager = ModelManager(RegistryModelSource("weather_model", tracking_uri=tracking_uri))
+    manager.load_initial()
+
+    assert manager.current.version == 2
+    assert manager.current.source == "models:/weather_model/2"
+    assert manager.current.model.predict(np.zeros((1, 1)))[0] == 1
+
+
+def test_compiled_source_follows_current_pointer(monkeypatch, tmp_path):
+    config = {"model": {"name": "DecisionTreeClassifier", "params": {"max_depth": 2}, "store_path": str(tmp_path)}}
+    monkeypatch.setattr(Trainer, "load_config", lambda self: config)
+    trainer = Trainer()
+    X, y = trainer.feature_target_separator(Cleaner().clean_data(_generate_weather_rows(200)))
+    trainer.train_model(X, y)
+    root = str(tmp_path / "compiled")
+    compiled = compile_pipeline(trainer.pipeline)
+    compiled.publish(root)
+
+    manager = ModelManager(CompiledModelSource(root), warmup_rows=X.head(5))
+    manager.load_initial()
+    assert manager.current.version == 1 and not manager.check()
+
+    compiled.publish(root)
+    assert manager.check()
+    assert manager.current.version == 2 and manager.current.source == os.path.join(root, "v2")
@@ -0,0 +1,107 @@
+import os
+
+import joblib
+
+from dataset import _generate_weather_rows
+from steps.clean import Cleaner
+from steps.retrain import IncrementalRetrainer
+from steps.train import Trainer
+
+
+def _trainer(monkeypatch, tmp_path, model_name="RandomForestClassifier", params=None, **retrain_config):
+    config = {
+        "model": {"name": model_name, "params": params or {"n_estimators": 10, "max_depth": 4, "random_state": 0}, "store_path": str(tmp_path)},
+        "retrain": {"incoming_dir": str(tmp_path / "incoming"), "n_new_estimators": 5, "min_new_rows": 100, **retrain_config},
+    }
+    monkeypatch.setattr(Trainer, "load_config", lambda self: config)
+    trainer = Trainer()
+    X, y = trainer.feature_target_separator(Cleaner().clean_data(_generate_weather_rows(1500, seed=1)))
+    trainer.train_model(X, y)
+    trainer.save_model()
+    os.makedirs(tmp_path / "incoming")
+    return trainer
+
+
+def _append_rows(path, rows):
+    rows.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+
+def test_incremental_retrain_grows_forest_on_appended_rows_only(monkeypatch, tmp_path):
+    trainer = _trainer(monkeypatch, tmp_path, tolerance=1.0)
+    incoming = tmp_path / "incoming" / "daily.csv"
+    _append_rows(incoming, _generate_weather_rows(1500, seed=2))
+
+    result = trainer.retrain_incremental()
+
+    assert result["status"] == "accepted"
+    assert result["n_new_rows"] == 1500
+    assert result["n_estimators"] == 15
+    assert len(trainer.pipeline.named_steps["model"].estimators_) == 15
+    assert joblib.load(tmp_path / "model.pkl").named_steps["model"].n_estimators == 10
+
+    # nothing is committed until the grown model has been saved
+    assert Trainer().retrain_incremental()["n_new_rows"] == 1500
+    trainer.save_model()
+    trainer.commit_incremental(result)
+    assert Trainer().retrain_incremental()["status"] == "no_new_data"
+
+    _append_rows(incoming, _generate_weather_rows(1200, seed=3))
+    result = Trainer().retrain_incremental()
+    assert result["n_new_rows"] == 1200
+    assert result["n_estimators"] == 20
+
+
+def test_rejected_candidate_keeps_watermark(monkeypatch, tmp_path):
+    trainer = _trainer(monkeypatch, tmp_path, tolerance=-1.0)
+    _append_rows(tmp_path / "incoming" / "daily.csv", _generate_weather_rows(1500, seed=2))
+
+    assert trainer.retrain_incremental()["status"] == "rejected"
+    assert Trainer().retrain_incremental()["n_new_rows"] == 1500
+
+
+def test_unknown_categories_require_full_retrain(monkeypatch, tmp_path):
+    trainer = _trainer(monkeypatch, tmp_path)
+    rows = _generate_weather_rows(500, seed=2)
+    rows["DDD_CAR"] = "XYZ"
+    _append_rows(tmp_path / "incoming" / "daily.csv", rows)
+
+    result = trainer.retrain_incremental()
+
+    assert result["status"] == "full_retrain_required"
+    assert "DDD_CAR" in result["reason"]
+
+
+def test_decision_tree_cannot_be_warm_started(monkeypatch, tmp_path):
+    trainer = _trainer(monkeypatch, tmp_path, "DecisionTreeClassifier", {"max_depth": 3})
+    _append_rows(tmp_path / "incoming" / "daily.csv", _generate_weather_rows(500, seed=2))
+
+    assert trainer.retrain_incremental()["status"] == "full_retrain_required"
+
+
+def test_full_retrain_resets_watermark(monkeypatch, tmp_path):
+    trainer = _trainer(monkeypatch, tmp_path, tolerance=1.0)
+    _append_rows(tmp_path / "incoming" / "daily.csv", _generate_weather_rows(1500, seed=2))
+    result = trainer.retrain_incremental()
+    trainer.save_model()
+    trainer.commit_incremental(result)
+    assert Trainer().retrain_incremental()["status"] == "no_new_data"
+
+    trainer.reset_incremental()
+    assert Trainer().retrain_incremental()["n_new_rows"] == 1500
+
+
+def test_read_appended_restarts_truncated_files_and_coerces_bad_cells(tmp_path):
+    path = tmp_path / "daily.csv"
+    _append_rows(path, _generate_weather_rows(50, seed=2))
+    _, offset = IncrementalRetrainer.read_appended(str(path), 0)
+
+    # rotated: a new, shorter file under the same name, with a non-numeric cell
+    rows = _generate_weather_rows(10, seed=3)
+    rows["TN"] = rows["TN"].astype(object)
+    rows.loc[4, "TN"] = "x"
+    path.unlink()
+    _append_rows(path, rows)
+    frame, new_offset = IncrementalRetrainer.read_appended(str(path), offset)
+
+    assert len(frame) == 10 and new_offset == os.path.getsize(path)
+    assert frame["TN"].dtype == "float32" and frame["TN"].isna().tolist() == [i == 4 for i in range(10)]
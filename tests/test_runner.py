@@ -0,0 +1,118 @@
+import pandas as pd
+
+import steps.clean
+import steps.train
+from steps.runner import Step, StepRunner
+
+
+def _pipeline(calls, output_file=None):
+    def ingest(config):
+        calls.append("ingest")
+        return pd.read_csv(config["data"]["train_path"])
+
+    def clean(config, raw):
+        calls.append("clean")
+        return raw * 2
+
+    def train(config, cleaned):
+        calls.append("train")
+        if output_file is not None:
+            output_file.write_text("model")
+        return cleaned.sum().sum() + config["model"]["params"]["alpha"]
+
+    def evaluate(config, model, cleaned):
+        calls.append("evaluate")
+        return model / len(cleaned)
+
+    return [
+        Step("ingest", ingest, files=["data.train_path"], config_keys=["data"]),
+        Step("clean", clean, deps=["ingest"], code=[steps.clean]),
+        Step("train", train, deps=["clean"], config_keys=["model"], code=[steps.train],
+             outputs=[str(output_file)] if output_file is not None else []),
+        Step("evaluate", evaluate, deps=["train", "clean"]),
+    ]
+
+
+def _config(tmp_path, alpha=1):
+    return {"data": {"train_path": str(tmp_path / "train.csv")}, "model": {"params": {"alpha": alpha}}}
+
+
+def test_unchanged_rerun_skips_every_step(tmp_path):
+    pd.DataFrame({"a": [1, 2], "b": [3, 4]}).to_csv(tmp_path / "train.csv", index=False)
+    cache_dir = str(tmp_path / "cache")
+    calls = []
+
+    first = StepRunner(_config(tmp_path), cache_dir)
+    first.run(_pipeline(calls))
+    second = StepRunner(_config(tmp_path), cache_dir)
+    second.run(_pipeline(calls))
+
+    assert calls == ["ingest", "clean", "train", "evaluate"]
+    assert second.skipped == ["ingest", "clean", "train", "evaluate"]
+    assert second.output("evaluate") == first.output("evaluate") == 10.5
+    # skipped steps are not loaded unless asked for
+    assert "clean" not in second._outputs
+
+
+def test_model_params_change_skips_ingest_and_clean(tmp_path):
+    pd.DataFrame({"a": [1, 2], "b": [3, 4]}).to_csv(tmp_path / "train.csv", index=False)
+    cache_dir = str(tmp_path / "cache")
+    StepRunner(_config(tmp_path), cache_dir).run(_pipeline([]))
+
+    calls = []
+    runner = StepRunner(_config(tmp_path, alpha=5), cache_dir)
+    runner.run(_pipeline(calls))
+
+    assert calls == ["train", "evaluate"]
+    assert runner.output("evaluate") == 12.5
+
+
+def test_data_change_and_missing_output_rerun_steps(tmp_path):
+    train_file = tmp_path / "train.csv"
+    pd.DataFrame({"a": [1, 2], "b": [3, 4]}).to_csv(train_file, index=False)
+    cache_dir = str(tmp_path / "cache")
+    model_file = tmp_path / "model.txt"
+    StepRunner(_config(tmp_path), cache_dir).run(_pipeline([], model_file))
+
+    model_file.unlink()
+    calls = []
+    StepRunner(_config(tmp_path), cache_dir).run(_pipeline(calls, model_file))
+    # the retrained model may differ from the cached one, so evaluation reruns too
+    assert calls == ["train", "evaluate"] and model_file.exists()
+
+    pd.DataFrame({"a": [1, 2, 3], "b": [3, 4, 5]}).to_csv(train_file, index=False)
+    calls = []
+    runner = StepRunner(_config(tmp_path), cache_dir)
+    runner.run(_pipeline(calls, model_file))
+    assert calls == ["ingest", "clean", "train", "evaluate"]
+    assert runner.output("evaluate") == 37 / 3
+
+
+def test_rewritten_output_reruns_step_and_dependents(tmp_path):
+    pd.DataFrame({"a": [1, 2], "b": [3, 4]}).to_csv(tmp_path / "train.csv", index=False)
+    cache_dir = str(tmp_path / "cache")
+    model_file = tmp_path / "model.txt"
+    StepRunner(_config(tmp_path), cache_dir).run(_pipeline([], model_file))
+
+    # e.g. an incremental retrain replacing model.pkl outside the runner
+    model_file.write_text("incrementally retrained model")
+    calls = []
+    StepRunner(_config(tmp_path), cache_dir).run(_pipeline(calls, model_file))
+    assert calls == ["train", "evaluate"] and model_file.read_text() == "model"
+
+    calls = []
+    runner = StepRunner(_config(tmp_path), cache_dir)
+    runner.run(_pipeline(calls, model_file))
+    assert calls == [] and runner.skipped == ["ingest", "clean", "train", "evaluate"]
+
+
+def test_train_step_tracks_encoder_and_compiled_output():
+    import main
+    import steps.compact
+    import steps.encoding
+
+    config = {"model": {"name": "RandomForestClassifier", "store_path": "models/"}}
+    train = {step.name: step for step in main.pipeline_steps(config)}["train"]
+
+    assert steps.encoding in train.code and steps.compact in train.code
+    assert "models/compiled/CURRENT" in train.outputs
@@ -0,0 +1,73 @@
+import joblib
+import numpy as np
+import pandas as pd
+
+from dataset import _generate_weather_rows
+from score import csv_shards, score_files
+from steps.clean import Cleaner
+from steps.predict import Predictor
+from steps.train import Trainer
+
+
+def _model(monkeypatch, tmp_path, max_depth=3):
+    config = {"model": {"name": "DecisionTreeClassifier", "params": {"max_depth": max_depth, "random_state": 0}, "store_path": str(tmp_path)}}
+    monkeypatch.setattr(Trainer, "load_config", lambda self: config)
+    trainer = Trainer()
+    trainer.train_model(*trainer.feature_target_separator(Cleaner().clean_data(_generate_weather_rows(1000, seed=1))))
+    trainer.save_model()
+    return str(tmp_path / "model.pkl")
+
+
+def _raw_rows(n, seed):
+    rows = _generate_weather_rows(n, seed=seed).drop(columns=["RR"])
+    rows.loc[3, "TANGGAL"] = "2025-13-45"
+    return rows
+
+
+def test_csv_shards_cover_file_on_line_boundaries(tmp_path):
+    path = tmp_path / "rows.csv"
+    _raw_rows(500, seed=2).to_csv(path, index=False)
+
+    ranges = csv_shards(str(path), 2000)
+
+    data = path.read_bytes()
+    assert ranges[0][0] == data.index(b"\n") + 1 and ranges[-1][1] == len(data)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert all(data[end - 1:end] == b"\n" for _, end in ranges)
+
+
+def test_score_files_shards_resumes_and_matches_predictor(monkeypatch, tmp_path):
+    model_path = _model(monkeypatch, tmp_path)
+    csv_rows, parquet_rows = _raw_rows(700, seed=2), _raw_rows(300, seed=3)
+    csv_rows.to_csv(tmp_path / "a.csv", index=False)
+    parquet_rows.to_parquet(tmp_path / "b.parquet", index=False, row_group_size=100)
+    inputs = [str(tmp_path / "a.csv"), str(tmp_path / "b.parquet")]
+    output = str(tmp_path / "scores")
+
+    summary = score_files(inputs, output, model_path, n_jobs=2, shard_mb=0.01)
+
+    assert summary["rows"] == 1000 and summary["shards"] > 4
+    scored = pd.read_parquet(output)
+    assert len(scored) == 1000 and (~scored["valid"]).sum() == 2
+    assert (scored.loc[~scored["valid"], "predicted_class"] == -1).all()
+
+    expected = pd.concat([csv_rows, parquet_rows], ignore_index=True)
+    features, invalid = Cleaner().build_features(expected)
+    _, positive = Predictor(joblib.load(model_path)).score(features[~invalid.any(axis=1)])
+    np.testing.assert_allclose(np.sort(scored.loc[scored["valid"], "probability"]), np.sort(positive))
+
+    resumed = score_files(inputs, output, model_path, n_jobs=2, shard_mb=0.01)
+    assert resumed["scored_shards"] == 0 and resumed["skipped_shards"] == summary["shards"]
+
+    # a new model invalidates every part
+    model_path = _model(monkeypatch, tmp_path, max_depth=5)
+    assert score_files(inputs, output, model_path, n_jobs=2, shard_mb=0.01)["scored_shards"] == summary["shards"]
+
+
+def test_score_files_runs_with_a_single_worker_for_zero_jobs(monkeypatch, tmp_path):
+    model_path = _model(monkeypatch, tmp_path)
+    _raw_rows(100, seed=2).to_csv(tmp_path / "a.csv", index=False)
+
+    summary = score_files([str(tmp_path / "a.csv")], str(tmp_path / "scores"), model_path, n_jobs=0)
+
+    assert summary["rows"] == 100 and summary["scored_shards"] == 1
@@ -0,0 +1,49 @@
+import pytest
+
+from dataset import _generate_weather_rows
+from steps.clean import Cleaner
+from steps.search import HyperparameterSearch
+from steps.train import Trainer
+
+
+def test_search_halves_candidates_and_picks_best(monkeypatch, tmp_path):
+    config = {
+        "model": {"name": "RandomForestClassifier", "params": {"n_estimators": 10}, "store_path": str(tmp_path)},
+        "train": {"test_size": 0.25},
+        "search": {
+            "method": "grid",
+            "n_jobs": 2,
+            "eta": 3,
+            "min_resources": 0.2,
+            "spaces": {
+                "DecisionTreeClassifier": {"max_depth": [1, 2, 4, 8], "random_state": 0},
+                "RandomForestClassifier": {"n_estimators": [5, 20], "max_depth": [3], "random_state": 0},
+            },
+        },
+    }
+    monkeypatch.setattr(Trainer, "load_config", lambda self: config)
+    trainer = Trainer()
+    X, y = trainer.feature_target_separator(Cleaner().clean_data(_generate_weather_rows(1500)))
+
+    best, trials = trainer.search(X, y)
+
+    first_rung = [t for t in trials if t["rung"] == 0]
+    last_rung = [t for t in trials if t["rung"] == max(t["rung"] for t in trials)]
+    assert len(first_rung) == 6
+    assert len(last_rung) == 1 and last_rung[0]["candidate"] == best["candidate"]
+    assert last_rung[0]["n_samples"] > first_rung[0]["n_samples"]
+    assert trainer.model_name == best["model"] and trainer.model_params == best["params"]
+
+    trainer.train_model(X, y)
+    assert len(trainer.pipeline.predict(X)) == len(y)
+
+
+def test_rung_sizes_end_with_full_data():
+    search = HyperparameterSearch(Trainer.__new__(Trainer), {"spaces": {}, "eta": 3, "min_resources": 0.1})
+    assert search.rung_sizes(9, 1000) == [100, 300, 1000]
+
+
+def test_search_without_candidates_fails_clearly():
+    search = HyperparameterSearch(Trainer.__new__(Trainer), {"spaces": {}})
+    with pytest.raises(ValueError, match="no candidates"):
+        search.run(None, None)
@@ -0,0 +1,58 @@
+import pyarrow.dataset as ds
+
+from dataset import _generate_weather_rows
+from steps.clean import Cleaner
+from steps.store import FeatureStore
+
+
+def test_store_round_trip_and_incremental_rebuild(tmp_path):
+    raw_path = tmp_path / "train.csv"
+    raw = _generate_weather_rows(90)  # 01-01-2025 .. 31-03-2025 -> three monthly partitions
+    raw.to_csv(raw_path, index=False)
+    store = FeatureStore(str(tmp_path / "store"))
+
+    rebuilt = store.sync("train", str(raw_path))
+    assert rebuilt == ["year=2025/month=01", "year=2025/month=02", "year=2025/month=03"]
+
+    stored = store.read("train")
+    expected = Cleaner().clean_data(raw)
+    assert list(stored.columns) == list(expected.columns)
+    assert stored["TN"].tolist() == expected["TN"].tolist()
+    assert stored["Rain"].tolist() == expected["Rain"].tolist()
+
+    # unchanged file: nothing to rebuild
+    assert store.sync("train", str(raw_path)) == []
+
+    # only the partition whose raw rows changed is rewritten
+    raw.loc[40, "TN"] = 30.0
+    raw.to_csv(raw_path, index=False)
+    assert store.sync("train", str(raw_path)) == ["year=2025/month=02"]
+    assert store.read("train").loc[40, "TN"] == 30.0
+
+
+def test_store_reads_selected_columns_and_partitions(tmp_path):
+    raw_path = tmp_path / "train.csv"
+    _generate_weather_rows(90).to_csv(raw_path, index=False)
+    store = FeatureStore(str(tmp_path / "store"))
+    store.sync("train", str(raw_path))
+
+    march = store.read("train", columns=["TN", "Rain"], filter=ds.field("month") == 3)
+
+    assert list(march.columns) == ["TN", "Rain"]
+    assert len(march) == 31
+
+
+def test_store_drops_removed_partitions_after_cleaning_change(tmp_path):
+    raw_path = tmp_path / "train.csv"
+    raw = _generate_weather_rows(90)
+    raw.to_csv(raw_path, index=False)
+    store = FeatureStore(str(tmp_path / "store"))
+    store.sync("train", str(raw_path))
+
+    # new cleaning code and March removed from the source: no stale March rows may survive
+    store.clean_version = "changed"
+    raw.iloc[:59].to_csv(raw_path, index=False)
+    assert store.sync("train", str(raw_path)) == ["year=2025/month=01", "year=2025/month=02"]
+
+    assert len(store.read("train")) == 59
+    assert sorted(store.stored_partitions("train")) == ["year=2025/month=01", "year=2025/month=02"]
@@ -127,3 +127,55 @@ def test_dataset_extract_data(monkeypatch, tmp_path):
     assert train_df.shape[0] == 20
     assert test_df.shape[0] == 10
     assert set(["TANGGAL", "TN", "TX", "Rain"]).issuperset({"TANGGAL", "TN", "TX"})
+
+
+@pytest.mark.parametrize(
+    "strategy, sampler, class_weight",
+    [("none", None, None), ("class_weight", None, "balanced"), ("undersample", "RandomUnderSampler", None), ("smote", "SMOTE", None)],
+)
+def test_imbalance_strategy_builds_pipeline(monkeypatch, tmp_path, strategy, sampler, class_weight):
+    config = {
+        "model": {
+            "name": "DecisionTreeClassifier",
+            "params": {"max_depth": 3},
+            "store_path": str(tmp_path),
+            "imbalance": {"strategy": strategy, "k_neighbors": 3, "random_state": 0},
+        }
+    }
+    monkeypatch.setattr(Trainer, "load_config", lambda self: config)
+
+    trainer = Trainer()
+    data = _make_sample_clean_data()
+    data["Rain"] = (data.index >= 8).astype(int)  # 8:4 so the samplers have something to balance
+    X, y = trainer.feature_target_separator(data)
+    trainer.train_model(X, y)
+
+    steps = dict(trainer.pipeline.steps)
+    assert (type(steps["sampler"]).__name__ if "sampler" in steps else None) == sampler
+    assert steps["model"].class_weight == class_weight
+    assert len(trainer.pipeline.predict(X)) == len(y)
+
+
+def test_class_weight_strategy_rejects_unsupported_model(monkeypatch, tmp_path):
+    config = {
+        "model": {
+            "name": "GradientBoostingClassifier",
+            "params": {},
+            "store_path": str(tmp_path),
+            "imbalance": {"strategy": "class_weight"},
+        }
+    }
+    monkeypatch.setattr(Trainer, "load_config", lambda self: config)
+
+    with pytest.raises(ValueError, match="class_weight"):
+        Trainer()
+
+
+def test_predictor_score_without_rain_class():
+    X = pd.DataFrame({"TN": [1.0, 2.0, 3.0]})
+    model = DecisionTreeClassifier().fit(X, [0, 0, 0])
+
+    classes, positive = Predictor(model).score(X)
+
+    assert classes.tolist() == [0, 0, 0]
+    assert positive.tolist() == [0.0, 0.0, 0.0]